@@ -9,7 +9,7 @@ from flask import Flask, jsonify, request, send_from_directory, send_file, Respo
 import json
 import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 # Optional CORS support
 try:
@@ -32,6 +32,7 @@ try:
     from rainfall_history import (
         get_daily_rainfall,
         get_rainfall_stats,
+        rounded_rainfall_stats,
         get_weekly_summary,
         get_all_rivers_today
     )
@@ -53,6 +54,13 @@ except ImportError:
     paddle_log_available = False
     print("Note: Paddle log module not available. Paddle event tracking will be disabled.")
 
+# LTTB downsampling shared with the detail-page charts
+try:
+    from site_detail import lttb_indices
+    lttb_available = True
+except ImportError:
+    lttb_available = False
+
 app = Flask(__name__)
 
 if cors_available:
@@ -277,8 +285,21 @@ def gauges_json() -> Union[Response, Tuple[Response, int]]:
 
 @app.route('/details/<path:filename>')
 def details(filename: str) -> Response:
-    """Serve detail pages"""
+    """Serve detail pages and their content-hashed chart script"""
     details_dir = os.path.join(SITE_DIR, 'details')
+    if filename.startswith('detail-') and filename.endswith('.js'):
+        # The name changes whenever the script does, so it never goes stale.
+        # The poller writes a pre-gzipped copy alongside it.
+        gz_name = f"{filename}.gz"
+        if request.accept_encodings['gzip'] > 0 and os.path.isfile(os.path.join(details_dir, gz_name)):
+            response = send_from_directory(details_dir, gz_name, mimetype='text/javascript', max_age=31536000)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.headers.pop('Content-Disposition', None)  # don't advertise the .gz name
+        else:
+            response = send_from_directory(details_dir, filename, max_age=31536000)
+        response.cache_control.immutable = True
+        response.vary.add('Accept-Encoding')
+        return response
     return send_from_directory(details_dir, filename)
 
 @app.route('/api/predictions', methods=['GET'])
@@ -324,6 +345,7 @@ def get_usgs_history(site_id: str) -> Union[Response, Tuple[Response, int]]:
         - cfs (discharge)
         - feet (gage height)
     """
+    import gzip
     import urllib.request
     import urllib.parse
     from datetime import timezone, timedelta
@@ -347,8 +369,12 @@ def get_usgs_history(site_id: str) -> Union[Response, Tuple[Response, int]]:
     url = f"https://waterservices.usgs.gov/nwis/iv/?{urllib.parse.urlencode(params)}"
 
     try:
-        with urllib.request.urlopen(url, timeout=60) as response:
-            data = json.loads(response.read())
+        req = urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})
+        with urllib.request.urlopen(req, timeout=60) as response:
+            raw = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                raw = gzip.decompress(raw)
+        data = json.loads(raw)
 
         time_series = data.get("value", {}).get("timeSeries", [])
 
@@ -392,18 +418,34 @@ def get_usgs_history(site_id: str) -> Union[Response, Tuple[Response, int]]:
                 "avg": sum(feet_values) / len(feet_values)
             }
 
-        # Downsample for large date ranges, always include first and last points
-        def downsample(data_list: List[Dict[str, Any]], target_points: int = 200) -> List[Dict[str, Any]]:
-            if len(data_list) <= target_points:
-                return data_list
-            # Reserve first and last, sample middle evenly
-            middle = data_list[1:-1]
-            middle_target = target_points - 2
-            step = len(middle) / middle_target
-            result = [data_list[0]]  # First point
-            result += [middle[int(i * step)] for i in range(middle_target)]
-            result.append(data_list[-1])  # Last point (most recent)
-            return result
+        # Downsample for large date ranges, always include first and last points.
+        # LTTB keeps the peaks and troughs a fixed stride would skip.
+        def keep_timestamps(data_list: List[Dict[str, Any]], target_points: int) -> Set[str]:
+            if lttb_available:
+                keep = lttb_indices([d["value"] for d in data_list], target_points)
+            else:
+                # Reserve first and last, sample middle evenly
+                middle_target = target_points - 2
+                step = (len(data_list) - 2) / middle_target
+                keep = [0] + [1 + int(i * step) for i in range(middle_target)] + [len(data_list) - 1]
+            return {data_list[i]["timestamp"] for i in keep}
+
+        # The history chart plots feet against the cfs labels by array index,
+        # so both series are cut down to one shared set of timestamps.
+        def downsample(series: List[List[Dict[str, Any]]], target_points: int = 200) -> List[List[Dict[str, Any]]]:
+            if all(len(data_list) <= target_points for data_list in series):
+                return series
+            present = [data_list for data_list in series if data_list]
+            budget = target_points // len(present)
+            keep: Set[str] = set()
+            for data_list in present:
+                if len(data_list) <= budget:
+                    keep.update(d["timestamp"] for d in data_list)
+                else:
+                    keep |= keep_timestamps(data_list, budget)
+            return [[d for d in data_list if d["timestamp"] in keep] for data_list in series]
+
+        cfs_points, feet_points = downsample([cfs_data, feet_data])
 
         return jsonify({
             "site_id": site_id,
@@ -411,8 +453,8 @@ def get_usgs_history(site_id: str) -> Union[Response, Tuple[Response, int]]:
             "cfs_count": len(cfs_data),
             "feet_count": len(feet_data),
             "stats": stats,
-            "cfs": downsample(cfs_data),
-            "feet": downsample(feet_data)
+            "cfs": cfs_points,
+            "feet": feet_points
         })
 
     except Exception as e:
@@ -626,7 +668,7 @@ def get_river_rainfall(river_name: str) -> Union[Response, Tuple[Response, int]]
         daily_data = get_daily_rainfall(river_name, days=days)
 
         # Get stats
-        stats = get_rainfall_stats(river_name, days=days)
+        stats = rounded_rainfall_stats(get_rainfall_stats(river_name, days=days))
 
         return jsonify({
             "river_name": river_name,
@@ -36,6 +36,9 @@ PWS_STATIONS = {
     "North Chickamauga": ["KTNSODDY175", "KTNBENTO3", "KTNCLEVE20"],  # Soddy-Daisy TN
 }
 
+# Case/whitespace-normalized view of PWS_STATIONS, built once
+_PWS_NORM = {k.lower().strip(): v for k, v in PWS_STATIONS.items()}
+
 # Friendly labels for display
 PWS_LABELS = {
     "KALBLOUN24": "BLNTVL",   # Blountsville
@@ -154,7 +157,7 @@ def fetch_observation_for_river(river_name):
     Returns:
         Tuple of (observation_dict, station_id) or (None, None) if all fail
     """
-    stations = PWS_STATIONS.get(river_name, [])
+    stations = _PWS_NORM.get(river_name.lower().strip(), [])
 
     for station_id in stations:
         obs = fetch_pws_observation(station_id)
@@ -15,12 +15,14 @@ This data is used to:
 Database: /data/rainfall_history.sqlite
 """
 
+import concurrent.futures
+import gzip
 import sqlite3
 import os
 import json
 import urllib.request
 from datetime import datetime, timedelta, date, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 # Try to use zoneinfo for local timezone, fall back to UTC offset
 try:
@@ -36,6 +38,10 @@ DEFAULT_DB_PATH = "/data/rainfall_history.sqlite"
 # Open-Meteo Historical Weather API
 OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
 
+# The archive lags real time by several days and reports the missing days
+# as 0", so resumed backfills re-fetch this many stored days to correct them
+OPEN_METEO_LAG_DAYS = 7
+
 # PWS station mapping (primary station for each river)
 PWS_STATIONS = {
     "Little River": "KALCEDAR14",
@@ -54,6 +60,131 @@ PWS_STATIONS = {
     "North Chickamauga": "KTNSODDY175",
 }
 
+# Case/whitespace-normalized view of PWS_STATIONS, built once
+_PWS_NORM = {k.lower().strip(): v for k, v in PWS_STATIONS.items()}
+
+
+def pws_station_for(river_name: str) -> Optional[str]:
+    """
+    Look up the primary PWS station for a river, ignoring case and
+    surrounding whitespace.
+
+    Args:
+        river_name: Name of the river
+
+    Returns:
+        Station ID, or None if the river has no PWS (Open-Meteo only)
+    """
+    return _PWS_NORM.get(river_name.lower().strip())
+
+
+# Full schema, run in one executescript() call by init_database()
+_SCHEMA_SQL = """
+-- Daily rainfall table
+-- This stores the final daily total for each river/date combination
+CREATE TABLE IF NOT EXISTS daily_rainfall (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    river_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    precip_in REAL NOT NULL,
+    source TEXT NOT NULL,
+    station_id TEXT,
+    lat REAL,
+    lon REAL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(river_name, date, source)
+);
+
+-- Real-time observations table
+-- This stores each PWS observation throughout the day for tracking
+CREATE TABLE IF NOT EXISTS rainfall_observations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    river_name TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    precip_today_in REAL NOT NULL,
+    precip_rate_in_hr REAL,
+    station_id TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(river_name, timestamp)
+);
+
+-- River level correlation table
+-- Links rainfall events to river level peaks for analysis
+CREATE TABLE IF NOT EXISTS rainfall_river_correlation (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    river_name TEXT NOT NULL,
+    rain_date TEXT NOT NULL,
+    rain_total_in REAL NOT NULL,
+    peak_date TEXT,
+    peak_cfs REAL,
+    peak_ft REAL,
+    response_hours REAL,
+    reached_min INTEGER DEFAULT 0,
+    reached_good INTEGER DEFAULT 0,
+    notes TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(river_name, rain_date)
+);
+
+-- Indexes for efficient queries
+CREATE INDEX IF NOT EXISTS idx_daily_river_date
+ON daily_rainfall(river_name, date);
+
+CREATE INDEX IF NOT EXISTS idx_obs_river_time
+ON rainfall_observations(river_name, timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_corr_river_date
+ON rainfall_river_correlation(river_name, rain_date);
+"""
+
+# Upsert for daily totals (shared by single-row and batch writers).
+# Rows whose total hasn't changed are left alone, so quiet-weather PWS
+# ticks don't rewrite the same value every minute.
+_SQL_UPSERT_DAILY = """
+    INSERT INTO daily_rainfall
+    (river_name, date, precip_in, source, station_id, lat, lon, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(river_name, date, source) DO UPDATE SET
+        precip_in = excluded.precip_in,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE daily_rainfall.precip_in <> excluded.precip_in
+"""
+
+# Insert for real-time PWS observations (duplicates ignored)
+_SQL_INSERT_OBSERVATION = """
+    INSERT OR IGNORE INTO rainfall_observations
+    (river_name, timestamp, precip_today_in, precip_rate_in_hr, station_id)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def _daily_query(start: bool, end: bool, source: bool) -> str:
+    """Build the get_daily_rainfall() SELECT for a combination of filters."""
+    query = """
+        SELECT date, precip_in, source, station_id, lat, lon, updated_at
+        FROM daily_rainfall
+        WHERE river_name = ?"""
+    if start:
+        query += " AND date >= ?"
+    if end:
+        query += " AND date <= ?"
+    if source:
+        query += " AND source = ?"
+    return query + " ORDER BY date ASC"
+
+
+# get_daily_rainfall() queries keyed by (has_start, has_end, has_source).
+# Built once at import so each call looks up its query instead of
+# assembling the WHERE clause. get_daily_rainfall() opens a fresh
+# connection per call, so this does not save a statement prepare.
+_SQL_GET_DAILY = {
+    (start, end, source): _daily_query(start, end, source)
+    for start in (False, True)
+    for end in (False, True)
+    for source in (False, True)
+}
+
 
 def get_db_path() -> str:
     """Get the database path from environment or use default."""
@@ -73,79 +204,10 @@ def init_database(db_path: Optional[str] = None) -> None:
         os.makedirs(db_dir, exist_ok=True)
 
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Create daily rainfall table
-    # This stores the final daily total for each river/date combination
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS daily_rainfall (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            river_name TEXT NOT NULL,
-            date TEXT NOT NULL,
-            precip_in REAL NOT NULL,
-            source TEXT NOT NULL,
-            station_id TEXT,
-            lat REAL,
-            lon REAL,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(river_name, date, source)
-        )
-    """)
-
-    # Create real-time observations table
-    # This stores each PWS observation throughout the day for tracking
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS rainfall_observations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            river_name TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            precip_today_in REAL NOT NULL,
-            precip_rate_in_hr REAL,
-            station_id TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(river_name, timestamp)
-        )
-    """)
-
-    # Create river level correlation table
-    # Links rainfall events to river level peaks for analysis
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS rainfall_river_correlation (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            river_name TEXT NOT NULL,
-            rain_date TEXT NOT NULL,
-            rain_total_in REAL NOT NULL,
-            peak_date TEXT,
-            peak_cfs REAL,
-            peak_ft REAL,
-            response_hours REAL,
-            reached_min INTEGER DEFAULT 0,
-            reached_good INTEGER DEFAULT 0,
-            notes TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(river_name, rain_date)
-        )
-    """)
-
-    # Create indexes for efficient queries
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_daily_river_date
-        ON daily_rainfall(river_name, date)
-    """)
-
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_obs_river_time
-        ON rainfall_observations(river_name, timestamp)
-    """)
-
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_corr_river_date
-        ON rainfall_river_correlation(river_name, rain_date)
-    """)
-
-    conn.commit()
-    conn.close()
+    try:
+        conn.executescript(_SCHEMA_SQL)
+    finally:
+        conn.close()
 
     print(f"[Rainfall History] Database initialized: {db_path}")
 
@@ -163,7 +225,8 @@ def save_daily_rainfall(
     """
     Save or update daily rainfall total for a river.
 
-    Uses INSERT OR REPLACE to update if the date/source combination exists.
+    Upserts on the river/date/source combination. An existing row is only
+    rewritten when the precipitation total actually changed.
 
     Args:
         river_name: Name of the river (must match config)
@@ -185,14 +248,8 @@ def save_daily_rainfall(
     cursor = conn.cursor()
 
     try:
-        cursor.execute("""
-            INSERT INTO daily_rainfall
-            (river_name, date, precip_in, source, station_id, lat, lon, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(river_name, date, source) DO UPDATE SET
-                precip_in = excluded.precip_in,
-                updated_at = CURRENT_TIMESTAMP
-        """, (river_name, date_str, precip_in, source, station_id, lat, lon))
+        cursor.execute(_SQL_UPSERT_DAILY,
+                       (river_name, date_str, precip_in, source, station_id, lat, lon))
 
         conn.commit()
         return True
@@ -234,11 +291,8 @@ def save_rainfall_observation(
     cursor = conn.cursor()
 
     try:
-        cursor.execute("""
-            INSERT OR IGNORE INTO rainfall_observations
-            (river_name, timestamp, precip_today_in, precip_rate_in_hr, station_id)
-            VALUES (?, ?, ?, ?, ?)
-        """, (river_name, timestamp, precip_today_in, precip_rate_in_hr, station_id))
+        cursor.execute(_SQL_INSERT_OBSERVATION,
+                       (river_name, timestamp, precip_today_in, precip_rate_in_hr, station_id))
 
         conn.commit()
         return cursor.rowcount > 0
@@ -281,11 +335,6 @@ def get_daily_rainfall(
     cursor = conn.cursor()
 
     try:
-        query = """
-            SELECT date, precip_in, source, station_id, lat, lon, updated_at
-            FROM daily_rainfall
-            WHERE river_name = ?
-        """
         params = [river_name]
 
         # Handle date range
@@ -294,19 +343,15 @@ def get_daily_rainfall(
             start_date = start_dt.strftime("%Y-%m-%d")
 
         if start_date:
-            query += " AND date >= ?"
             params.append(start_date)
 
         if end_date:
-            query += " AND date <= ?"
             params.append(end_date)
 
         if source:
-            query += " AND source = ?"
             params.append(source)
 
-        query += " ORDER BY date ASC"
-
+        query = _SQL_GET_DAILY[(bool(start_date), bool(end_date), bool(source))]
         cursor.execute(query, params)
         rows = cursor.fetchall()
 
@@ -320,6 +365,73 @@ def get_daily_rainfall(
         conn.close()
 
 
+# Aggregate columns shared by get_rainfall_stats() and get_rainfall_stats_all()
+_STATS_COLUMNS = """
+        COUNT(*) as days_with_data,
+        SUM(precip_in) as total_precip,
+        AVG(precip_in) as avg_daily,
+        MAX(precip_in) as max_daily,
+        SUM(CASE WHEN precip_in > 0.01 THEN 1 ELSE 0 END) as rainy_days,
+        MIN(date) as earliest_date,
+        MAX(date) as latest_date"""
+
+_SQL_STATS_RIVER = f"""
+    SELECT {_STATS_COLUMNS}
+    FROM daily_rainfall
+    WHERE river_name = ? AND date >= ?
+"""
+
+_SQL_STATS_ALL = f"""
+    SELECT river_name, {_STATS_COLUMNS}
+    FROM daily_rainfall
+    WHERE date >= ?
+    GROUP BY river_name
+"""
+
+
+def _stats_from_row(river_name: str, days: int, row: tuple) -> Dict[str, Any]:
+    """Convert a _STATS_COLUMNS result row into the stats dict."""
+    return {
+        'river_name': river_name,
+        'days_requested': days,
+        'days_with_data': row[0] or 0,
+        'total_precip_in': row[1] or 0,
+        'avg_daily_in': row[2] or 0,
+        'max_daily_in': row[3] or 0,
+        'rainy_days': row[4] or 0,
+        'date_range': {
+            'start': row[5],
+            'end': row[6]
+        }
+    }
+
+
+# Display precision for each stats field; values are stored and
+# aggregated at full precision and only rounded for output.
+_STATS_DISPLAY_PLACES = {
+    'total_precip_in': 2,
+    'avg_daily_in': 3,
+    'max_daily_in': 2,
+}
+
+
+def rounded_rainfall_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return a copy of a stats dict with values rounded for display/JSON.
+
+    Args:
+        stats: Dict from get_rainfall_stats() or get_rainfall_stats_all()
+
+    Returns:
+        New dict with precipitation fields rounded
+    """
+    rounded = dict(stats)
+    for key, places in _STATS_DISPLAY_PLACES.items():
+        if rounded.get(key):
+            rounded[key] = round(rounded[key], places)
+    return rounded
+
+
 def get_rainfall_stats(
     river_name: str,
     days: int = 30,
@@ -346,33 +458,50 @@ def get_rainfall_stats(
         start_dt = datetime.now(LOCAL_TZ) - timedelta(days=days)
         start_date = start_dt.strftime("%Y-%m-%d")
 
-        cursor.execute("""
-            SELECT
-                COUNT(*) as days_with_data,
-                SUM(precip_in) as total_precip,
-                AVG(precip_in) as avg_daily,
-                MAX(precip_in) as max_daily,
-                SUM(CASE WHEN precip_in > 0.01 THEN 1 ELSE 0 END) as rainy_days,
-                MIN(date) as earliest_date,
-                MAX(date) as latest_date
-            FROM daily_rainfall
-            WHERE river_name = ? AND date >= ?
-        """, (river_name, start_date))
+        cursor.execute(_SQL_STATS_RIVER, (river_name, start_date))
 
         row = cursor.fetchone()
 
+        return _stats_from_row(river_name, days, row)
+
+    except Exception as e:
+        print(f"[Rainfall History] Error getting stats: {e}")
+        return {}
+
+    finally:
+        conn.close()
+
+
+def get_rainfall_stats_all(
+    days: int = 30,
+    db_path: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get rainfall statistics for every river in a single grouped query.
+
+    Args:
+        days: Number of days to analyze
+        db_path: Optional path to database file
+
+    Returns:
+        Dict mapping river_name to the same stats dict get_rainfall_stats()
+        returns. Rivers with no data in the period are absent.
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        start_dt = datetime.now(LOCAL_TZ) - timedelta(days=days)
+        start_date = start_dt.strftime("%Y-%m-%d")
+
+        cursor.execute(_SQL_STATS_ALL, (start_date,))
+
         return {
-            'river_name': river_name,
-            'days_requested': days,
-            'days_with_data': row[0] or 0,
-            'total_precip_in': round(row[1], 2) if row[1] else 0,
-            'avg_daily_in': round(row[2], 3) if row[2] else 0,
-            'max_daily_in': round(row[3], 2) if row[3] else 0,
-            'rainy_days': row[4] or 0,
-            'date_range': {
-                'start': row[5],
-                'end': row[6]
-            }
+            row[0]: _stats_from_row(row[0], days, row[1:])
+            for row in cursor.fetchall()
         }
 
     except Exception as e:
@@ -412,10 +541,14 @@ def fetch_open_meteo_history(
 
     try:
         req = urllib.request.Request(url, headers={
-            "User-Agent": "usgs-river-alert/1.0"
+            "User-Agent": "usgs-river-alert/1.0",
+            "Accept-Encoding": "gzip",
         })
         with urllib.request.urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read())
+            raw = resp.read()
+            if resp.headers.get("Content-Encoding") == "gzip":
+                raw = gzip.decompress(raw)
+            data = json.loads(raw)
 
         daily = data.get("daily", {})
         dates = daily.get("time", [])
@@ -425,7 +558,7 @@ def fetch_open_meteo_history(
         for d, p in zip(dates, precips):
             results.append({
                 'date': d,
-                'precip_in': round(p, 3) if p is not None else 0
+                'precip_in': p if p is not None else 0
             })
 
         return results
@@ -435,12 +568,92 @@ def fetch_open_meteo_history(
         return []
 
 
+def _backfill_range(days: int) -> Tuple[str, str]:
+    """Return (start_date, end_date) covering `days` days up to yesterday."""
+    end_dt = datetime.now(LOCAL_TZ) - timedelta(days=1)  # Yesterday
+    start_dt = end_dt - timedelta(days=days)
+    return start_dt.strftime("%Y-%m-%d"), end_dt.strftime("%Y-%m-%d")
+
+
+def _latest_open_meteo_dates(db_path: Optional[str] = None) -> Dict[str, str]:
+    """Return the most recent Open-Meteo date stored for each river."""
+    if db_path is None:
+        db_path = get_db_path()
+
+    conn = sqlite3.connect(db_path)
+
+    try:
+        return dict(conn.execute("""
+            SELECT river_name, MAX(date)
+            FROM daily_rainfall
+            WHERE source = 'open-meteo'
+            GROUP BY river_name
+        """).fetchall())
+
+    except Exception as e:
+        print(f"[Rainfall History] Error probing latest dates: {e}")
+        return {}
+
+    finally:
+        conn.close()
+
+
+def _resume_start(start_date: str, latest_date: Optional[str]) -> str:
+    """Move start_date up to the lag window before the latest stored date."""
+    if latest_date:
+        rewind = date.fromisoformat(latest_date) - timedelta(days=OPEN_METEO_LAG_DAYS)
+        return max(start_date, rewind.strftime("%Y-%m-%d"))
+    return start_date
+
+
+def save_open_meteo_batch(
+    histories: List[Tuple[str, float, float, List[Dict[str, Any]]]],
+    db_path: Optional[str] = None
+) -> int:
+    """
+    Save Open-Meteo daily history for one or more rivers in one transaction.
+
+    Args:
+        histories: List of (river_name, lat, lon, history) tuples, where
+                   history is the list returned by fetch_open_meteo_history()
+        db_path: Optional path to database file
+
+    Returns:
+        Number of daily rows written
+    """
+    rows = [
+        (river_name, record['date'], record['precip_in'], "open-meteo", None, lat, lon)
+        for river_name, lat, lon, history in histories
+        for record in history
+    ]
+    if not rows:
+        return 0
+
+    if db_path is None:
+        db_path = get_db_path()
+
+    conn = sqlite3.connect(db_path)
+
+    try:
+        with conn:
+            conn.executemany(_SQL_UPSERT_DAILY, rows)
+        return len(rows)
+
+    except Exception as e:
+        print(f"[Rainfall History] Error saving Open-Meteo batch: {e}")
+        return 0
+
+    finally:
+        conn.close()
+
+
 def backfill_historical_data(
     river_name: str,
     lat: float,
     lon: float,
     days: int = 365,
-    db_path: Optional[str] = None
+    db_path: Optional[str] = None,
+    resume: bool = True
 ) -> int:
     """
     Backfill historical rainfall data from Open-Meteo for a river.
@@ -451,18 +664,15 @@ def backfill_historical_data(
         lon: Longitude of the river/gauge location
         days: Number of days of history to fetch (default 365)
         db_path: Optional path to database file
+        resume: Only fetch from OPEN_METEO_LAG_DAYS before the latest
+                Open-Meteo date already stored for this river
 
     Returns:
         Number of days successfully saved
     """
-    if db_path is None:
-        db_path = get_db_path()
-
-    end_dt = datetime.now(LOCAL_TZ) - timedelta(days=1)  # Yesterday
-    start_dt = end_dt - timedelta(days=days)
-
-    start_date = start_dt.strftime("%Y-%m-%d")
-    end_date = end_dt.strftime("%Y-%m-%d")
+    start_date, end_date = _backfill_range(days)
+    if resume:
+        start_date = _resume_start(start_date, _latest_open_meteo_dates(db_path).get(river_name))
 
     print(f"[Rainfall History] Backfilling {river_name} from {start_date} to {end_date}...")
 
@@ -472,23 +682,90 @@ def backfill_historical_data(
         print(f"[Rainfall History] No data returned from Open-Meteo")
         return 0
 
-    saved_count = 0
-    for record in history:
-        if save_daily_rainfall(
-            river_name=river_name,
-            date_str=record['date'],
-            precip_in=record['precip_in'],
-            source="open-meteo",
-            lat=lat,
-            lon=lon,
-            db_path=db_path
-        ):
-            saved_count += 1
+    saved_count = save_open_meteo_batch([(river_name, lat, lon, history)], db_path=db_path)
 
     print(f"[Rainfall History] Saved {saved_count} days for {river_name}")
     return saved_count
 
 
+def backfill_rivers(
+    rivers: List[Tuple[str, float, float]],
+    days: int = 365,
+    db_path: Optional[str] = None,
+    max_workers: int = 8,
+    resume: bool = True
+) -> Dict[str, int]:
+    """
+    Backfill historical rainfall for several rivers concurrently.
+
+    Open-Meteo requests run in a thread pool; all results are then written
+    in a single transaction.
+
+    Args:
+        rivers: List of (river_name, lat, lon) tuples
+        days: Number of days of history to fetch (default 365)
+        db_path: Optional path to database file
+        max_workers: Maximum concurrent Open-Meteo requests
+        resume: Only fetch from OPEN_METEO_LAG_DAYS before the latest
+                Open-Meteo date already stored for each river
+
+    Returns:
+        Dict mapping river_name to number of days fetched (0 on failure)
+    """
+    if not rivers:
+        return {}
+
+    start_date, end_date = _backfill_range(days)
+    latest = _latest_open_meteo_dates(db_path) if resume else {}
+
+    print(f"[Rainfall History] Backfilling {len(rivers)} rivers from {start_date} to {end_date}...")
+
+    def fetch(river):
+        river_name, lat, lon = river
+        river_start = _resume_start(start_date, latest.get(river_name))
+        return river_name, lat, lon, fetch_open_meteo_history(lat, lon, river_start, end_date)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
+        histories = list(ex.map(fetch, rivers))
+
+    saved_count = save_open_meteo_batch(histories, db_path=db_path)
+    print(f"[Rainfall History] Saved {saved_count} days across {len(rivers)} rivers")
+
+    if not saved_count:
+        return {river_name: 0 for river_name, _, _, _ in histories}
+    return {river_name: len(history) for river_name, _, _, history in histories}
+
+
+def _pws_rows(
+    river_name: str,
+    pws_observation: Dict[str, Any],
+    now: datetime
+) -> Optional[Tuple[tuple, tuple]]:
+    """
+    Build the (observation, daily) parameter rows for a PWS observation.
+
+    Returns:
+        Tuple of (observation_row, daily_row), or None if no precip data
+    """
+    if not pws_observation:
+        return None
+
+    precip_today = pws_observation.get('precip_today_in')
+    if precip_today is None:
+        return None
+
+    date_str = now.strftime("%Y-%m-%d")
+    timestamp = now.strftime("%Y-%m-%dT%H:%M:%S")
+
+    station_id = pws_observation.get('station_id') or pws_station_for(river_name)
+    precip_rate = pws_observation.get('precip_rate_in_hr')
+
+    obs_row = (river_name, timestamp, precip_today, precip_rate, station_id)
+    # PWS resets at midnight, so this is cumulative for the day
+    daily_row = (river_name, date_str, precip_today, "pws", station_id, None, None)
+    return obs_row, daily_row
+
+
 def record_pws_rainfall(
     river_name: str,
     pws_observation: Dict[str, Any],
@@ -511,42 +788,68 @@ def record_pws_rainfall(
     if db_path is None:
         db_path = get_db_path()
 
-    if not pws_observation:
+    # Get current local date
+    rows = _pws_rows(river_name, pws_observation, datetime.now(LOCAL_TZ))
+    if rows is None:
         return False
 
-    precip_today = pws_observation.get('precip_today_in')
-    if precip_today is None:
-        return False
+    obs_row, daily_row = rows
+
+    # Save observation
+    save_rainfall_observation(*obs_row, db_path=db_path)
+
+    # Update daily total
+    save_daily_rainfall(*daily_row, db_path=db_path)
+
+    return True
+
+
+def record_pws_rainfall_batch(
+    readings: List[Tuple[str, Dict[str, Any]]],
+    db_path: Optional[str] = None
+) -> int:
+    """
+    Record PWS rainfall for many rivers in a single transaction.
+
+    Same effect as calling record_pws_rainfall() once per river, but all
+    observation and daily-total writes share one connection and one commit.
+
+    Args:
+        readings: List of (river_name, pws_observation) tuples
+        db_path: Optional path to database file
+
+    Returns:
+        Number of rivers recorded
+    """
+    if db_path is None:
+        db_path = get_db_path()
 
-    # Get current local date
     now = datetime.now(LOCAL_TZ)
-    date_str = now.strftime("%Y-%m-%d")
-    timestamp = now.strftime("%Y-%m-%dT%H:%M:%S")
+    obs_rows = []
+    daily_rows = []
+    for river_name, pws_observation in readings:
+        rows = _pws_rows(river_name, pws_observation, now)
+        if rows is not None:
+            obs_rows.append(rows[0])
+            daily_rows.append(rows[1])
+
+    if not obs_rows:
+        return 0
 
-    station_id = pws_observation.get('station_id')
-    precip_rate = pws_observation.get('precip_rate_in_hr')
+    conn = sqlite3.connect(db_path)
 
-    # Save observation
-    save_rainfall_observation(
-        river_name=river_name,
-        timestamp=timestamp,
-        precip_today_in=precip_today,
-        precip_rate_in_hr=precip_rate,
-        station_id=station_id,
-        db_path=db_path
-    )
+    try:
+        with conn:
+            conn.executemany(_SQL_INSERT_OBSERVATION, obs_rows)
+            conn.executemany(_SQL_UPSERT_DAILY, daily_rows)
+        return len(obs_rows)
 
-    # Update daily total (PWS resets at midnight, so this is cumulative for the day)
-    save_daily_rainfall(
-        river_name=river_name,
-        date_str=date_str,
-        precip_in=precip_today,
-        source="pws",
-        station_id=station_id,
-        db_path=db_path
-    )
+    except Exception as e:
+        print(f"[Rainfall History] Error saving PWS batch: {e}")
+        return 0
 
-    return True
+    finally:
+        conn.close()
 
 
 def get_all_rivers_today(db_path: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -646,14 +949,12 @@ if __name__ == "__main__":
     # Test backfill for Little River Canyon
     lat = 34.1736
     lon = -85.6164
-    saved = backfill_historical_data(
-        river_name="Little River Canyon",
-        lat=lat,
-        lon=lon,
+    saved = backfill_rivers(
+        [("Little River Canyon", lat, lon)],
         days=30,
         db_path=test_db
     )
-    print(f"\nBackfilled {saved} days")
+    print(f"\nBackfilled {saved['Little River Canyon']} days")
 
     # Get stats
     stats = get_rainfall_stats("Little River Canyon", days=30, db_path=test_db)
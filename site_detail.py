@@ -2,14 +2,58 @@
 """
 Generate detailed Google Analytics-style dashboard pages for individual river sites.
 Shows 7-day charts for CFS, water level (feet), and temperature/wind history.
+
+Batch callers should fetch history with prefetch_usgs_7day_data(), which runs
+one combined discharge + gage height request per site on a thread pool over a
+shared keep-alive session; fetch_usgs_7day_both() does the same for one site.
 """
 
+import concurrent.futures
+import gzip
+import hashlib
 import json
-import urllib.request
-import urllib.parse
-from datetime import datetime, timezone, timedelta
+import math
+import os
+import sqlite3
+import time
+from bisect import bisect_right
+from datetime import date, datetime
 import html
-from typing import Any, Dict, List, Optional, Tuple
+import requests
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Use orjson for the USGS payload and chart data when it's installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# Stream-parse USGS responses with ijson when its C backend is installed
+# (the pure-Python backend is slower than a full json.loads)
+try:
+    import ijson
+    IJSON_AVAILABLE = ijson.backend in ("yajl2_c", "yajl2_cffi")
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Decode USGS responses straight into typed structs with msgspec when it's
+# installed; only the fields we read are materialized
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
 
 # Import TVA forecast generator (optional - only for TVA sites)
 try:
@@ -18,6 +62,56 @@ try:
 except ImportError:
     TVA_FORECAST_AVAILABLE = False
 
+# Wind chill bands (°F): below 0, 0-10, 10-20, 20-32, 32-40, 40 and up
+_WC_EDGES = (0, 10, 20, 32, 40)
+_WC_TABLE = (
+    ("❄️🥶", "Dangerous!"),
+    ("🥶", "Extreme Cold"),
+    ("🧊", "Very Cold"),
+    ("🌬️", "Freezing"),
+    ("😬", "Chilly"),
+    ("🌡️", "Cool"),
+)
+
+
+# LRC flow guide levels and colors (from Adam Goshorn), in CFS
+_LRC_LEVELS = (
+    {"min": 0, "max": 250, "label": "Not Runnable", "color": "#9ca3af"},
+    {"min": 250, "max": 400, "label": "Good Low", "color": "#fbbf24"},
+    {"min": 400, "max": 800, "label": "Shitty Medium", "color": "#a67c52"},
+    {"min": 800, "max": 1500, "label": "Good Medium", "color": "#86efac"},
+    {"min": 1500, "max": 2500, "label": "BEST!", "color": "#22c55e"},
+    {"min": 2500, "max": 99999, "label": "Too High", "color": "#ef4444"},
+)
+
+# North Chickamauga visual gauge levels (from Bard Trimble)
+# These are VISUAL gauge feet at the take-out, not USGS stage
+_BARD_LEVELS = (
+    {"min": -99, "max": 1.5, "label": "Too Low", "color": "#9ca3af"},
+    {"min": 1.5, "max": 2.0, "label": "Low", "color": "#fbbf24"},
+    {"min": 2.0, "max": 2.5, "label": "Worth It", "color": "#86efac"},
+    {"min": 2.5, "max": 3.2, "label": "Good", "color": "#22c55e"},
+    {"min": 3.2, "max": 3.5, "label": "Meaty", "color": "#3b82f6"},
+    {"min": 3.5, "max": 4.0, "label": "High", "color": "#f97316"},
+    {"min": 4.0, "max": 99, "label": "Too High", "color": "#ef4444"},
+)
+
+# Lower band edges for bisecting into the level tables above
+_LRC_MINS = tuple(level["min"] for level in _LRC_LEVELS)
+_BARD_MINS = tuple(level["min"] for level in _BARD_LEVELS)
+
+
+def _find_level(levels: Tuple[Dict[str, Any], ...], mins: Tuple[float, ...], value: float) -> Optional[Dict[str, Any]]:
+    """Return the level whose [min, max) band contains value, or None."""
+    i = bisect_right(mins, value) - 1
+    if i >= 0 and value < levels[i]["max"]:
+        return levels[i]
+    return None
+
+
+# Memoized: the same station reading is evaluated for the main page and
+# again for the detail page, and several rivers share a station.
+@lru_cache(maxsize=256)
 def calculate_wind_chill(temp_f: Optional[float], wind_mph: Optional[float]) -> Tuple[Optional[float], Optional[str], Optional[str]]:
     """
     Calculate wind chill temperature using NWS formula.
@@ -39,33 +133,72 @@ def calculate_wind_chill(temp_f: Optional[float], wind_mph: Optional[float]) ->
     if temp_f > 50 or wind_mph < 3:
         return None, None, None
 
-    # NWS Wind Chill Formula
-    wind_chill = (35.74 + 0.6215 * temp_f -
-                  35.75 * (wind_mph ** 0.16) +
-                  0.4275 * temp_f * (wind_mph ** 0.16))
-
-    # Fun emoji ranges based on wind chill
-    if wind_chill < 0:
-        emoji = "❄️🥶"
-        desc = "Dangerous!"
-    elif wind_chill < 10:
-        emoji = "🥶"
-        desc = "Extreme Cold"
-    elif wind_chill < 20:
-        emoji = "🧊"
-        desc = "Very Cold"
-    elif wind_chill < 32:
-        emoji = "🌬️"
-        desc = "Freezing"
-    elif wind_chill < 40:
-        emoji = "😬"
-        desc = "Chilly"
-    else:
-        emoji = "🌡️"
-        desc = "Cool"
+    # NWS Wind Chill Formula (V^0.16 appears twice; compute it once)
+    v16 = wind_mph ** 0.16
+    wind_chill = 35.74 + 0.6215 * temp_f - 35.75 * v16 + 0.4275 * temp_f * v16
 
+    # Fun emoji ranges based on wind chill; each edge starts the next band
+    emoji, desc = _WC_TABLE[bisect_right(_WC_EDGES, wind_chill)]
     return wind_chill, emoji, desc
 
+# Location links HTML for TVA sites, keyed by TVA site code
+_LINKS_BY_TVA = {
+    "HADT1": (' <a href="https://www.google.com/maps/place/35%C2%B010%2724.7%22N+84%C2%B023%2701.4%22W/@35.1713452,-84.38115,16.39z" '
+        'target="_blank" class="location-link">📍 Put in</a> '
+        '<a href="https://www.google.com/maps/place/35%C2%B010%2752.5%22N+84%C2%B026%2719.1%22W/@35.1816932,-84.4346579,16.39z" '
+        'target="_blank" class="location-link">🏁 Take out</a>'),
+    "OCCT1": (' <a href="https://www.google.com/maps/place/Ocoee+Whitewater+Center/@35.0619844,-84.4296477,17z" '
+        'target="_blank" class="location-link">📍 Upper Ocoee Put-in (Olympic)</a> '
+        '<a href="https://www.tva.com/environment/lake-levels/ocoee-3" '
+        'target="_blank" class="location-link">📅 Upper Ocoee Info</a>'),
+    "OCBT1": (' <a href="https://maps.app.goo.gl/5cD9XmDBaiu6kZVy9" '
+        'target="_blank" class="location-link">📍 Middle Ocoee Put-in</a> '
+        '<a href="https://maps.app.goo.gl/nzEjdqdPwLac6nMp8" '
+        'target="_blank" class="location-link">🏁 Take-out</a> '
+        '<a href="https://www.tva.com/environment/lake-levels/ocoee-2/recreation-release-calendar" '
+        'target="_blank" class="location-link">📅 Middle Ocoee Release Schedule</a>'),
+    "OCAT1": (' <a href="https://www.google.com/maps/place/Parksville+Lake/@35.0950,-84.6470,15z" '
+        'target="_blank" class="location-link">📍 Parksville Dam</a> '
+        '<a href="https://www.tva.com/environment/lake-levels/ocoee-1" '
+        'target="_blank" class="location-link">📅 Lower Ocoee Info</a>'),
+}
+
+
+# Location links HTML for USGS/StreamBeam sites, keyed by site ID
+_LINKS_BY_USGS = {
+    # Little River Canyon
+    "02399200": (' <a href="https://www.google.com/maps/dir/Little+River+Canyon+Kayak+Put+In//@34.3914776,-85.6250722,19z" '
+        'target="_blank" class="location-link">🚀 Suicide put in</a> '
+        '<a href="https://maps.app.goo.gl/WuMrPD13zbDKwzwx6" '
+        'target="_blank" class="location-link">📍 Eberhart Point</a> '
+        '<a href="https://maps.app.goo.gl/xV6Db9HyhbhEe8sT6" '
+        'target="_blank" class="location-link">🥾 Powell Trail</a> '
+        '<a href="https://maps.app.goo.gl/Rt7pv8qZzzUsFFh37" '
+        'target="_blank" class="location-link">🏁 Chair Lift Take Out</a>'),
+    # Locust Fork
+    "02455000": (' <a href="https://maps.app.goo.gl/VxoBRfDEiznaJEuR6" '
+        'target="_blank" class="location-link">📍 Upper put in</a> '
+        '<a href="https://maps.app.goo.gl/yW8uYJAUbpub1bQX8" '
+        'target="_blank" class="location-link">📍 OLD Upper put in</a> '
+        '<a href="https://maps.app.goo.gl/KsminZcRhyHsQi4s9" '
+        'target="_blank" class="location-link">📍 Kings Bend put in</a> '
+        '<a href="https://maps.app.goo.gl/8QTdmaYiyBWgdB7G6" '
+        'target="_blank" class="location-link">🏁 Take out</a>'),
+    # Rush South (Columbus GA)
+    "02341460": (' <a href="https://rushsouth.com/" '
+        'target="_blank" class="location-link">🌊 RushSouth Whitewater Park</a> '
+        '<a href="https://lakes.southernco.com/" '
+        'target="_blank" class="location-link">📊 GA Power Lake Levels</a> '
+        '<a href="https://www.google.com/maps/place/RushSouth+Whitewater+Park/@32.4697,-84.9935,16z" '
+        'target="_blank" class="location-link">📍 Map</a>'),
+    # Short Creek (StreamBeam)
+    "1": (' <a href="https://maps.app.goo.gl/S7sgCqGY2Hg43J5H9" '
+        'target="_blank" class="location-link">📍 Put in</a> '
+        '<a href="https://maps.app.goo.gl/D2QKT4HobnhpRnnVA" '
+        'target="_blank" class="location-link">🏁 Take out</a>'),
+}
+
+
 def get_location_links(site_id: str, tva_site_code: Optional[str]) -> str:
     """
     Get location links HTML for a river site.
@@ -77,118 +210,233 @@ def get_location_links(site_id: str, tva_site_code: Optional[str]) -> str:
     Returns:
         HTML string with location links
     """
-    # TVA sites
-    if tva_site_code == "HADT1":
-        return (' <a href="https://www.google.com/maps/place/35%C2%B010%2724.7%22N+84%C2%B023%2701.4%22W/@35.1713452,-84.38115,16.39z" '
-                'target="_blank" class="location-link">📍 Put in</a> '
-                '<a href="https://www.google.com/maps/place/35%C2%B010%2752.5%22N+84%C2%B026%2719.1%22W/@35.1816932,-84.4346579,16.39z" '
-                'target="_blank" class="location-link">🏁 Take out</a>')
-
-    if tva_site_code == "OCCT1":
-        return (' <a href="https://www.google.com/maps/place/Ocoee+Whitewater+Center/@35.0619844,-84.4296477,17z" '
-                'target="_blank" class="location-link">📍 Upper Ocoee Put-in (Olympic)</a> '
-                '<a href="https://www.tva.com/environment/lake-levels/ocoee-3" '
-                'target="_blank" class="location-link">📅 Upper Ocoee Info</a>')
-
-    if tva_site_code == "OCBT1":
-        return (' <a href="https://maps.app.goo.gl/5cD9XmDBaiu6kZVy9" '
-                'target="_blank" class="location-link">📍 Middle Ocoee Put-in</a> '
-                '<a href="https://maps.app.goo.gl/nzEjdqdPwLac6nMp8" '
-                'target="_blank" class="location-link">🏁 Take-out</a> '
-                '<a href="https://www.tva.com/environment/lake-levels/ocoee-2/recreation-release-calendar" '
-                'target="_blank" class="location-link">📅 Middle Ocoee Release Schedule</a>')
-
-    if tva_site_code == "OCAT1":
-        return (' <a href="https://www.google.com/maps/place/Parksville+Lake/@35.0950,-84.6470,15z" '
-                'target="_blank" class="location-link">📍 Parksville Dam</a> '
-                '<a href="https://www.tva.com/environment/lake-levels/ocoee-1" '
-                'target="_blank" class="location-link">📅 Lower Ocoee Info</a>')
-
-    # USGS sites
-    if site_id == "02399200":  # Little River Canyon
-        return (' <a href="https://www.google.com/maps/dir/Little+River+Canyon+Kayak+Put+In//@34.3914776,-85.6250722,19z" '
-                'target="_blank" class="location-link">🚀 Suicide put in</a> '
-                '<a href="https://maps.app.goo.gl/WuMrPD13zbDKwzwx6" '
-                'target="_blank" class="location-link">📍 Eberhart Point</a> '
-                '<a href="https://maps.app.goo.gl/xV6Db9HyhbhEe8sT6" '
-                'target="_blank" class="location-link">🥾 Powell Trail</a> '
-                '<a href="https://maps.app.goo.gl/Rt7pv8qZzzUsFFh37" '
-                'target="_blank" class="location-link">🏁 Chair Lift Take Out</a>')
-
-    if site_id == "02455000":  # Locust Fork
-        return (' <a href="https://maps.app.goo.gl/VxoBRfDEiznaJEuR6" '
-                'target="_blank" class="location-link">📍 Upper put in</a> '
-                '<a href="https://maps.app.goo.gl/yW8uYJAUbpub1bQX8" '
-                'target="_blank" class="location-link">📍 OLD Upper put in</a> '
-                '<a href="https://maps.app.goo.gl/KsminZcRhyHsQi4s9" '
-                'target="_blank" class="location-link">📍 Kings Bend put in</a> '
-                '<a href="https://maps.app.goo.gl/8QTdmaYiyBWgdB7G6" '
-                'target="_blank" class="location-link">🏁 Take out</a>')
-
-    if site_id == "02341460":  # Rush South (Columbus GA)
-        return (' <a href="https://rushsouth.com/" '
-                'target="_blank" class="location-link">🌊 RushSouth Whitewater Park</a> '
-                '<a href="https://lakes.southernco.com/" '
-                'target="_blank" class="location-link">📊 GA Power Lake Levels</a> '
-                '<a href="https://www.google.com/maps/place/RushSouth+Whitewater+Park/@32.4697,-84.9935,16z" '
-                'target="_blank" class="location-link">📍 Map</a>')
-
-    if site_id == "1":  # Short Creek (StreamBeam)
-        return (' <a href="https://maps.app.goo.gl/S7sgCqGY2Hg43J5H9" '
-                'target="_blank" class="location-link">📍 Put in</a> '
-                '<a href="https://maps.app.goo.gl/D2QKT4HobnhpRnnVA" '
-                'target="_blank" class="location-link">🏁 Take out</a>')
-
-    return ""
-
-
-def fetch_usgs_7day_data(site_id: str, parameter_code: str) -> List[Tuple[str, float]]:
+    return _LINKS_BY_TVA.get(tva_site_code) or _LINKS_BY_USGS.get(site_id, "")
+
+
+# Optional SQLite cache for USGS IV history (disabled unless USGS_IV_CACHE is set
+# or a cache_path is passed in). USGS only publishes new readings every 15-60
+# minutes, so a short TTL saves most detail-page requests. Entries are also
+# dropped at each quarter-hour boundary, when new 15-minute readings can land.
+USGS_IV_CACHE = os.environ.get("USGS_IV_CACHE")
+USGS_IV_TTL_MINUTES = int(os.environ.get("USGS_IV_TTL_MINUTES", "10"))
+USGS_IV_BUCKET_SECONDS = 900
+
+
+def _iv_cache_connect(cache_path: str) -> sqlite3.Connection:
+    """Open the IV cache, creating its table if this is a new file."""
+    conn = sqlite3.connect(cache_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS usgs_iv_cache (
+            key TEXT PRIMARY KEY,
+            fetched_at INTEGER NOT NULL,
+            payload TEXT NOT NULL
+        )
+    """)
+    return conn
+
+
+def _iv_cache_get(cache_path: str, key: str) -> Optional[List[Tuple[str, float]]]:
+    """Return cached IV history for key, or None if missing/expired."""
+    conn = _iv_cache_connect(cache_path)
+    try:
+        row = conn.execute(
+            "SELECT fetched_at, payload FROM usgs_iv_cache WHERE key = ?", (key,)
+        ).fetchone()
+        now = int(time.time())
+        if not row or now - row[0] > USGS_IV_TTL_MINUTES * 60:
+            return None
+        if now // USGS_IV_BUCKET_SECONDS != row[0] // USGS_IV_BUCKET_SECONDS:
+            return None
+        return [(ts, val) for ts, val in _json_loads(row[1])]
+    finally:
+        conn.close()
+
+
+def _iv_cache_put(cache_path: str, key: str, result: List[Tuple[str, float]]) -> None:
+    """Store IV history for key."""
+    conn = _iv_cache_connect(cache_path)
+    try:
+        conn.execute(
+            "REPLACE INTO usgs_iv_cache (key, fetched_at, payload) VALUES (?, ?, ?)",
+            (key, int(time.time()), _json_dumps(result))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# Shared keep-alive session for USGS requests. The pool is sized for
+# prefetch_usgs_7day_data()'s worker count so connections are reused.
+_USGS_SESSION = requests.Session()
+_USGS_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=16))
+
+# ijson prefixes for the readings of the first series in a USGS IV response
+_IV_VALUES_PREFIX = "value.timeSeries.item.values.item.value"
+_IV_ITEM_PREFIX = _IV_VALUES_PREFIX + ".item"
+
+
+if MSGSPEC_AVAILABLE:
+    class _IVReading(msgspec.Struct):
+        dateTime: Optional[str] = None
+        value: Optional[str] = None
+
+    class _IVValues(msgspec.Struct):
+        value: List[_IVReading] = []
+
+    class _IVVariableCode(msgspec.Struct):
+        value: Optional[str] = None
+
+    class _IVVariable(msgspec.Struct):
+        variableCode: List[_IVVariableCode] = []
+
+    class _IVSeries(msgspec.Struct):
+        variable: _IVVariable = msgspec.field(default_factory=_IVVariable)
+        values: List[_IVValues] = []
+
+    class _IVValue(msgspec.Struct):
+        timeSeries: List[_IVSeries] = []
+
+    class _IVResponse(msgspec.Struct):
+        value: _IVValue = msgspec.field(default_factory=_IVValue)
+
+    _IV_DECODER = msgspec.json.Decoder(_IVResponse)
+
+
+def _decode_iv_pairs(content: bytes) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Decode a USGS IV JSON body with msgspec into (dateTime, value) string
+    pairs from the first value block of the first time series.
+    """
+    series = _IV_DECODER.decode(content).value.timeSeries
+    if not series or not series[0].values:
+        return []
+    return [(r.dateTime, r.value) for r in series[0].values[0].value]
+
+
+def _split_iv_series(content: bytes) -> Dict[str, List[Tuple[Optional[str], Optional[str]]]]:
+    """
+    Decode a multi-parameter USGS IV JSON body into (dateTime, value) string
+    pairs keyed by parameter code. Like the single-parameter path, only the
+    first value block of the first series for each code is used.
+    """
+    by_code = {}
+    if MSGSPEC_AVAILABLE:
+        for series in _IV_DECODER.decode(content).value.timeSeries:
+            codes = series.variable.variableCode
+            code = codes[0].value if codes else None
+            if code and code not in by_code and series.values:
+                by_code[code] = [(r.dateTime, r.value) for r in series.values[0].value]
+        return by_code
+
+    data = _json_loads(content)
+    for series in data.get("value", {}).get("timeSeries", []):
+        codes = series.get("variable", {}).get("variableCode") or [{}]
+        code = codes[0].get("value")
+        if code and code not in by_code:
+            blocks = series.get("values") or [{}]
+            by_code[code] = [(item.get("dateTime"), item.get("value")) for item in blocks[0].get("value", [])]
+    return by_code
+
+
+def _parse_iv_pairs(pairs: List[Tuple[Optional[str], Optional[str]]]) -> List[Tuple[str, float]]:
+    """Convert (dateTime, value) string pairs to floats, skipping bad readings."""
+    result = []
+    for dt_str, val_str in pairs:
+        if dt_str and val_str:
+            try:
+                val = float(val_str)
+            except (ValueError, TypeError):
+                continue
+            # USGS can report "NaN" for a missing reading
+            if math.isfinite(val):
+                result.append((dt_str, val))
+    return result
+
+
+def _iter_iv_values(stream: Any):
+    """
+    Yield (dateTime, value) string pairs from a USGS IV JSON stream.
+
+    Only the first value block of the first time series is read (the same
+    data the json.loads path uses); parsing stops as soon as it ends.
+    """
+    dt_str = val_str = None
+    for prefix, event, value in ijson.parse(stream):
+        if prefix == _IV_ITEM_PREFIX + ".dateTime":
+            dt_str = value
+        elif prefix == _IV_ITEM_PREFIX + ".value":
+            val_str = value
+        elif prefix == _IV_ITEM_PREFIX and event == "end_map":
+            yield dt_str, val_str
+            dt_str = val_str = None
+        elif prefix == _IV_VALUES_PREFIX and event == "end_array":
+            return
+
+
+def fetch_usgs_7day_data(
+    site_id: str,
+    parameter_code: str,
+    cache_path: Optional[str] = None
+) -> List[Tuple[str, float]]:
     """
     Fetch 3 days of historical data from USGS IV service.
 
     Args:
         site_id: USGS site number (e.g., "02455000")
         parameter_code: "00060" for discharge (CFS) or "00065" for gage height (feet)
+        cache_path: SQLite cache file (defaults to USGS_IV_CACHE; no caching if unset)
 
     Returns:
-        List of (timestamp_iso, value) tuples
+        List of (timestamp_iso, value) tuples, oldest first. Chart code splits
+        these into parallel label/value lists with format_chart_series().
     """
-    end_date = datetime.now(timezone.utc)
-    start_date = end_date - timedelta(days=3)
+    cache_path = cache_path or USGS_IV_CACHE
+    cache_key = f"{site_id}:{parameter_code}"
+    if cache_path:
+        try:
+            cached = _iv_cache_get(cache_path, cache_key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            print(f"[USGS Cache] Read failed for {cache_key}: {e}")
 
+    # ISO-8601 period relative to now; no start/end timestamps to format
     params = {
         "sites": site_id,
         "parameterCd": parameter_code,
-        "startDT": start_date.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-        "endDT": end_date.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "period": "P3D",
         "siteStatus": "all",
         "format": "json"
     }
 
-    url = f"https://waterservices.usgs.gov/nwis/iv/?{urllib.parse.urlencode(params)}"
+    url = "https://waterservices.usgs.gov/nwis/iv/"
 
     try:
-        with urllib.request.urlopen(url, timeout=30) as response:
-            data = json.loads(response.read())
+        stream = IJSON_AVAILABLE and not MSGSPEC_AVAILABLE
+        with _USGS_SESSION.get(url, params=params, timeout=30, stream=stream) as response:
+            response.raise_for_status()
+            if MSGSPEC_AVAILABLE:
+                pairs = _decode_iv_pairs(response.content)
+            elif IJSON_AVAILABLE:
+                response.raw.decode_content = True
+                pairs = list(_iter_iv_values(response.raw))
+            else:
+                data = _json_loads(response.content)
 
-        time_series = data.get("value", {}).get("timeSeries", [])
-        if not time_series:
-            return []
+                time_series = data.get("value", {}).get("timeSeries", [])
+                if not time_series:
+                    return []
 
-        values = time_series[0].get("values", [{}])[0].get("value", [])
+                values = time_series[0].get("values", [{}])[0].get("value", [])
+                pairs = [(item.get("dateTime"), item.get("value")) for item in values]
 
-        # Extract (datetime, value) pairs
-        result = []
-        for item in values:
-            dt_str = item.get("dateTime")
-            val_str = item.get("value")
+        result = _parse_iv_pairs(pairs)
 
-            if dt_str and val_str:
-                try:
-                    val = float(val_str)
-                    result.append((dt_str, val))
-                except (ValueError, TypeError):
-                    continue
+        if cache_path and result:
+            try:
+                _iv_cache_put(cache_path, cache_key, result)
+            except Exception as e:
+                print(f"[USGS Cache] Write failed for {cache_key}: {e}")
 
         return result
 
@@ -196,509 +444,306 @@ def fetch_usgs_7day_data(site_id: str, parameter_code: str) -> List[Tuple[str, f
         print(f"Error fetching USGS data for {site_id} parameter {parameter_code}: {e}")
         return []
 
-def generate_site_detail_html(site_data: Dict[str, Any], cfs_history: List[Tuple[str, float]], feet_history: List[Tuple[str, float]]) -> str:
+def fetch_usgs_7day_multi(
+    site_id: str,
+    parameter_codes: List[str],
+    cache_path: Optional[str] = None
+) -> Dict[str, List[Tuple[str, float]]]:
     """
-    Generate Google Analytics-style HTML dashboard for a river site.
+    Fetch 3 days of IV history for several parameters in one USGS request.
+
+    Cached parameters are served from the IV cache; the rest are requested
+    together with a comma-joined parameterCd.
 
     Args:
-        site_data: Dict with site info (name, current cfs, current ft, etc.)
-        cfs_history: List of (timestamp, cfs) tuples for 7 days
-        feet_history: List of (timestamp, feet) tuples for 7 days
+        site_id: USGS site number (e.g., "02455000")
+        parameter_codes: Parameter codes, e.g. ["00060", "00065"]
+        cache_path: SQLite cache file (defaults to USGS_IV_CACHE; no caching if unset)
 
     Returns:
-        HTML string
+        Dict mapping each parameter code to its (timestamp_iso, value) list
+        (empty if the site doesn't report it or the request failed)
     """
-    h = html.escape
+    cache_path = cache_path or USGS_IV_CACHE
+    results = {}
+    missing = []
+    for code in parameter_codes:
+        cached = None
+        if cache_path:
+            try:
+                cached = _iv_cache_get(cache_path, f"{site_id}:{code}")
+            except Exception as e:
+                print(f"[USGS Cache] Read failed for {site_id}:{code}: {e}")
+        if cached is not None:
+            results[code] = cached
+        else:
+            missing.append(code)
+    if not missing:
+        return results
 
-    site_name = site_data.get("name", "River Site")
-    site_id = site_data.get("site", "")
-    current_cfs = site_data.get("cfs")
-    current_ft = site_data.get("stage_ft")
+    params = {
+        "sites": site_id,
+        "parameterCd": ",".join(missing),
+        "period": "P3D",
+        "siteStatus": "all",
+        "format": "json"
+    }
 
-    # StreamBeam sites only have feet data, no CFS
-    is_streambeam = site_data.get("is_streambeam", False) or site_id == "1"
+    try:
+        with _USGS_SESSION.get("https://waterservices.usgs.gov/nwis/iv/", params=params, timeout=30) as response:
+            response.raise_for_status()
+            by_code = _split_iv_series(response.content)
+    except Exception as e:
+        print(f"Error fetching USGS data for {site_id} parameters {','.join(missing)}: {e}")
+        by_code = {}
 
-    # Locust Fork - hide CFS chart (user preference - feet-based river)
-    hide_cfs_chart = site_id == "02455000"
+    for code in missing:
+        result = _parse_iv_pairs(by_code.get(code, []))
+        if cache_path and result:
+            try:
+                _iv_cache_put(cache_path, f"{site_id}:{code}", result)
+            except Exception as e:
+                print(f"[USGS Cache] Write failed for {site_id}:{code}: {e}")
+        results[code] = result
+    return results
 
-    # Little River Canyon has special 6-level flow classification
-    is_lrc = site_id == "02399200"
 
-    # North Chickamauga has visual gauge conversion
-    # Visual = 0.69 × USGS_Stage - 1.89
-    is_north_chick = site_id == "03566535"
-    visual_threshold = 1.7  # Runnable threshold in visual feet
+def fetch_usgs_7day_both(
+    site_id: str,
+    cache_path: Optional[str] = None
+) -> Tuple[List[Tuple[str, float]], List[Tuple[str, float]]]:
+    """
+    Fetch discharge and gage height history for a site in one request.
 
-    # LRC flow guide levels and colors (from Adam Goshorn)
-    lrc_levels = [
-        {"min": 0, "max": 250, "label": "Not Runnable", "color": "#9ca3af"},
-        {"min": 250, "max": 400, "label": "Good Low", "color": "#fbbf24"},
-        {"min": 400, "max": 800, "label": "Shitty Medium", "color": "#a67c52"},
-        {"min": 800, "max": 1500, "label": "Good Medium", "color": "#86efac"},
-        {"min": 1500, "max": 2500, "label": "BEST!", "color": "#22c55e"},
-        {"min": 2500, "max": 99999, "label": "Too High", "color": "#ef4444"},
-    ]
-
-    # North Chickamauga visual gauge levels (from Bard Trimble)
-    # These are VISUAL gauge feet at the take-out, not USGS stage
-    bard_levels = [
-        {"min": -99, "max": 1.5, "label": "Too Low", "color": "#9ca3af"},
-        {"min": 1.5, "max": 2.0, "label": "Low", "color": "#fbbf24"},
-        {"min": 2.0, "max": 2.5, "label": "Worth It", "color": "#86efac"},
-        {"min": 2.5, "max": 3.2, "label": "Good", "color": "#22c55e"},
-        {"min": 3.2, "max": 3.5, "label": "Meaty", "color": "#3b82f6"},
-        {"min": 3.5, "max": 4.0, "label": "High", "color": "#f97316"},
-        {"min": 4.0, "max": 99, "label": "Too High", "color": "#ef4444"},
-    ]
-    current_temp = site_data.get("temp_f")
-    current_wind_mph = site_data.get("wind_mph")
-    current_wind_dir = site_data.get("wind_dir", "")
-    threshold_ft = site_data.get("threshold_ft")
-    threshold_cfs = site_data.get("threshold_cfs")
-    in_range = site_data.get("in_range", False)
-    last_in_time = site_data.get("last_in_time")  # Human-readable time when it went green
+    Args:
+        site_id: USGS site number (e.g., "02455000")
+        cache_path: SQLite cache file (defaults to USGS_IV_CACHE; no caching if unset)
 
-    # Prepare data for Chart.js - format timestamps as readable strings
-    cfs_labels = []
-    cfs_values = []
-    for ts, val in cfs_history:
-        try:
-            # Parse ISO timestamp and format as "MMM D h:mm a"
-            dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-            label = dt.strftime("%b %d %I:%M %p")
-            cfs_labels.append(label)
-            cfs_values.append(val)
-        except Exception:
-            continue
+    Returns:
+        Tuple of (cfs_history, feet_history)
+    """
+    histories = fetch_usgs_7day_multi(site_id, ["00060", "00065"], cache_path=cache_path)
+    return histories["00060"], histories["00065"]
 
-    feet_labels = []
-    feet_values = []
-    for ts, val in feet_history:
-        try:
-            dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-            label = dt.strftime("%b %d %I:%M %p")
-            feet_labels.append(label)
-            feet_values.append(val)
-        except Exception:
-            continue
 
-    # Calculate visual gauge values for North Chickamauga
-    # Formula: Visual = 0.69 × USGS_Stage - 1.89
-    visual_values = []
-    if is_north_chick and feet_values:
-        visual_values = [0.69 * ft - 1.89 for ft in feet_values]
-        current_visual = 0.69 * (current_ft or 0) - 1.89 if current_ft else None
-    else:
-        current_visual = None
+def prefetch_usgs_7day_data(
+    site_ids: List[str],
+    max_workers: int = 16,
+    cache_path: Optional[str] = None
+) -> Dict[str, Tuple[List[Tuple[str, float]], List[Tuple[str, float]]]]:
+    """
+    Fetch discharge and gage height history for many sites at once.
 
-    # Calculate stats (7-day range, but 3-day average)
-    # 3 days of data at 15-min intervals = 288 points
-    three_day_points = 288
+    Each site's discharge and gage height come back from a single request;
+    the per-site requests run on one shared thread pool.
 
-    if cfs_values:
-        # Use last 3 days for average, full range for min/max
-        recent_cfs = cfs_values[-three_day_points:] if len(cfs_values) > three_day_points else cfs_values
-        avg_cfs = sum(recent_cfs) / len(recent_cfs)
-        max_cfs = max(cfs_values)
-        min_cfs = min(cfs_values)
-    else:
-        avg_cfs = max_cfs = min_cfs = 0
-
-    if feet_values:
-        # Use last 3 days for average, full range for min/max
-        recent_ft = feet_values[-three_day_points:] if len(feet_values) > three_day_points else feet_values
-        avg_ft = sum(recent_ft) / len(recent_ft)
-        max_ft = max(feet_values)
-        min_ft = min(feet_values)
-    else:
-        avg_ft = max_ft = min_ft = 0
+    Args:
+        site_ids: USGS site numbers
+        max_workers: Maximum concurrent USGS requests
+        cache_path: SQLite cache file (defaults to USGS_IV_CACHE; no caching if unset)
 
-    # Calculate visual gauge stats for North Chickamauga
-    if visual_values:
-        recent_visual = visual_values[-three_day_points:] if len(visual_values) > three_day_points else visual_values
-        avg_visual = sum(recent_visual) / len(recent_visual)
-        max_visual = max(visual_values)
-        min_visual = min(visual_values)
-    else:
-        avg_visual = max_visual = min_visual = 0
+    Returns:
+        Dict mapping site_id to (cfs_history, feet_history)
+    """
+    site_ids = list(dict.fromkeys(site_ids))
+    if not site_ids:
+        return {}
 
-    # Calculate level prediction (when will it reach threshold?)
-    level_prediction = None
-    if feet_values and len(feet_values) >= 32 and threshold_ft is not None:
-        current_level = feet_values[-1]
-
-        # Find peak in the data
-        peak_val = max(feet_values)
-        peak_idx = feet_values.index(peak_val)
-
-        # Calculate rate over last 8 hours (32 readings at 15-min intervals)
-        # Using 8 hours provides a more stable/representative rate than shorter windows
-        points_8h = 32
-        if len(feet_values) >= points_8h:
-            level_8h_ago = feet_values[-points_8h]
-            change_8h = current_level - level_8h_ago  # positive = rising, negative = falling
-            rate_per_hour = change_8h / 8.0
-
-            # Determine trend
-            if abs(rate_per_hour) < 0.005:
-                trend = "steady"
-                trend_icon = "→"
-                trend_color = "#6b7280"
-            elif rate_per_hour > 0:
-                trend = "rising"
-                trend_icon = "↗"
-                trend_color = "#22c55e"
-            else:
-                trend = "falling"
-                trend_icon = "↘"
-                trend_color = "#f59e0b"
-
-            # Calculate ETA to threshold
-            eta_hours = None
-            eta_text = None
-            distance_to_threshold = current_level - threshold_ft
-
-            if trend == "falling" and current_level > threshold_ft:
-                # Falling toward threshold - predict when we'll reach it
-                if rate_per_hour < 0:
-                    eta_hours = distance_to_threshold / abs(rate_per_hour)
-                    if eta_hours < 1:
-                        eta_text = f"~{int(eta_hours * 60)} minutes"
-                    elif eta_hours < 24:
-                        eta_text = f"~{eta_hours:.1f} hours"
-                    else:
-                        eta_text = f"~{eta_hours / 24:.1f} days"
-            elif trend == "rising" and current_level < threshold_ft:
-                # Rising toward threshold - predict when we'll reach it
-                if rate_per_hour > 0:
-                    eta_hours = abs(distance_to_threshold) / rate_per_hour
-                    if eta_hours < 1:
-                        eta_text = f"~{int(eta_hours * 60)} minutes"
-                    elif eta_hours < 24:
-                        eta_text = f"~{eta_hours:.1f} hours"
-                    else:
-                        eta_text = f"~{eta_hours / 24:.1f} days"
-
-            level_prediction = {
-                "current": current_level,
-                "threshold": threshold_ft,
-                "peak": peak_val,
-                "trend": trend,
-                "trend_icon": trend_icon,
-                "trend_color": trend_color,
-                "rate_per_hour": abs(rate_per_hour),
-                "change_8h": abs(change_8h),
-                "distance_to_threshold": abs(distance_to_threshold),
-                "eta_hours": eta_hours,
-                "eta_text": eta_text,
-                "above_threshold": current_level >= threshold_ft,
-                "unit": "ft"
-            }
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = {site_id: ex.submit(fetch_usgs_7day_both, site_id, cache_path) for site_id in site_ids}
+        return {site_id: f.result() for site_id, f in futures.items()}
 
-    # CFS-based level prediction for rivers like Little River Canyon
-    if level_prediction is None and cfs_values and len(cfs_values) >= 32 and threshold_cfs is not None:
-        current_cfs = cfs_values[-1]
 
-        # Find peak in the data
-        peak_cfs = max(cfs_values)
-
-        # Calculate rate over last 8 hours (32 readings at 15-min intervals)
-        points_8h = 32
-        if len(cfs_values) >= points_8h:
-            cfs_8h_ago = cfs_values[-points_8h]
-            change_8h = current_cfs - cfs_8h_ago  # positive = rising, negative = falling
-            rate_per_hour = change_8h / 8.0
-
-            # Determine trend (using larger threshold for CFS since values are bigger)
-            if abs(rate_per_hour) < 1.0:  # Less than 1 CFS/hr is steady
-                trend = "steady"
-                trend_icon = "→"
-                trend_color = "#6b7280"
-            elif rate_per_hour > 0:
-                trend = "rising"
-                trend_icon = "↗"
-                trend_color = "#22c55e"
-            else:
-                trend = "falling"
-                trend_icon = "↘"
-                trend_color = "#f59e0b"
-
-            # Calculate ETA to threshold
-            eta_hours = None
-            eta_text = None
-            distance_to_threshold = current_cfs - threshold_cfs
-
-            if trend == "falling" and current_cfs > threshold_cfs:
-                # Falling toward threshold - predict when we'll drop below it
-                if rate_per_hour < 0:
-                    eta_hours = distance_to_threshold / abs(rate_per_hour)
-                    if eta_hours < 1:
-                        eta_text = f"~{int(eta_hours * 60)} minutes"
-                    elif eta_hours < 24:
-                        eta_text = f"~{eta_hours:.1f} hours"
-                    else:
-                        eta_text = f"~{eta_hours / 24:.1f} days"
-            elif trend == "rising" and current_cfs < threshold_cfs:
-                # Rising toward threshold - predict when we'll reach it
-                if rate_per_hour > 0:
-                    eta_hours = abs(distance_to_threshold) / rate_per_hour
-                    if eta_hours < 1:
-                        eta_text = f"~{int(eta_hours * 60)} minutes"
-                    elif eta_hours < 24:
-                        eta_text = f"~{eta_hours:.1f} hours"
-                    else:
-                        eta_text = f"~{eta_hours / 24:.1f} days"
-
-            level_prediction = {
-                "current": current_cfs,
-                "threshold": threshold_cfs,
-                "peak": peak_cfs,
-                "trend": trend,
-                "trend_icon": trend_icon,
-                "trend_color": trend_color,
-                "rate_per_hour": abs(rate_per_hour),
-                "change_8h": abs(change_8h),
-                "distance_to_threshold": abs(distance_to_threshold),
-                "eta_hours": eta_hours,
-                "eta_text": eta_text,
-                "above_threshold": current_cfs >= threshold_cfs,
-                "unit": "cfs"
-            }
+# Chart x-axis label format ("Dec 01 02:15 PM")
+CHART_LABEL_FMT = "%b %d %I:%M %p"
 
-    # Determine status text and color
-    # Little River Canyon uses special 6-level classification
-    if is_lrc and current_cfs is not None:
-        # Find matching zone from lrc_levels
-        for level in lrc_levels:
-            if level["min"] <= current_cfs < level["max"]:
-                status_text = level["label"].upper()
-                status_color = level["color"]
-                break
-        else:
-            # Fallback if no zone matched (shouldn't happen)
-            status_text = "UNKNOWN"
-            status_color = "#9ca3af"
-    else:
-        status_color = "#4ade80" if in_range else "#ef4444"
-        status_text = "RUNNABLE" if in_range else "TOO LOW"
+_MONTH_ABBR = ("", "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 
-    # Build threshold display
-    threshold_parts = []
-    if threshold_ft is not None:
-        threshold_parts.append(f"{threshold_ft:.2f} ft")
-    if threshold_cfs is not None:
-        threshold_parts.append(f"{int(threshold_cfs):,} CFS")
-    threshold_str = " & ".join(threshold_parts) if threshold_parts else "No threshold set"
+# "%I:%M %p" pieces for each hour of the day: (hour_12, am_pm)
+_HOUR_12 = tuple((f"{(hr % 12) or 12:02d}", "AM" if hr < 12 else "PM") for hr in range(24))
 
-    # Last runnable time
-    last_runnable = last_in_time if last_in_time else "Never recorded"
 
-    # Check for TVA source and generate forecast panel
-    is_tva = site_data.get("is_tva", False)
-    tva_site_code = site_data.get("tva_site_code")
-    tva_forecast_html = ""
-    if is_tva and tva_site_code and TVA_FORECAST_AVAILABLE:
-        try:
-            runnable_threshold = int(threshold_cfs) if threshold_cfs else 3000
-            tva_forecast_html = generate_tva_forecast_html(tva_site_code, runnable_threshold)
-        except Exception as e:
-            print(f"[DETAIL] TVA forecast generation failed: {e}")
-            tva_forecast_html = ""
+# Discharge and gage height are sampled at the same instants, so each
+# timestamp is formatted once and reused for the second series.
+@lru_cache(maxsize=4096)
+def _format_chart_label(ts: str) -> str:
+    """
+    Format an ISO timestamp as "MMM DD hh:mm AM" in the timestamp's own
+    offset, the same as datetime.fromisoformat(ts).strftime("%b %d %I:%M %p").
 
-    # Get wind chill from passed data, or calculate if not provided
-    wind_chill_temp = site_data.get("wind_chill_f")
-    wind_chill_emoji = site_data.get("wind_chill_emoji")
-    wind_chill_desc = site_data.get("wind_chill_desc")
+    USGS timestamps are fixed-width ("2025-12-01T14:15:00.000-06:00"), so
+    the fields are sliced out directly; anything else goes through datetime.
+    """
+    if len(ts) >= 16 and ts[4] == '-' and ts[7] == '-' and ts[10] == 'T' and ts[13] == ':':
+        try:
+            month = int(ts[5:7])
+            hr = int(ts[11:13])
+            if 1 <= month <= 12 and hr < 24 and ts[8:10].isdigit() and ts[14:16].isdigit():
+                hour_12, am_pm = _HOUR_12[hr]
+                return f"{_MONTH_ABBR[month]} {ts[8:10]} {hour_12}:{ts[14:16]} {am_pm}"
+        except ValueError:
+            pass
+    if ts.endswith('Z'):
+        ts = ts[:-1] + '+00:00'
+    return datetime.fromisoformat(ts).strftime(CHART_LABEL_FMT)
+
+
+def format_chart_series(history: List[Tuple[str, float]]) -> Tuple[List[str], List[float]]:
+    """
+    Split a (timestamp, value) history into Chart.js labels and values.
 
-    # If wind chill wasn't pre-calculated, calculate it now
-    if wind_chill_temp is None and current_temp is not None and current_wind_mph is not None:
-        wind_chill_temp, wind_chill_emoji, wind_chill_desc = calculate_wind_chill(current_temp, current_wind_mph)
+    Entries whose timestamp can't be parsed are dropped.
 
-    # Extract rainfall data
-    precip_today = site_data.get("precip_today_in")
-    pws_station = site_data.get("pws_station")
-    pws_label = site_data.get("pws_label")
-    rainfall_48h = site_data.get("rainfall_48h", {})
-    rainfall_7d = site_data.get("rainfall_7d", {})
-    rainfall_30d = site_data.get("rainfall_30d", {})
+    Args:
+        history: List of (timestamp_iso, value) tuples
 
-    # Extract rainfall stats
-    rain_48h_total = rainfall_48h.get("total_precip_in", 0)
-    rain_7d_total = rainfall_7d.get("total_precip_in", 0)
-    rain_7d_rainy_days = rainfall_7d.get("rainy_days", 0)
-    rain_30d_total = rainfall_30d.get("total_precip_in", 0)
-    rain_30d_rainy_days = rainfall_30d.get("rainy_days", 0)
+    Returns:
+        Tuple of (labels, values)
+    """
+    fmt = _format_chart_label
+    # Fast path: USGS histories are normally all well-formed
+    try:
+        return [fmt(ts) for ts, _ in history], [val for _, val in history]
+    except Exception:
+        pass
 
-    # Prepare rainfall chart data (daily totals for 7 days)
-    rainfall_daily = site_data.get("rainfall_daily", [])
-    rain_labels = []
-    rain_values = []
-    for day in rainfall_daily:
+    labels = []
+    values = []
+    for ts, val in history:
         try:
-            # Parse date and format as "Mon Jan 2"
-            dt = datetime.strptime(day.get("date", ""), "%Y-%m-%d")
-            label = dt.strftime("%a %b %d")
-            rain_labels.append(label)
-            rain_values.append(day.get("precip_in", 0) or 0)
+            labels.append(fmt(ts))
         except Exception:
             continue
+        values.append(val)
+    return labels, values
 
-    # Calculate rainfall chart stats
-    if rain_values:
-        avg_rain = sum(rain_values) / len(rain_values)
-        max_rain = max(rain_values)
-        total_rain = sum(rain_values)
-    else:
-        avg_rain = max_rain = total_rain = 0
 
-    # Extract QPF (forecast) data for chart
-    qpf_data = site_data.get("qpf", {}) or {}
-    qpf_labels = []
-    qpf_values = []
-    if qpf_data:
-        # QPF data comes as {date_str: inches, ...} sorted by date
-        today = datetime.now().date()
-        sorted_dates = sorted(qpf_data.keys())
-        for date_str in sorted_dates:
-            try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d").date()
-                # Label: Today, Tomorrow, or day name
-                days_diff = (dt - today).days
-                if days_diff == 0:
-                    label = "Today (QPF)"
-                elif days_diff == 1:
-                    label = "Tomorrow (QPF)"
-                else:
-                    label = dt.strftime("%a (QPF)")
-                qpf_labels.append(label)
-                qpf_values.append(qpf_data[date_str] or 0)
-            except Exception:
-                continue
+def _strip_indent(text: str) -> str:
+    """
+    Drop indentation and blank lines from static CSS/JS. Line breaks are
+    kept, so // comments and statements without semicolons are unaffected.
+    """
+    return "".join(line.strip() + "\n" for line in text.splitlines() if line.strip())
 
-    # Calculate total QPF forecast
-    total_qpf = sum(qpf_values) if qpf_values else 0
 
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>{h(site_name)} - River Dashboard</title>
-{"" if is_tva else '<script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>'}
-<style>
-* {{ margin: 0; padding: 0; box-sizing: border-box; }}
-body {{
+# Static dashboard stylesheet. Kept out of the page f-string so it isn't
+# re-formatted on every render; the only per-site value (the status badge
+# background) is spliced in between the two halves.
+_DETAIL_CSS_HEAD = _strip_indent("""* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
   font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
   background: #f5f5f5;
   padding: 20px;
-}}
-.container {{ max-width: 1200px; margin: 0 auto; }}
-.header {{
+}
+.container { max-width: 1200px; margin: 0 auto; }
+.header {
   background: white;
   padding: 20px;
   margin-bottom: 20px;
   border-radius: 8px;
   box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-}}
-.header h1 {{
+}
+.header h1 {
   font-size: 28px;
   color: #333;
   margin-bottom: 8px;
-}}
-.header .status {{
+}
+.header .status {
   display: inline-block;
   padding: 6px 12px;
   border-radius: 4px;
   font-weight: bold;
   font-size: 14px;
   color: white;
-  background: {status_color};
-}}
-.header .meta {{
+""")
+
+_DETAIL_CSS_TAIL = _strip_indent("""}
+.header .meta {
   margin-top: 12px;
   font-size: 14px;
   color: #666;
-}}
-.header .meta span {{
+}
+.header .meta span {
   margin-right: 20px;
-}}
+}
 
-.chart-row {{
+.chart-row {
   display: grid;
   grid-template-columns: 1fr;
   gap: 20px;
   margin-bottom: 20px;
-}}
+}
 
-.chart-box {{
+.chart-box {
   background: white;
   padding: 20px;
   border-radius: 8px;
   box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-}}
-.chart-box h2 {{
+}
+.chart-box h2 {
   font-size: 18px;
   color: #555;
   margin-bottom: 4px;
   font-weight: 600;
-}}
-.chart-box .chart-value {{
+}
+.chart-box .chart-value {
   font-size: 32px;
   font-weight: bold;
   color: #1a73e8;
   margin-bottom: 8px;
-}}
-.chart-box .chart-meta {{
+}
+.chart-box .chart-meta {
   font-size: 13px;
   color: #888;
   margin-bottom: 16px;
-}}
-.chart-canvas {{
+}
+.chart-canvas {
   position: relative;
   height: 300px;
   background: #f8fbff;
   border-radius: 4px;
   padding: 10px;
-}}
+}
 
-.stats-grid {{
+.stats-grid {
   display: grid;
   grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
   gap: 20px;
   margin-bottom: 20px;
-}}
-.stat-box {{
+}
+.stat-box {
   background: white;
   padding: 16px;
   border-radius: 8px;
   box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-}}
-.stat-box .label {{
+}
+.stat-box .label {
   font-size: 13px;
   color: #666;
   margin-bottom: 6px;
-}}
-.stat-box .value {{
+}
+.stat-box .value {
   font-size: 24px;
   font-weight: bold;
   color: #333;
-}}
-.stat-box .range {{
+}
+.stat-box .range {
   font-size: 12px;
   color: #999;
   margin-top: 4px;
-}}
+}
 
-.back-link {{
+.back-link {
   display: inline-block;
   margin-bottom: 16px;
   color: #1a73e8;
   text-decoration: none;
   font-size: 14px;
-}}
-.back-link:hover {{ text-decoration: underline; }}
+}
+.back-link:hover { text-decoration: underline; }
 
-.location-link {{
+.location-link {
   font-size: 16px;
   font-weight: normal;
   color: #1a73e8;
@@ -708,48 +753,48 @@ body {{
   background: #e8f0fe;
   border-radius: 16px;
   transition: all 0.2s ease;
-}}
-.location-link:hover {{
+}
+.location-link:hover {
   background: #1a73e8;
   color: white;
   text-decoration: none;
-}}
+}
 
-@media (max-width: 768px) {{
-  .header h1 {{ font-size: 22px; }}
-  .chart-value {{ font-size: 24px; }}
-  .stat-box .value {{ font-size: 20px; }}
-}}
+@media (max-width: 768px) {
+  .header h1 { font-size: 22px; }
+  .chart-value { font-size: 24px; }
+  .stat-box .value { font-size: 20px; }
+}
 
 /* Historical Chart Section */
-.history-section {{
+.history-section {
   background: linear-gradient(135deg, #1a2f4a 0%, #243b55 100%);
   border-radius: 12px;
   padding: 24px;
   margin: 24px 0;
   color: white;
   box-shadow: 0 4px 20px rgba(0,0,0,0.2);
-}}
-.history-header {{
+}
+.history-header {
   text-align: center;
   margin-bottom: 20px;
-}}
-.history-title {{
+}
+.history-title {
   font-size: 20px;
   font-weight: bold;
   margin-bottom: 4px;
-}}
-.history-subtitle {{
+}
+.history-subtitle {
   font-size: 13px;
   opacity: 0.7;
-}}
-.history-controls {{
+}
+.history-controls {
   display: flex;
   justify-content: center;
   gap: 8px;
   margin-bottom: 20px;
-}}
-.range-btn {{
+}
+.range-btn {
   background: rgba(255,255,255,0.1);
   border: 1px solid rgba(255,255,255,0.2);
   color: white;
@@ -758,89 +803,89 @@ body {{
   cursor: pointer;
   font-size: 13px;
   transition: all 0.2s ease;
-}}
-.range-btn:hover {{
+}
+.range-btn:hover {
   background: rgba(255,255,255,0.2);
-}}
-.range-btn.active {{
+}
+.range-btn.active {
   background: #3b82f6;
   border-color: #3b82f6;
   font-weight: bold;
-}}
-.history-stats {{
+}
+.history-stats {
   display: grid;
   grid-template-columns: repeat(4, 1fr);
   gap: 12px;
   margin-bottom: 20px;
-}}
-.stat-card {{
+}
+.stat-card {
   background: rgba(0,0,0,0.3);
   border-radius: 8px;
   padding: 12px;
   text-align: center;
-}}
-.stat-card .stat-label {{
+}
+.stat-card .stat-label {
   font-size: 11px;
   text-transform: uppercase;
   opacity: 0.7;
   margin-bottom: 4px;
-}}
-.stat-card .stat-value {{
+}
+.stat-card .stat-value {
   font-size: 18px;
   font-weight: bold;
   color: #60a5fa;
-}}
-.history-chart-container {{
+}
+.history-chart-container {
   background: rgba(255,255,255,0.95);
   border-radius: 8px;
   padding: 16px;
   height: 300px;
   margin-bottom: 16px;
-}}
-.history-legend {{
+}
+.history-legend {
   display: flex;
   justify-content: center;
   gap: 24px;
   flex-wrap: wrap;
-}}
-.legend-row {{
+}
+.legend-row {
   display: flex;
   align-items: center;
   gap: 8px;
   font-size: 13px;
-}}
-.legend-color {{
+}
+.legend-color {
   width: 16px;
   height: 4px;
   border-radius: 2px;
-}}
-@media (max-width: 600px) {{
-  .history-stats {{
+}
+@media (max-width: 600px) {
+  .history-stats {
     grid-template-columns: repeat(2, 1fr);
-  }}
-  .history-controls {{
+  }
+  .history-controls {
     flex-wrap: wrap;
-  }}
-  .history-legend {{
+  }
+  .history-legend {
     flex-direction: column;
     align-items: center;
     gap: 8px;
-  }}
-}}
+  }
+}
 
 /* Average Period Selector */
-.avg-controls {{
+.avg-controls {
   display: flex;
   align-items: center;
   gap: 8px;
   margin-bottom: 8px;
-}}
-.avg-label {{
+}
+.avg-label {
   font-size: 13px;
   color: #666;
   margin-right: 4px;
-}}
-.avg-btn {{
+}
+.avg-btn {
   background: #f3f4f6;
   border: 1px solid #e5e7eb;
   color: #374151;
@@ -849,158 +894,1297 @@ body {{
   cursor: pointer;
   font-size: 12px;
   transition: all 0.2s ease;
-}}
-.avg-btn:hover {{
+}
+.avg-btn:hover {
   background: #e5e7eb;
-}}
-.avg-btn.active {{
+}
+.avg-btn.active {
   background: #1a73e8;
   border-color: #1a73e8;
   color: white;
   font-weight: 600;
-}}
-.avg-display {{
+}
+.avg-display {
   font-size: 13px;
   color: #666;
   margin-left: 12px;
-}}
-.avg-display .avg-value {{
+}
+.avg-display .avg-value {
   font-weight: 600;
   color: #1a73e8;
-}}
+}
 
 /* Weather & Rainfall Section */
-.weather-rainfall-section {{
+.weather-rainfall-section {
   background: linear-gradient(135deg, #0f766e 0%, #115e59 100%);
   border-radius: 12px;
   padding: 24px;
   margin: 24px 0;
   color: white;
   box-shadow: 0 4px 20px rgba(0,0,0,0.15);
-}}
-.weather-rainfall-header {{
+}
+.weather-rainfall-header {
   display: flex;
   justify-content: space-between;
   align-items: center;
   margin-bottom: 20px;
   flex-wrap: wrap;
   gap: 12px;
-}}
-.weather-rainfall-title {{
+}
+.weather-rainfall-title {
   font-size: 20px;
   font-weight: bold;
-}}
-.weather-rainfall-source {{
+}
+.weather-rainfall-source {
   font-size: 12px;
   opacity: 0.8;
   background: rgba(255,255,255,0.1);
   padding: 4px 10px;
   border-radius: 12px;
-}}
-.weather-rainfall-grid {{
+}
+.weather-rainfall-grid {
   display: grid;
   grid-template-columns: repeat(auto-fit, minmax(140px, 1fr));
   gap: 16px;
-}}
-.weather-card {{
+}
+.weather-card {
   background: rgba(255,255,255,0.1);
   border-radius: 10px;
   padding: 16px;
   text-align: center;
   backdrop-filter: blur(5px);
-}}
-.weather-card .card-icon {{
+}
+.weather-card .card-icon {
   font-size: 28px;
   margin-bottom: 8px;
-}}
-.weather-card .card-label {{
+}
+.weather-card .card-label {
   font-size: 11px;
   text-transform: uppercase;
   letter-spacing: 0.5px;
   opacity: 0.8;
   margin-bottom: 6px;
-}}
-.weather-card .card-value {{
+}
+.weather-card .card-value {
   font-size: 22px;
   font-weight: bold;
-}}
-.weather-card .card-sub {{
+}
+.weather-card .card-sub {
   font-size: 11px;
   opacity: 0.7;
   margin-top: 4px;
-}}
-.weather-card.rain-highlight {{
+}
+.weather-card.rain-highlight {
   background: rgba(59, 130, 246, 0.3);
   border: 1px solid rgba(59, 130, 246, 0.5);
-}}
-@media (max-width: 600px) {{
-  .weather-rainfall-grid {{
+}
+.pred-tile {
+  background: white;
+  border-radius: 8px;
+  padding: 12px;
+  text-align: center;
+}
+.pred-label {
+  font-size: 11px;
+  text-transform: uppercase;
+  color: #6b7280;
+  margin-bottom: 4px;
+}
+@media (max-width: 600px) {
+  .weather-rainfall-grid {
     grid-template-columns: repeat(2, 1fr);
-  }}
-}}
-</style>
-</head>
-<body>
-<div class="container">
-  <a href="/" class="back-link">← Back to All Rivers</a>
+  }
+}
+""")
 
-  <div class="header">
-    <h1>{h(site_name)}{get_location_links(site_id, tva_site_code)}</h1>
-    {"" if is_tva else f'''<div class="status">{status_text}</div>
-    <div class="meta">
-      <span><strong>USGS Site:</strong> {h(site_id)}</span>
-      <span><strong>Threshold:</strong> {h(threshold_str)}</span>
-      <span><strong>Last Runnable:</strong> {h(last_runnable)}</span>
-    </div>'''}
-  </div>
 
-  {tva_forecast_html}
+# Chart.js setup for the detail page. Everything per-site comes from the
+# #chartData JSON block, so the script itself is a constant.
+_DETAIL_SCRIPT = _strip_indent("""<script>
+const chartData = JSON.parse(document.getElementById('chartData').textContent);
 
-  {f'''<div class="chart-row">
-    <div class="chart-box" style="background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%);">
-      <h2 style="color: #92400e;">📏 Visual Gauge (Estimated)</h2>
-      <div class="chart-value" style="color: #b45309;">{f"{current_visual:.2f}" if current_visual is not None else "N/A"} <span style="font-size:18px; font-weight:normal;">ft visual</span></div>
-      <div class="avg-controls">
-        <span class="avg-label">Average:</span>
-        <button class="avg-btn" data-hours="24" data-target="visual">24h</button>
-        <button class="avg-btn" data-hours="48" data-target="visual">48h</button>
-        <button class="avg-btn active" data-hours="72" data-target="visual">3d</button>
-        <button class="avg-btn" data-hours="168" data-target="visual">7d</button>
-        <span class="avg-display"><span class="avg-value" id="visualAvgValue">{f"{avg_visual:.2f}" if avg_visual else "N/A"}</span> ft</span>
-      </div>
-      <div class="chart-meta">Range: {f"{min_visual:.2f} - {max_visual:.2f}" if max_visual else "N/A"} ft visual (3-day) · <span style="color:#22c55e;">Runnable ≥ 1.7 ft</span></div>
-      <div class="chart-canvas">
-        <canvas id="visualChart"></canvas>
-      </div>
-      <div style="margin-top: 12px; padding: 12px; background: rgba(255,255,255,0.7); border-radius: 8px; font-size: 12px; color: #78350f;">
-        <strong>Note:</strong> Visual gauge is calculated from USGS stage using formula: <code>Visual = 0.69 × Stage - 1.89</code>
-        <br>Calibration: 6.22 ft USGS = 2.42 ft visual, 5.34 ft USGS = 1.81 ft visual
-      </div>
-    </div>
-  </div>''' if is_north_chick else ''}
+// Average Period Calculator
+(function() {
+  // Precomputed averages keyed by period in hours
+  const cfsAvgs = chartData.cfs.avgs;
+  const feetAvgs = chartData.feet.avgs;
+  const visualAvgs = chartData.visual.avgs;
+
+  function calculateAvg(avgs, hours) {
+    const avg = avgs[hours];
+    return avg === undefined ? null : avg;
+  }
+
+  function formatValue(val, isCfs) {
+    if (val === null) return 'N/A';
+    if (isCfs) return Math.round(val).toLocaleString();
+    return val.toFixed(2);
+  }
 
-  {f'''<div class="bard-flow-guide" style="background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%); border-radius: 16px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 12px rgba(0,0,0,0.08);">
-    <h3 style="margin: 0 0 16px 0; font-size: 18px; color: #1e293b; display: flex; align-items: center; gap: 8px;">
-      <span style="font-size: 24px;">🚣</span> North Chick Flow Guide
-      <span style="font-size: 12px; color: #64748b; font-weight: normal;">(Bard Trimble)</span>
-    </h3>
-    <div style="display: grid; grid-template-columns: repeat(7, 1fr); gap: 6px;">
-      <div style="text-align: center; padding: 10px 4px; background: #9ca3af; border-radius: 8px; color: white;">
-        <div style="font-size: 12px; font-weight: bold;">&lt;1.5</div>
-        <div style="font-size: 10px; margin-top: 4px;">Too Low</div>
-      </div>
-      <div style="text-align: center; padding: 10px 4px; background: #fbbf24; border-radius: 8px; color: #78350f;">
-        <div style="font-size: 12px; font-weight: bold;">1.5-2.0</div>
-        <div style="font-size: 10px; margin-top: 4px;">Low</div>
-      </div>
-      <div style="text-align: center; padding: 10px 4px; background: #86efac; border-radius: 8px; color: #14532d;">
-        <div style="font-size: 12px; font-weight: bold;">2.0-2.5</div>
-        <div style="font-size: 10px; margin-top: 4px;">Worth It</div>
-      </div>
-      <div style="text-align: center; padding: 10px 4px; background: #22c55e; border-radius: 8px; color: white; box-shadow: 0 0 12px rgba(34, 197, 94, 0.4);">
-        <div style="font-size: 12px; font-weight: bold;">2.5-3.2</div>
-        <div style="font-size: 10px; margin-top: 4px;">Good ⭐</div>
-      </div>
+  // Handle button clicks
+  document.querySelectorAll('.avg-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+      const target = this.dataset.target;
+      const hours = parseInt(this.dataset.hours);
+
+      // Update active button state
+      document.querySelectorAll(`.avg-btn[data-target="${target}"]`).forEach(b => b.classList.remove('active'));
+      this.classList.add('active');
+
+      // Calculate and update average
+      let values;
+      let displayElId;
+      if (target === 'cfs') {
+        values = cfsAvgs;
+        displayElId = 'cfsAvgValue';
+      } else if (target === 'visual') {
+        values = visualAvgs;
+        displayElId = 'visualAvgValue';
+      } else {
+        values = feetAvgs;
+        displayElId = 'feetAvgValue';
+      }
+      const avg = calculateAvg(values, hours);
+      const displayEl = document.getElementById(displayElId);
+      if (displayEl) {
+        displayEl.textContent = formatValue(avg, target === 'cfs');
+      }
+    });
+  });
+})();
+
+// Chart.js is fetched only when the first chart is about to scroll into
+// view, so it doesn't block the initial paint. initCharts() runs once it loads.
+function initCharts() {
+  // Shared pieces of the 3-day line charts (visual, CFS, feet)
+  const legendLabels = { usePointStyle: true, boxWidth: 30, font: { size: 11 } };
+
+  // Dashed horizontal line at a threshold value
+  function levelLine(label, labels, value, color, order) {
+    return {
+      label: label,
+      data: labels.map(() => value),
+      borderColor: color,
+      borderWidth: 2,
+      borderDash: [6, 4],
+      pointRadius: 0,
+      pointHoverRadius: 0,
+      fill: false,
+      tension: 0,
+      order: order
+    };
+  }
+
+  function lineOptions(legend, tooltipFilter, yAxis) {
+    return {
+      responsive: true,
+      maintainAspectRatio: false,
+      plugins: {
+        legend: Object.assign({ position: 'top' }, legend),
+        tooltip: { mode: 'index', intersect: false, filter: tooltipFilter }
+      },
+      scales: {
+        x: {
+          ticks: {
+            maxRotation: 45,
+            minRotation: 45,
+            autoSkip: true,
+            maxTicksLimit: 24,
+            font: { size: 9 }
+          },
+          grid: { color: 'rgba(0,0,0,0.08)' }
+        },
+        y: Object.assign({ beginAtZero: false, grid: { color: 'rgba(0,0,0,0.05)' } }, yAxis)
+      }
+    };
+  }
+
+  // Visual Gauge Chart (only for North Chickamauga)
+  const visualChartEl = document.getElementById('visualChart');
+  if (visualChartEl) {
+    const visualCtx = visualChartEl.getContext('2d');
+    const visualLabels = chartData.feet.labels;  // Same timestamps as feet
+    const visualValues = chartData.visual.values;
+    const visualThreshold = chartData.visualThreshold;  // Runnable threshold in visual feet
+
+    if (visualLabels.length === 0 || visualValues.length === 0) {
+      visualCtx.canvas.parentElement.innerHTML = '<div style="padding:20px;text-align:center;color:#999;">No visual gauge data available</div>';
+    } else {
+      new Chart(visualCtx, {
+        type: 'line',
+        data: {
+          labels: visualLabels,
+          datasets: [
+            {
+              label: 'Visual Gauge',
+              data: visualValues,
+              borderColor: '#b45309',
+              backgroundColor: 'rgba(180, 83, 9, 0.15)',
+              borderWidth: 2,
+              tension: 0.4,
+              fill: true,
+              pointRadius: 0,
+              pointHoverRadius: 4,
+              order: 1
+            },
+            levelLine('Runnable (1.7 ft)', visualLabels, visualThreshold, '#22c55e', 0)
+          ]
+        },
+        options: lineOptions(
+          { display: true, labels: legendLabels },
+          tooltipItem => tooltipItem.dataset.label === 'Visual Gauge',
+          { title: { display: true, text: 'Visual Gauge (ft)', color: '#b45309' } }
+        )
+      });
+    }
+  }
+
+  // CFS Chart (skip if element doesn't exist - e.g., StreamBeam sites)
+  const cfsChartEl = document.getElementById('cfsChart');
+  if (cfsChartEl) {
+  const cfsCtx = cfsChartEl.getContext('2d');
+  const cfsLabels = chartData.cfs.labels;
+  const cfsValues = chartData.cfs.values;
+  const thresholdCfs = chartData.thresholdCfs;
+  const isLrc = chartData.isLrc;
+
+  // LRC flow guide levels and colors (from Adam Goshorn)
+  const lrcLevels = [
+    { cfs: 250, label: 'Good Low', color: '#fbbf24' },
+    { cfs: 400, label: 'Shitty Medium', color: '#a67c52' },
+    { cfs: 800, label: 'Good Medium', color: '#86efac' },
+    { cfs: 1500, label: 'BEST!', color: '#22c55e' },
+    { cfs: 2500, label: 'Too High', color: '#ef4444' }
+  ];
+
+  if (cfsLabels.length === 0 || cfsValues.length === 0) {
+    cfsCtx.canvas.parentElement.innerHTML = '<div style="padding:20px;text-align:center;color:#999;">No CFS data available for this site</div>';
+  } else {
+    // Get current CFS to determine which threshold lines to show
+    const currentCfs = cfsValues[cfsValues.length - 1];
+
+    // Build datasets - main data line + threshold lines
+    const cfsDatasets = [{
+      label: 'CFS',
+      data: cfsValues,
+      borderColor: '#1a73e8',
+      backgroundColor: 'rgba(26, 115, 232, 0.1)',
+      borderWidth: 2,
+      tension: 0.4,
+      fill: true,
+      pointRadius: 0,
+      pointHoverRadius: 4,
+      order: 10
+    }];
+
+    // Add LRC threshold lines - only show relevant ones based on current CFS
+    if (isLrc) {
+      // Determine which zone we're in and show only relevant thresholds
+      let relevantLevels = [];
+
+      if (currentCfs < 250) {
+        // Not Runnable - show threshold to Good Low
+        relevantLevels = lrcLevels.filter(l => l.cfs === 250);
+      } else if (currentCfs < 400) {
+        // Good Low - show lower bound and next threshold
+        relevantLevels = lrcLevels.filter(l => l.cfs === 250 || l.cfs === 400);
+      } else if (currentCfs < 800) {
+        // Shitty Medium - show bounds
+        relevantLevels = lrcLevels.filter(l => l.cfs === 400 || l.cfs === 800);
+      } else if (currentCfs < 1500) {
+        // Good Medium - show bounds
+        relevantLevels = lrcLevels.filter(l => l.cfs === 800 || l.cfs === 1500);
+      } else if (currentCfs < 2500) {
+        // BEST! - show bounds
+        relevantLevels = lrcLevels.filter(l => l.cfs === 1500 || l.cfs === 2500);
+      } else {
+        // Too High - show the threshold we crossed
+        relevantLevels = lrcLevels.filter(l => l.cfs === 2500);
+      }
+
+      relevantLevels.forEach((level, idx) => {
+        cfsDatasets.push(levelLine(level.cfs + ' CFS (' + level.label + ')', cfsLabels, level.cfs, level.color, idx));
+      });
+    } else if (thresholdCfs !== null) {
+      cfsDatasets.push(levelLine('Runnable Threshold', cfsLabels, thresholdCfs, '#22c55e', 0));
+    }
+
+    new Chart(cfsCtx, {
+      type: 'line',
+      data: {
+        labels: cfsLabels,
+        datasets: cfsDatasets
+      },
+      options: lineOptions(
+        {
+          display: isLrc || thresholdCfs !== null,
+          labels: {
+            usePointStyle: true,
+            boxWidth: 30,
+            font: { size: 10 },
+            filter: function(legendItem, data) {
+              // For LRC, show threshold lines in legend; for others, hide threshold
+              if (isLrc) {
+                return legendItem.text !== 'CFS';  // Show all threshold lines, hide main CFS line from legend
+              }
+              return legendItem.text !== 'Runnable Threshold';
+            }
+          }
+        },
+        // Hide all threshold lines from tooltip
+        tooltipItem => tooltipItem.dataset.label === 'CFS'
+      )
+    });
+  }
+  } // End cfsChartEl check
+
+  // Feet Chart
+  const feetCtx = document.getElementById('feetChart').getContext('2d');
+  const feetLabels = chartData.feet.labels;
+  const feetValues = chartData.feet.values;
+  const thresholdFt = chartData.thresholdFt;
+
+  if (feetLabels.length === 0 || feetValues.length === 0) {
+    feetCtx.canvas.parentElement.innerHTML = '<div style="padding:20px;text-align:center;color:#999;">No gage height data available for this site</div>';
+  } else {
+    // Build datasets - main data line + optional threshold line
+    const feetDatasets = [{
+      label: 'Feet',
+      data: feetValues,
+      borderColor: '#1a73e8',
+      backgroundColor: 'rgba(26, 115, 232, 0.1)',
+      borderWidth: 2,
+      tension: 0.4,
+      fill: true,
+      pointRadius: 0,
+      pointHoverRadius: 4,
+      order: 1
+    }];
+
+    // Add threshold line if we have a threshold value
+    if (thresholdFt !== null) {
+      feetDatasets.push(levelLine('Runnable Threshold', feetLabels, thresholdFt, '#22c55e', 0));
+    }
+
+    new Chart(feetCtx, {
+      type: 'line',
+      data: {
+        labels: feetLabels,
+        datasets: feetDatasets
+      },
+      options: lineOptions(
+        { display: thresholdFt !== null, labels: legendLabels },
+        // Hide threshold line from tooltip
+        tooltipItem => tooltipItem.dataset.label !== 'Runnable Threshold'
+      )
+    });
+  }
+
+  // Rainfall Chart (bar chart for daily totals + QPF forecast)
+  const rainChartEl = document.getElementById('rainChart');
+  if (rainChartEl) {
+    const rainCtx = rainChartEl.getContext('2d');
+    const rainLabels = chartData.rain.labels;
+    const rainValues = chartData.rain.values;
+    const qpfLabels = chartData.qpf.labels;
+    const qpfValues = chartData.qpf.values;
+
+    // Combine historical + QPF labels and create datasets
+    const allLabels = [...rainLabels, ...qpfLabels];
+    const historicalData = [...rainValues, ...Array(qpfLabels.length).fill(null)];
+    const forecastData = [...Array(rainLabels.length).fill(null), ...qpfValues];
+
+    if (allLabels.length === 0) {
+      rainCtx.canvas.parentElement.innerHTML = '<div style="padding:20px;text-align:center;color:#999;">No rainfall data available for this site</div>';
+    } else {
+      new Chart(rainCtx, {
+        type: 'bar',
+        data: {
+          labels: allLabels,
+          datasets: [
+            {
+              label: 'Historical Rain',
+              data: historicalData,
+              backgroundColor: 'rgba(14, 165, 233, 0.7)',
+              borderColor: 'rgba(3, 105, 161, 1)',
+              borderWidth: 1,
+              borderRadius: 4,
+            },
+            {
+              label: 'QPF Forecast',
+              data: forecastData,
+              backgroundColor: 'rgba(245, 158, 11, 0.7)',
+              borderColor: 'rgba(217, 119, 6, 1)',
+              borderWidth: 1,
+              borderRadius: 4,
+            }
+          ]
+        },
+        options: {
+          responsive: true,
+          maintainAspectRatio: false,
+          plugins: {
+            legend: { display: false },
+            tooltip: {
+              callbacks: {
+                label: function(context) {
+                  if (context.parsed.y === null) return null;
+                  const type = context.dataset.label;
+                  return type + ': ' + context.parsed.y.toFixed(2) + ' inches';
+                }
+              }
+            }
+          },
+          scales: {
+            x: {
+              grid: { display: false }
+            },
+            y: {
+              beginAtZero: true,
+              title: {
+                display: true,
+                text: 'Inches',
+                color: '#0369a1'
+              },
+              grid: { color: 'rgba(0,0,0,0.05)' }
+            }
+          }
+        }
+      });
+    }
+  }
+
+  // History Chart with Time Range Selection (skip if element doesn't exist - e.g., StreamBeam sites)
+  (function() {
+    const historyChartEl = document.getElementById('historyChart');
+    if (!historyChartEl) {
+      console.log('History chart element not found - skipping history chart initialization');
+      return;
+    }
+    const siteId = chartData.siteId;
+    let historyChart = null;
+
+    async function loadHistoryData(days) {
+      try {
+        const response = await fetch(`/api/usgs-history/${siteId}?days=${days}`);
+        const data = await response.json();
+        return data;
+      } catch (err) {
+        console.error('Failed to load history:', err);
+        return null;
+      }
+    }
+
+    function updateStats(data) {
+      document.getElementById('statCount').textContent = (data.cfs_count || 0).toLocaleString();
+
+      if (data.stats && data.stats.cfs) {
+        document.getElementById('statMaxCfs').textContent =
+          data.stats.cfs.max ? Math.round(data.stats.cfs.max).toLocaleString() + ' CFS' : '--';
+        document.getElementById('statAvgCfs').textContent =
+          data.stats.cfs.avg ? Math.round(data.stats.cfs.avg).toLocaleString() + ' CFS' : '--';
+      }
+
+      if (data.stats && data.stats.feet) {
+        document.getElementById('statMaxFeet').textContent =
+          data.stats.feet.max ? data.stats.feet.max.toFixed(2) + ' ft' : '--';
+      }
+    }
+
+    function renderChart(data) {
+      const ctx = document.getElementById('historyChart').getContext('2d');
+
+      if (historyChart) {
+        historyChart.destroy();
+      }
+
+      if (!data.cfs || data.cfs.length === 0) {
+        ctx.canvas.parentElement.innerHTML =
+          '<div style="padding:40px;text-align:center;color:#666;">' +
+          '<p style="font-size:18px;">No historical data available</p></div>';
+        return;
+      }
+
+      // Format labels based on time range for better readability
+      const currentDays = parseInt(document.querySelector('.range-btn.active')?.dataset.days || 3);
+      const labels = data.cfs.map(o => {
+        const d = new Date(o.timestamp);
+        if (currentDays <= 3) {
+          // For 3 days or less, show day + time (e.g., "Sat 2pm")
+          return d.toLocaleDateString('en-US', { weekday: 'short' }) + ' ' +
+                 d.toLocaleTimeString('en-US', { hour: 'numeric', hour12: true });
+        } else if (currentDays <= 7) {
+          // For 7 days, show month/day + hour (e.g., "Jan 4 2pm")
+          return d.toLocaleDateString('en-US', { month: 'short', day: 'numeric' }) + ' ' +
+                 d.toLocaleTimeString('en-US', { hour: 'numeric', hour12: true });
+        } else {
+          // For longer ranges, show month/day only
+          return d.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
+        }
+      });
+
+      const cfsData = data.cfs.map(o => o.value);
+      const feetData = data.feet ? data.feet.map(o => o.value) : [];
+
+      const datasets = [
+        {
+          label: 'Discharge (CFS)',
+          data: cfsData,
+          borderColor: '#ef4444',
+          backgroundColor: 'rgba(239, 68, 68, 0.1)',
+          borderWidth: 2,
+          fill: true,
+          tension: 0.3,
+          yAxisID: 'y',
+          pointRadius: 1,
+          pointHoverRadius: 4
+        }
+      ];
+
+      if (feetData.length > 0) {
+        datasets.push({
+          label: 'Gage Height (ft)',
+          data: feetData,
+          borderColor: '#3b82f6',
+          borderWidth: 2,
+          fill: false,
+          tension: 0.3,
+          yAxisID: 'y1',
+          pointRadius: 0,
+          pointHoverRadius: 3
+        });
+      }
+
+      historyChart = new Chart(ctx, {
+        type: 'line',
+        data: {
+          labels: labels,
+          datasets: datasets
+        },
+        options: {
+          responsive: true,
+          maintainAspectRatio: false,
+          interaction: {
+            mode: 'index',
+            intersect: false
+          },
+          plugins: {
+            legend: { display: false },
+            tooltip: {
+              backgroundColor: 'rgba(0,0,0,0.8)',
+              titleFont: { size: 14 },
+              bodyFont: { size: 13 },
+              padding: 12,
+              callbacks: {
+                label: function(context) {
+                  let label = context.dataset.label || '';
+                  if (context.parsed.y !== null) {
+                    if (label.includes('CFS')) {
+                      label += ': ' + context.parsed.y.toLocaleString() + ' CFS';
+                    } else {
+                      label += ': ' + context.parsed.y.toFixed(2) + ' ft';
+                    }
+                  }
+                  return label;
+                }
+              }
+            }
+          },
+          scales: {
+            x: {
+              ticks: {
+                maxRotation: 45,
+                minRotation: 45,
+                autoSkip: true,
+                maxTicksLimit: 24,
+                font: { size: 9 }
+              },
+              grid: { color: 'rgba(0,0,0,0.08)' }
+            },
+            y: {
+              type: 'linear',
+              display: true,
+              position: 'left',
+              title: {
+                display: true,
+                text: 'Discharge (CFS)',
+                color: '#ef4444'
+              },
+              ticks: { color: '#ef4444' },
+              grid: { color: 'rgba(239, 68, 68, 0.1)' }
+            },
+            y1: {
+              type: 'linear',
+              display: feetData.length > 0,
+              position: 'right',
+              title: {
+                display: true,
+                text: 'Gage Height (ft)',
+                color: '#3b82f6'
+              },
+              ticks: { color: '#3b82f6' },
+              grid: { drawOnChartArea: false }
+            }
+          }
+        }
+      });
+    }
+
+    async function updateChart(days) {
+      const data = await loadHistoryData(days);
+      if (data) {
+        updateStats(data);
+        renderChart(data);
+      }
+    }
+
+    // Set up button click handlers
+    document.querySelectorAll('.range-btn').forEach(btn => {
+      btn.addEventListener('click', function() {
+        document.querySelectorAll('.range-btn').forEach(b => b.classList.remove('active'));
+        this.classList.add('active');
+        updateChart(parseInt(this.dataset.days));
+      });
+    });
+
+    // Initial load - default to 3 days
+    updateChart(3);
+  })();
+}
+
+(function() {
+  const firstChart = document.querySelector('.chart-canvas canvas');
+  if (!firstChart) return;
+  let requested = false;
+  function loadChartJs() {
+    if (requested) return;
+    requested = true;
+    const s = document.createElement('script');
+    s.src = 'https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js';
+    s.onload = initCharts;
+    document.head.appendChild(s);
+  }
+  if (!('IntersectionObserver' in window)) {
+    loadChartJs();
+    return;
+  }
+  const io = new IntersectionObserver(entries => {
+    if (entries.some(e => e.isIntersecting)) {
+      io.disconnect();
+      loadChartJs();
+    }
+  }, { rootMargin: '200px' });
+  io.observe(firstChart);
+})();
+</script>""")
+
+# The same script as a standalone file for pages rendered with script_src.
+# The name carries a content hash, so the file can be cached as immutable and
+# a changed script always gets a new URL.
+_DETAIL_SCRIPT_JS = _DETAIL_SCRIPT.removeprefix("<script>\n").removesuffix("</script>\n")
+DETAIL_SCRIPT_FILE = f"detail-{hashlib.blake2b(_DETAIL_SCRIPT_JS.encode('utf-8'), digest_size=6).hexdigest()}.js"
+
+
+def write_detail_assets(details_dir: str) -> str:
+    """
+    Write the shared detail-page script into details_dir if it isn't there yet,
+    plus a pre-gzipped copy (name + ".gz") for clients that accept gzip.
+
+    Args:
+        details_dir: Directory the detail pages are written to
+
+    Returns:
+        Script file name, relative to details_dir (pass as script_src)
+    """
+    path = os.path.join(details_dir, DETAIL_SCRIPT_FILE)
+    data = _DETAIL_SCRIPT_JS.encode("utf-8")
+    for out_path, content in ((path, data), (f"{path}.gz", None)):
+        if os.path.exists(out_path):
+            continue
+        if content is None:
+            content = gzip.compress(data, compresslevel=9, mtime=0)
+        tmp_path = f"{out_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, out_path)
+    return DETAIL_SCRIPT_FILE
+
+
+def _series_stats(values: List[float], recent_points: int) -> Tuple[float, float, float]:
+    """
+    Return (avg, max, min) for a chart series.
+
+    The average covers only the last `recent_points` readings; max and min
+    cover the full range. All three are 0 for an empty series.
+    """
+    if not values:
+        return 0, 0, 0
+    recent = values[-recent_points:]
+    return sum(recent) / len(recent), max(values), min(values)
+
+
+def _eta_text(eta_hours: float) -> str:
+    """Format hours until a threshold crossing as minutes, hours or days."""
+    if eta_hours < 1:
+        return f"~{int(eta_hours * 60)} minutes"
+    if eta_hours < 24:
+        return f"~{eta_hours:.1f} hours"
+    return f"~{eta_hours / 24:.1f} days"
+
+
+def _level_prediction(
+    values: List[float],
+    threshold: float,
+    peak: float,
+    steady_rate: float,
+    unit: str
+) -> Dict[str, Any]:
+    """
+    Trend and threshold ETA from the last 8 hours of a 15-minute series.
+
+    Args:
+        values: Series with at least 32 readings, oldest first
+        threshold: Runnable threshold in the series' unit
+        peak: Series maximum (already computed by _series_stats)
+        steady_rate: Rates below this per hour count as steady
+        unit: "ft" or "cfs"
+
+    Returns:
+        level_prediction dict for the prediction panel
+    """
+    current = values[-1]
+
+    # Rate over last 8 hours (32 readings at 15-min intervals); 8 hours
+    # gives a more stable/representative rate than shorter windows
+    change_8h = current - values[-32]  # positive = rising, negative = falling
+    rate_per_hour = change_8h / 8.0
+
+    if abs(rate_per_hour) < steady_rate:
+        trend, trend_icon, trend_color = "steady", "→", "#6b7280"
+    elif rate_per_hour > 0:
+        trend, trend_icon, trend_color = "rising", "↗", "#22c55e"
+    else:
+        trend, trend_icon, trend_color = "falling", "↘", "#f59e0b"
+
+    # ETA when heading toward the threshold from either side
+    eta_hours = None
+    eta_text = None
+    distance_to_threshold = current - threshold
+    if (trend == "falling" and current > threshold) or (trend == "rising" and current < threshold):
+        eta_hours = abs(distance_to_threshold) / abs(rate_per_hour)
+        eta_text = _eta_text(eta_hours)
+
+    return {
+        "current": current,
+        "threshold": threshold,
+        "peak": peak,
+        "trend": trend,
+        "trend_icon": trend_icon,
+        "trend_color": trend_color,
+        "rate_per_hour": abs(rate_per_hour),
+        "change_8h": abs(change_8h),
+        "distance_to_threshold": abs(distance_to_threshold),
+        "eta_hours": eta_hours,
+        "eta_text": eta_text,
+        "above_threshold": current >= threshold,
+        "unit": unit
+    }
+
+
+def _prediction_panel_html(
+    pred: Dict[str, Any],
+    title: str,
+    current_label: str,
+    fmt_value: Callable[[float], str],
+    rate_places: int
+) -> str:
+    """
+    Render the trend/ETA panel for a _level_prediction() result.
+
+    Args:
+        pred: level_prediction dict
+        title: Panel heading ("Flow Prediction" / "Level Prediction")
+        current_label: Label for the current-reading tile
+        fmt_value: Formats a reading in the prediction's unit
+        rate_places: Decimal places for the hourly rate
+
+    Returns:
+        HTML for the panel
+    """
+    above = pred['above_threshold']
+    unit = pred['unit']
+    eta_text = pred['eta_text']
+    eta_bg = ('#dcfce7' if above else '#fef9c3') if eta_text else 'white'
+    return f'''
+
+  <div class="prediction-panel" style="background: linear-gradient(135deg, {'#ecfdf5' if above else '#fef3c7'} 0%, {'#d1fae5' if above else '#fde68a'} 100%); border-radius: 12px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
+    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 16px;">
+      <span style="font-size: 28px;">{pred['trend_icon']}</span>
+      <div>
+        <h3 style="margin: 0; font-size: 18px; color: #374151;">{title}</h3>
+        <p style="margin: 4px 0 0; font-size: 13px; color: #6b7280;">Based on 8-hour trend analysis</p>
+      </div>
+    </div>
+    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(140px, 1fr)); gap: 16px;">
+      <div class="pred-tile">
+        <div class="pred-label">{current_label}</div>
+        <div style="font-size: 24px; font-weight: bold; color: #1f2937;">{fmt_value(pred['current'])} {unit}</div>
+      </div>
+      <div class="pred-tile">
+        <div class="pred-label">Threshold</div>
+        <div style="font-size: 24px; font-weight: bold; color: #22c55e;">{fmt_value(pred['threshold'])} {unit}</div>
+      </div>
+      <div class="pred-tile">
+        <div class="pred-label">Trend (8h)</div>
+        <div style="font-size: 24px; font-weight: bold; color: {pred['trend_color']};">{pred['trend'].title()} {pred['trend_icon']}</div>
+        <div style="font-size: 12px; color: #6b7280;">{pred['rate_per_hour']:.{rate_places}f} {unit}/hr</div>
+      </div>
+      <div class="pred-tile">
+        <div class="pred-label">Recent Peak</div>
+        <div style="font-size: 24px; font-weight: bold; color: #3b82f6;">{fmt_value(pred['peak'])} {unit}</div>
+      </div>
+      <div class="pred-tile">
+        <div class="pred-label">Distance to Threshold</div>
+        <div style="font-size: 24px; font-weight: bold; color: {'#22c55e' if above else '#f59e0b'};">{'+' if above else '-'}{fmt_value(pred['distance_to_threshold'])} {unit}</div>
+      </div>
+      <div class="pred-tile" style="background: {eta_bg};">
+        <div class="pred-label">{'ETA to Drop Below' if above else 'ETA to Reach'} Threshold</div>
+        <div style="font-size: 20px; font-weight: bold; color: {'#16a34a' if above else '#d97706'};">{eta_text if eta_text else 'N/A'}</div>
+      </div>
+    </div>
+  </div>'''
+
+
+# Maximum points per Chart.js line after downsampling
+CHART_MAX_POINTS = 200
+
+# Periods offered by the average buttons, in hours
+AVG_PERIOD_HOURS = (24, 48, 72, 168)
+
+
+def lttb_indices(values: List[float], threshold: int) -> List[int]:
+    """
+    Pick indices to keep when downsampling a series with
+    Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; each bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket, so peaks and troughs
+    survive. Readings are treated as evenly spaced.
+
+    Args:
+        values: Series to downsample
+        threshold: Maximum number of points to keep
+
+    Returns:
+        Sorted list of indices into values
+    """
+    n = len(values)
+    if threshold < 3 or n <= threshold:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    keep = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # Average point of the next bucket
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = sum(values[avg_start:avg_end]) / (avg_end - avg_start)
+
+        # Point in this bucket with the largest triangle
+        ax, ay = a, values[a]
+        max_area = -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (values[j] - ay) - (ax - j) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                a = j
+        keep.append(a)
+
+    keep.append(n - 1)
+    return keep
+
+
+def _quantize(values: List[float], places: int) -> List[float]:
+    """
+    Round chart values for embedding, writing whole numbers as ints.
+
+    Readings are only meaningful to ~0.01 ft / 0.1 cfs, and this keeps the
+    JSON from carrying full float reprs like 2.6900000000000004.
+    """
+    out = []
+    for v in values:
+        r = round(v, places)
+        out.append(int(r) if r == int(r) else r)
+    return out
+
+
+def _daily_rain_series(rows: List[Dict[str, Any]]) -> Tuple[List[str], List[float]]:
+    """
+    Collapse rainfall rows into one bar per day for the rainfall chart.
+
+    Rows for the same day and source are summed (so sub-daily readings become
+    daily totals). When several sources report the same day, the largest
+    total is used rather than double-counting the same rain.
+
+    Args:
+        rows: Rainfall rows with "date" (YYYY-MM-DD, optionally with a time),
+            "precip_in" and optional "source" keys
+
+    Returns:
+        Tuple of ("Mon Jan 02" labels, daily inches), oldest day first
+    """
+    by_day = {}
+    for row in rows:
+        try:
+            day = date.fromisoformat((row.get("date") or "")[:10])
+        except (ValueError, TypeError):
+            continue
+        sources = by_day.setdefault(day, {})
+        src = row.get("source")
+        sources[src] = sources.get(src, 0) + (row.get("precip_in", 0) or 0)
+
+    labels = []
+    values = []
+    for day in sorted(by_day):
+        labels.append(day.strftime("%a %b %d"))
+        values.append(max(by_day[day].values()))
+    return labels, values
+
+
+def _period_averages(values: List[float], points_per_hour: int = 4) -> Dict[str, float]:
+    """
+    Average of the most recent readings for each AVG_PERIOD_HOURS period.
+
+    Assumes 15-minute readings (4 per hour). Keys are strings so the dict
+    serializes directly to a JS object.
+
+    The periods are nested windows ending at the latest reading, so each
+    one extends the previous running total; every reading is summed once.
+    """
+    if not values:
+        return {}
+    avgs = {}
+    n = len(values)
+    total = 0.0
+    counted = 0
+    for hours in sorted(AVG_PERIOD_HOURS):
+        want = min(hours * points_per_hour, n)
+        total += sum(values[n - want:n - counted])
+        counted = want
+        avgs[str(hours)] = total / counted
+    return avgs
+
+
+def iter_site_detail_html(
+    site_data: Dict[str, Any],
+    cfs_history: List[Tuple[str, float]],
+    feet_history: List[Tuple[str, float]],
+    script_src: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Generate Google Analytics-style HTML dashboard for a river site, one
+    page section at a time (suitable for file.writelines()).
+
+    Args:
+        site_data: Dict with site info (name, current cfs, current ft, etc.)
+        cfs_history: List of (timestamp, cfs) tuples for 7 days
+        feet_history: List of (timestamp, feet) tuples for 7 days
+        script_src: URL of the file from write_detail_assets(); the chart
+            script is inlined when not given
+
+    Yields:
+        HTML fragments that concatenate to the full page
+    """
+    field = site_data.get  # bound once for the ~25 field reads below
+
+    site_name = field("name", "River Site")
+    site_id = field("site", "")
+    current_cfs = field("cfs")
+    current_ft = field("stage_ft")
+
+    # StreamBeam sites only have feet data, no CFS
+    is_streambeam = field("is_streambeam", False) or site_id == "1"
+
+    # Locust Fork - hide CFS chart (user preference - feet-based river)
+    hide_cfs_chart = site_id == "02455000"
+
+    # Little River Canyon has special 6-level flow classification
+    is_lrc = site_id == "02399200"
+
+    # North Chickamauga has visual gauge conversion
+    # Visual = 0.69 × USGS_Stage - 1.89
+    is_north_chick = site_id == "03566535"
+    visual_threshold = 1.7  # Runnable threshold in visual feet
+
+    current_temp = field("temp_f")
+    current_wind_mph = field("wind_mph")
+    current_wind_dir = field("wind_dir", "")
+    threshold_ft = field("threshold_ft")
+    threshold_cfs = field("threshold_cfs")
+    in_range = field("in_range", False)
+    last_in_time = field("last_in_time")  # Human-readable time when it went green
+
+    # Prepare data for Chart.js - format timestamps as readable strings
+    cfs_labels, cfs_values = format_chart_series(cfs_history)
+    feet_labels, feet_values = format_chart_series(feet_history)
+
+    # Calculate visual gauge values for North Chickamauga
+    # Formula: Visual = 0.69 × USGS_Stage - 1.89
+    visual_values = []
+    if is_north_chick and feet_values:
+        visual_values = [0.69 * ft - 1.89 for ft in feet_values]
+        current_visual = 0.69 * (current_ft or 0) - 1.89 if current_ft else None
+    else:
+        current_visual = None
+
+    # Calculate stats (7-day range, but 3-day average)
+    # 3 days of data at 15-min intervals = 288 points
+    three_day_points = 288
+
+    avg_cfs, max_cfs, min_cfs = _series_stats(cfs_values, three_day_points)
+    avg_ft, max_ft, min_ft = _series_stats(feet_values, three_day_points)
+
+    # Calculate visual gauge stats for North Chickamauga
+    avg_visual, max_visual, min_visual = _series_stats(visual_values, three_day_points)
+
+    # Calculate level prediction (when will it reach threshold?)
+    # Level prediction: gage height first, then CFS for rivers like Little River Canyon
+    level_prediction = None
+    if feet_values and len(feet_values) >= 32 and threshold_ft is not None:
+        level_prediction = _level_prediction(feet_values, threshold_ft, max_ft, 0.005, "ft")
+
+    if level_prediction is None and cfs_values and len(cfs_values) >= 32 and threshold_cfs is not None:
+        current_cfs = cfs_values[-1]
+        # Larger steady band for CFS since values are bigger (< 1 CFS/hr is steady)
+        level_prediction = _level_prediction(cfs_values, threshold_cfs, max_cfs, 1.0, "cfs")
+
+    # Determine status text and color
+    # Little River Canyon uses special 6-level classification
+    if is_lrc and current_cfs is not None:
+        level = _find_level(_LRC_LEVELS, _LRC_MINS, current_cfs)
+        if level:
+            status_text = level["label"].upper()
+            status_color = level["color"]
+        else:
+            # Fallback if no zone matched (shouldn't happen)
+            status_text = "UNKNOWN"
+            status_color = "#9ca3af"
+    else:
+        status_color = "#4ade80" if in_range else "#ef4444"
+        status_text = "RUNNABLE" if in_range else "TOO LOW"
+
+    # Build threshold display
+    threshold_parts = []
+    if threshold_ft is not None:
+        threshold_parts.append(f"{threshold_ft:.2f} ft")
+    if threshold_cfs is not None:
+        threshold_parts.append(f"{int(threshold_cfs):,} CFS")
+    threshold_str = " & ".join(threshold_parts) if threshold_parts else "No threshold set"
+
+    # Last runnable time
+    last_runnable = last_in_time if last_in_time else "Never recorded"
+
+    # Check for TVA source and generate forecast panel
+    is_tva = field("is_tva", False)
+    tva_site_code = field("tva_site_code")
+    tva_forecast_html = ""
+    if is_tva and tva_site_code and TVA_FORECAST_AVAILABLE:
+        try:
+            runnable_threshold = int(threshold_cfs) if threshold_cfs else 3000
+            tva_forecast_html = generate_tva_forecast_html(tva_site_code, runnable_threshold)
+        except Exception as e:
+            print(f"[DETAIL] TVA forecast generation failed: {e}")
+            tva_forecast_html = ""
+
+    # Get wind chill from passed data, or calculate if not provided
+    wind_chill_temp = field("wind_chill_f")
+    wind_chill_emoji = field("wind_chill_emoji")
+    wind_chill_desc = field("wind_chill_desc")
+
+    # If wind chill wasn't pre-calculated, calculate it now
+    if wind_chill_temp is None and current_temp is not None and current_wind_mph is not None:
+        wind_chill_temp, wind_chill_emoji, wind_chill_desc = calculate_wind_chill(current_temp, current_wind_mph)
+
+    # Extract rainfall data
+    precip_today = field("precip_today_in")
+    pws_station = field("pws_station")
+    pws_label = field("pws_label")
+    rainfall_48h = field("rainfall_48h", {})
+    rainfall_7d = field("rainfall_7d", {})
+    rainfall_30d = field("rainfall_30d", {})
+
+    # Extract rainfall stats
+    rain_48h_total = rainfall_48h.get("total_precip_in", 0)
+    rain_7d_total = rainfall_7d.get("total_precip_in", 0)
+    rain_7d_rainy_days = rainfall_7d.get("rainy_days", 0)
+    rain_30d_total = rainfall_30d.get("total_precip_in", 0)
+    rain_30d_rainy_days = rainfall_30d.get("rainy_days", 0)
+
+    # Prepare rainfall chart data (daily totals for 7 days)
+    rain_labels, rain_values = _daily_rain_series(field("rainfall_daily", []) or [])
+
+    # Calculate rainfall chart stats
+    if rain_values:
+        total_rain = sum(rain_values)
+        avg_rain = total_rain / len(rain_values)
+        max_rain = max(rain_values)
+    else:
+        avg_rain = max_rain = total_rain = 0
+
+    # Extract QPF (forecast) data for chart
+    qpf_data = field("qpf", {}) or {}
+    qpf_labels = []
+    qpf_values = []
+    if qpf_data:
+        # QPF data comes as {"YYYY-MM-DD": inches, ...}; ISO dates sort chronologically
+        today = date.today()
+        for date_str in sorted(qpf_data):
+            try:
+                dt = date.fromisoformat(date_str)
+                # Label: Today, Tomorrow, or day name
+                days_diff = (dt - today).days
+                if days_diff == 0:
+                    label = "Today (QPF)"
+                elif days_diff == 1:
+                    label = "Tomorrow (QPF)"
+                else:
+                    label = dt.strftime("%a (QPF)")
+                qpf_labels.append(label)
+                qpf_values.append(qpf_data[date_str] or 0)
+            except Exception:
+                continue
+
+    # Calculate total QPF forecast
+    total_qpf = sum(qpf_values) if qpf_values else 0
+
+    # Chart.js series, embedded once as an inert JSON block the page script
+    # reads with JSON.parse. Charts get an LTTB-downsampled copy; stats above
+    # use the full series.
+    cfs_idx = lttb_indices(cfs_values, CHART_MAX_POINTS)
+    feet_idx = lttb_indices(feet_values, CHART_MAX_POINTS)
+    chart_data = {
+        "cfs": {
+            "labels": [cfs_labels[i] for i in cfs_idx],
+            "values": _quantize([cfs_values[i] for i in cfs_idx], 1),
+            # Averages for the 24h/48h/3d/7d buttons, from the full-resolution data
+            "avgs": _period_averages(cfs_values),
+        },
+        "feet": {
+            "labels": [feet_labels[i] for i in feet_idx],
+            "values": _quantize([feet_values[i] for i in feet_idx], 2),
+            "avgs": _period_averages(feet_values),
+        },
+        # Visual gauge is linear in feet, so the same points are the significant ones
+        "visual": {
+            "values": _quantize([visual_values[i] for i in feet_idx], 2) if visual_values else [],
+            "avgs": _period_averages(visual_values),
+        },
+        "rain": {"labels": rain_labels, "values": _quantize(rain_values, 2)},
+        "qpf": {"labels": qpf_labels, "values": _quantize(qpf_values, 2)},
+        "siteId": site_id,
+        "isLrc": is_lrc,
+        "thresholdCfs": threshold_cfs,
+        "thresholdFt": threshold_ft,
+        "visualThreshold": visual_threshold,
+    }
+    # "</" would end the <script> element early
+    chart_data_json = _json_dumps(chart_data).replace("</", "<\\/")
+
+    # Escape the user-visible strings once; site_name appears twice below
+    esc = {
+        "site_name": html.escape(site_name),
+        "site_id": html.escape(site_id),
+        "threshold_str": html.escape(threshold_str),
+        "last_runnable": html.escape(last_runnable),
+        "pws": html.escape(pws_label or pws_station or "N/A"),
+    }
+
+    # Emit the page; optional sections are only formatted when shown
+    yield f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>{esc['site_name']} - River Dashboard</title>
+<style>
+{_DETAIL_CSS_HEAD}  background: {status_color};
+{_DETAIL_CSS_TAIL}</style>
+</head>
+<body>
+<div class="container">
+  <a href="/" class="back-link">← Back to All Rivers</a>
+
+  <div class="header">
+    <h1>{esc['site_name']}{get_location_links(site_id, tva_site_code)}</h1>
+"""
+    # Status badge and site meta (USGS/StreamBeam only)
+    if not is_tva:
+        yield f'''    <div class="status">{status_text}</div>
+    <div class="meta">
+      <span><strong>USGS Site:</strong> {esc['site_id']}</span>
+      <span><strong>Threshold:</strong> {esc['threshold_str']}</span>
+      <span><strong>Last Runnable:</strong> {esc['last_runnable']}</span>
+    </div>'''
+    yield f"""
+  </div>
+
+  {tva_forecast_html}
+
+"""
+    # Visual gauge chart (North Chickamauga)
+    if is_north_chick:
+        yield f'''  <div class="chart-row">
+    <div class="chart-box" style="background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%);">
+      <h2 style="color: #92400e;">📏 Visual Gauge (Estimated)</h2>
+      <div class="chart-value" style="color: #b45309;">{f"{current_visual:.2f}" if current_visual is not None else "N/A"} <span style="font-size:18px; font-weight:normal;">ft visual</span></div>
+      <div class="avg-controls">
+        <span class="avg-label">Average:</span>
+        <button class="avg-btn" data-hours="24" data-target="visual">24h</button>
+        <button class="avg-btn" data-hours="48" data-target="visual">48h</button>
+        <button class="avg-btn active" data-hours="72" data-target="visual">3d</button>
+        <button class="avg-btn" data-hours="168" data-target="visual">7d</button>
+        <span class="avg-display"><span class="avg-value" id="visualAvgValue">{f"{avg_visual:.2f}" if avg_visual else "N/A"}</span> ft</span>
+      </div>
+      <div class="chart-meta">Range: {f"{min_visual:.2f} - {max_visual:.2f}" if max_visual else "N/A"} ft visual (3-day) · <span style="color:#22c55e;">Runnable ≥ 1.7 ft</span></div>
+      <div class="chart-canvas">
+        <canvas id="visualChart"></canvas>
+      </div>
+      <div style="margin-top: 12px; padding: 12px; background: rgba(255,255,255,0.7); border-radius: 8px; font-size: 12px; color: #78350f;">
+        <strong>Note:</strong> Visual gauge is calculated from USGS stage using formula: <code>Visual = 0.69 × Stage - 1.89</code>
+        <br>Calibration: 6.22 ft USGS = 2.42 ft visual, 5.34 ft USGS = 1.81 ft visual
+      </div>
+    </div>
+  </div>'''
+    # Bard's flow guide (North Chickamauga)
+    if is_north_chick and current_visual is not None:
+        bard_level = _find_level(_BARD_LEVELS, _BARD_MINS, current_visual) if current_visual else None
+        yield f'''
+
+  <div class="bard-flow-guide" style="background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%); border-radius: 16px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 12px rgba(0,0,0,0.08);">
+    <h3 style="margin: 0 0 16px 0; font-size: 18px; color: #1e293b; display: flex; align-items: center; gap: 8px;">
+      <span style="font-size: 24px;">🚣</span> North Chick Flow Guide
+      <span style="font-size: 12px; color: #64748b; font-weight: normal;">(Bard Trimble)</span>
+    </h3>
+    <div style="display: grid; grid-template-columns: repeat(7, 1fr); gap: 6px;">
+      <div style="text-align: center; padding: 10px 4px; background: #9ca3af; border-radius: 8px; color: white;">
+        <div style="font-size: 12px; font-weight: bold;">&lt;1.5</div>
+        <div style="font-size: 10px; margin-top: 4px;">Too Low</div>
+      </div>
+      <div style="text-align: center; padding: 10px 4px; background: #fbbf24; border-radius: 8px; color: #78350f;">
+        <div style="font-size: 12px; font-weight: bold;">1.5-2.0</div>
+        <div style="font-size: 10px; margin-top: 4px;">Low</div>
+      </div>
+      <div style="text-align: center; padding: 10px 4px; background: #86efac; border-radius: 8px; color: #14532d;">
+        <div style="font-size: 12px; font-weight: bold;">2.0-2.5</div>
+        <div style="font-size: 10px; margin-top: 4px;">Worth It</div>
+      </div>
+      <div style="text-align: center; padding: 10px 4px; background: #22c55e; border-radius: 8px; color: white; box-shadow: 0 0 12px rgba(34, 197, 94, 0.4);">
+        <div style="font-size: 12px; font-weight: bold;">2.5-3.2</div>
+        <div style="font-size: 10px; margin-top: 4px;">Good ⭐</div>
+      </div>
       <div style="text-align: center; padding: 10px 4px; background: #3b82f6; border-radius: 8px; color: white;">
         <div style="font-size: 12px; font-weight: bold;">3.2-3.5</div>
         <div style="font-size: 10px; margin-top: 4px;">Meaty</div>
@@ -1019,11 +2203,14 @@ body {{
     </div>
     <div style="margin-top: 12px; text-align: center; font-size: 12px; color: #64748b;">
       Current Visual: <strong style="color: #1e293b;">{current_visual:.2f} ft</strong>
-      {f' — <span style="background: {[l["color"] for l in bard_levels if l["min"] <= (current_visual or 0) < l["max"]][0] if current_visual else "#9ca3af"}; color: white; padding: 2px 8px; border-radius: 4px; font-weight: bold;">{[l["label"] for l in bard_levels if l["min"] <= (current_visual or 0) < l["max"]][0] if current_visual else "N/A"}</span>' if current_visual else ''}
+      {f' — <span style="background: {bard_level["color"]}; color: white; padding: 2px 8px; border-radius: 4px; font-weight: bold;">{bard_level["label"]}</span>' if bard_level else ''}
     </div>
-  </div>''' if is_north_chick and current_visual is not None else ''}
+  </div>'''
+    # CFS chart
+    if not (is_tva or is_streambeam or hide_cfs_chart):
+        yield f'''
 
-  {"" if is_tva or is_streambeam or hide_cfs_chart else f'''<div class="chart-row">
+  <div class="chart-row">
     <div class="chart-box">
       <h2>Discharge (CFS)</h2>
       <div class="chart-value">{f"{int(current_cfs):,}" if current_cfs is not None else "N/A"} <span style="font-size:18px; font-weight:normal;">CFS</span></div>
@@ -1040,9 +2227,13 @@ body {{
         <canvas id="cfsChart"></canvas>
       </div>
     </div>
-  </div>'''}
+  </div>'''
+    # Adam's flow guide (Little River Canyon)
+    if is_lrc:
+        lrc_level = _find_level(_LRC_LEVELS, _LRC_MINS, current_cfs) if current_cfs else None
+        yield f'''
 
-  {f'''<div class="lrc-flow-guide" style="background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%); border-radius: 16px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 12px rgba(0,0,0,0.08);">
+  <div class="lrc-flow-guide" style="background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%); border-radius: 16px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 12px rgba(0,0,0,0.08);">
     <h3 style="margin: 0 0 16px 0; font-size: 18px; color: #1e293b; display: flex; align-items: center; gap: 8px;">
       <span style="font-size: 24px;">🌊</span> LRC Flow Guide
       <span style="font-size: 12px; color: #64748b; font-weight: normal;">(Adam Goshorn)</span>
@@ -1075,48 +2266,17 @@ body {{
     </div>
     <div style="margin-top: 12px; text-align: center; font-size: 12px; color: #64748b;">
       Current: <strong style="color: #1e293b;">{int(current_cfs):,} CFS</strong>
-      {f' — <span style="background: {[l["color"] for l in lrc_levels if l["min"] <= (current_cfs or 0) < l["max"]][0] if current_cfs else "#9ca3af"}; color: white; padding: 2px 8px; border-radius: 4px; font-weight: bold;">{[l["label"] for l in lrc_levels if l["min"] <= (current_cfs or 0) < l["max"]][0] if current_cfs else "N/A"}</span>' if current_cfs else ''}
+      {f' — <span style="background: {lrc_level["color"]}; color: white; padding: 2px 8px; border-radius: 4px; font-weight: bold;">{lrc_level["label"]}</span>' if lrc_level else ''}
     </div>
-  </div>''' if is_lrc else ''}
-
-  {f'''<div class="prediction-panel" style="background: linear-gradient(135deg, {'#ecfdf5' if level_prediction and level_prediction['above_threshold'] else '#fef3c7'} 0%, {'#d1fae5' if level_prediction and level_prediction['above_threshold'] else '#fde68a'} 100%); border-radius: 12px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 16px;">
-      <span style="font-size: 28px;">{level_prediction['trend_icon'] if level_prediction else '→'}</span>
-      <div>
-        <h3 style="margin: 0; font-size: 18px; color: #374151;">Flow Prediction</h3>
-        <p style="margin: 4px 0 0; font-size: 13px; color: #6b7280;">Based on 8-hour trend analysis</p>
-      </div>
-    </div>
-    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(140px, 1fr)); gap: 16px;">
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Current Flow</div>
-        <div style="font-size: 24px; font-weight: bold; color: #1f2937;">{int(level_prediction['current']):,} cfs</div>
-      </div>
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Threshold</div>
-        <div style="font-size: 24px; font-weight: bold; color: #22c55e;">{int(level_prediction['threshold']):,} cfs</div>
-      </div>
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Trend (8h)</div>
-        <div style="font-size: 24px; font-weight: bold; color: {level_prediction['trend_color']};">{level_prediction['trend'].title()} {level_prediction['trend_icon']}</div>
-        <div style="font-size: 12px; color: #6b7280;">{level_prediction['rate_per_hour']:.1f} cfs/hr</div>
-      </div>
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Recent Peak</div>
-        <div style="font-size: 24px; font-weight: bold; color: #3b82f6;">{int(level_prediction['peak']):,} cfs</div>
-      </div>
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Distance to Threshold</div>
-        <div style="font-size: 24px; font-weight: bold; color: {'#22c55e' if level_prediction['above_threshold'] else '#f59e0b'};">{'+' if level_prediction['above_threshold'] else '-'}{int(level_prediction['distance_to_threshold']):,} cfs</div>
-      </div>
-      <div style="background: {'#dcfce7' if level_prediction['eta_text'] and level_prediction['above_threshold'] else '#fef9c3' if level_prediction['eta_text'] else 'white'}; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">{'ETA to Drop Below' if level_prediction['above_threshold'] else 'ETA to Reach'} Threshold</div>
-        <div style="font-size: 20px; font-weight: bold; color: {'#16a34a' if level_prediction['above_threshold'] else '#d97706'};">{level_prediction['eta_text'] if level_prediction['eta_text'] else 'N/A'}</div>
-      </div>
-    </div>
-  </div>''' if level_prediction and level_prediction.get('unit') == 'cfs' and not is_tva else ''}
-
-  {"" if is_tva else f'''<div class="chart-row">
+  </div>'''
+    # CFS-based level prediction
+    if level_prediction and level_prediction.get('unit') == 'cfs' and not is_tva:
+        yield _prediction_panel_html(level_prediction, "Flow Prediction", "Current Flow", lambda v: f"{int(v):,}", 1)
+    # Gage height / water level chart
+    if not is_tva:
+        yield f'''
+
+  <div class="chart-row">
     <div class="chart-box">
       <h2>{"Water Level" if is_streambeam else "Gage Height"} (Feet)</h2>
       <div class="chart-value">{current_ft:.2f} <span style="font-size:18px; font-weight:normal;">ft</span></div>
@@ -1133,46 +2293,15 @@ body {{
         <canvas id="feetChart"></canvas>
       </div>
     </div>
-  </div>'''}
-
-  {f'''<div class="prediction-panel" style="background: linear-gradient(135deg, {'#ecfdf5' if level_prediction and level_prediction['above_threshold'] else '#fef3c7'} 0%, {'#d1fae5' if level_prediction and level_prediction['above_threshold'] else '#fde68a'} 100%); border-radius: 12px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-    <div style="display: flex; align-items: center; gap: 12px; margin-bottom: 16px;">
-      <span style="font-size: 28px;">{level_prediction['trend_icon'] if level_prediction else '→'}</span>
-      <div>
-        <h3 style="margin: 0; font-size: 18px; color: #374151;">Level Prediction</h3>
-        <p style="margin: 4px 0 0; font-size: 13px; color: #6b7280;">Based on 8-hour trend analysis</p>
-      </div>
-    </div>
-    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(140px, 1fr)); gap: 16px;">
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Current Level</div>
-        <div style="font-size: 24px; font-weight: bold; color: #1f2937;">{level_prediction['current']:.2f} ft</div>
-      </div>
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Threshold</div>
-        <div style="font-size: 24px; font-weight: bold; color: #22c55e;">{level_prediction['threshold']:.2f} ft</div>
-      </div>
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Trend (8h)</div>
-        <div style="font-size: 24px; font-weight: bold; color: {level_prediction['trend_color']};">{level_prediction['trend'].title()} {level_prediction['trend_icon']}</div>
-        <div style="font-size: 12px; color: #6b7280;">{level_prediction['rate_per_hour']:.3f} ft/hr</div>
-      </div>
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Recent Peak</div>
-        <div style="font-size: 24px; font-weight: bold; color: #3b82f6;">{level_prediction['peak']:.2f} ft</div>
-      </div>
-      <div style="background: white; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">Distance to Threshold</div>
-        <div style="font-size: 24px; font-weight: bold; color: {'#22c55e' if level_prediction['above_threshold'] else '#f59e0b'};">{'+' if level_prediction['above_threshold'] else '-'}{level_prediction['distance_to_threshold']:.2f} ft</div>
-      </div>
-      <div style="background: {'#dcfce7' if level_prediction['eta_text'] and level_prediction['above_threshold'] else '#fef9c3' if level_prediction['eta_text'] else 'white'}; border-radius: 8px; padding: 12px; text-align: center;">
-        <div style="font-size: 11px; text-transform: uppercase; color: #6b7280; margin-bottom: 4px;">{'ETA to Drop Below' if level_prediction['above_threshold'] else 'ETA to Reach'} Threshold</div>
-        <div style="font-size: 20px; font-weight: bold; color: {'#16a34a' if level_prediction['above_threshold'] else '#d97706'};">{level_prediction['eta_text'] if level_prediction['eta_text'] else 'N/A'}</div>
-      </div>
-    </div>
-  </div>''' if level_prediction and level_prediction.get('unit') == 'ft' and not is_tva else ''}
-
-  {"" if is_tva else f'''<div class="chart-row">
+  </div>'''
+    # Feet-based level prediction
+    if level_prediction and level_prediction.get('unit') == 'ft' and not is_tva:
+        yield _prediction_panel_html(level_prediction, "Level Prediction", "Current Level", lambda v: f"{v:.2f}", 3)
+    # Rainfall chart (observed + QPF)
+    if not is_tva:
+        yield f'''
+
+  <div class="chart-row">
     <div class="chart-box" style="background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%);">
       <h2 style="color: #0369a1;">🌧️ Rainfall & Forecast (Inches)</h2>
       <div class="chart-value" style="color: #0284c7;">{total_rain:.2f} <span style="font-size:18px; font-weight:normal;">in (7-day)</span>{f' + <span style="color:#f59e0b;">{total_qpf:.2f}</span> <span style="font-size:18px; font-weight:normal;">in forecast</span>' if total_qpf > 0 else ''}</div>
@@ -1191,7 +2320,8 @@ body {{
         </div>
       </div>
     </div>
-  </div>'''}
+  </div>'''
+    yield f"""
 
   <div class="stats-grid">
     <div class="stat-box">
@@ -1217,7 +2347,7 @@ body {{
   <div class="weather-rainfall-section">
     <div class="weather-rainfall-header">
       <div class="weather-rainfall-title">🌧️ Weather & Rainfall</div>
-      {f'<div class="weather-rainfall-source">PWS: {h(pws_label or pws_station or "N/A")}</div>' if pws_station else ''}
+      {f'<div class="weather-rainfall-source">PWS: {esc["pws"]}</div>' if pws_station else ''}
     </div>
     <div class="weather-rainfall-grid">
       <div class="weather-card">
@@ -1262,7 +2392,10 @@ body {{
     </div>
   </div>
 
-  {"" if is_streambeam else '''<div class="history-section">
+"""
+    # Historical data explorer (loads from /api/usgs-history)
+    if not is_streambeam:
+        yield '''  <div class="history-section">
     <div class="history-header">
       <div class="history-title">Historical Data</div>
       <div class="history-subtitle">Select time range to view historical trends</div>
@@ -1306,667 +2439,17 @@ body {{
       </div>
     </div>
   </div>
-'''}
+'''
+    yield """
 
 </div>
 
-{"" if is_tva else f'''<script>
-// Debug: Log data to console
-console.log('CFS Labels:', {json.dumps(cfs_labels)});
-console.log('CFS Values:', {json.dumps(cfs_values)});
-console.log('Feet Labels:', {json.dumps(feet_labels)});
-console.log('Feet Values:', {json.dumps(feet_values)});
-
-// Average Period Calculator
-(function() {{
-  const cfsValues = {json.dumps(cfs_values)};
-  const feetValues = {json.dumps(feet_values)};
-  const visualValues = {json.dumps(visual_values)};
-
-  // Data is ~4 readings per hour (15-min intervals)
-  const pointsPerHour = 4;
-
-  function calculateAvg(values, hours) {{
-    if (!values || values.length === 0) return null;
-    const points = hours * pointsPerHour;
-    const slice = values.slice(-Math.min(points, values.length));
-    const sum = slice.reduce((a, b) => a + b, 0);
-    return sum / slice.length;
-  }}
-
-  function formatValue(val, isCfs) {{
-    if (val === null) return 'N/A';
-    if (isCfs) return Math.round(val).toLocaleString();
-    return val.toFixed(2);
-  }}
-
-  // Handle button clicks
-  document.querySelectorAll('.avg-btn').forEach(btn => {{
-    btn.addEventListener('click', function() {{
-      const target = this.dataset.target;
-      const hours = parseInt(this.dataset.hours);
-
-      // Update active button state
-      document.querySelectorAll(`.avg-btn[data-target="${{target}}"]`).forEach(b => b.classList.remove('active'));
-      this.classList.add('active');
-
-      // Calculate and update average
-      let values;
-      let displayElId;
-      if (target === 'cfs') {{
-        values = cfsValues;
-        displayElId = 'cfsAvgValue';
-      }} else if (target === 'visual') {{
-        values = visualValues;
-        displayElId = 'visualAvgValue';
-      }} else {{
-        values = feetValues;
-        displayElId = 'feetAvgValue';
-      }}
-      const avg = calculateAvg(values, hours);
-      const displayEl = document.getElementById(displayElId);
-      if (displayEl) {{
-        displayEl.textContent = formatValue(avg, target === 'cfs');
-      }}
-    }});
-  }});
-}})();
-
-// Visual Gauge Chart (only for North Chickamauga)
-const visualChartEl = document.getElementById('visualChart');
-if (visualChartEl) {{
-  const visualCtx = visualChartEl.getContext('2d');
-  const visualLabels = {json.dumps(feet_labels)};  // Same timestamps as feet
-  const visualValues = {json.dumps(visual_values)};
-  const visualThreshold = {visual_threshold};  // Runnable threshold in visual feet
-
-  if (visualLabels.length === 0 || visualValues.length === 0) {{
-    visualCtx.canvas.parentElement.innerHTML = '<div style="padding:20px;text-align:center;color:#999;">No visual gauge data available</div>';
-  }} else {{
-    new Chart(visualCtx, {{
-      type: 'line',
-      data: {{
-        labels: visualLabels,
-        datasets: [
-          {{
-            label: 'Visual Gauge',
-            data: visualValues,
-            borderColor: '#b45309',
-            backgroundColor: 'rgba(180, 83, 9, 0.15)',
-            borderWidth: 2,
-            tension: 0.4,
-            fill: true,
-            pointRadius: 0,
-            pointHoverRadius: 4,
-            order: 1
-          }},
-          {{
-            label: 'Runnable (1.7 ft)',
-            data: visualLabels.map(() => visualThreshold),
-            borderColor: '#22c55e',
-            borderWidth: 2,
-            borderDash: [6, 4],
-            pointRadius: 0,
-            pointHoverRadius: 0,
-            fill: false,
-            tension: 0,
-            order: 0
-          }}
-        ]
-      }},
-      options: {{
-        responsive: true,
-        maintainAspectRatio: false,
-        plugins: {{
-          legend: {{
-            display: true,
-            position: 'top',
-            labels: {{
-              usePointStyle: true,
-              boxWidth: 30,
-              font: {{ size: 11 }}
-            }}
-          }},
-          tooltip: {{
-            mode: 'index',
-            intersect: false,
-            filter: function(tooltipItem) {{
-              return tooltipItem.dataset.label === 'Visual Gauge';
-            }}
-          }}
-        }},
-        scales: {{
-          x: {{
-            ticks: {{
-              maxRotation: 45,
-              minRotation: 45,
-              autoSkip: true,
-              maxTicksLimit: 24,
-              font: {{ size: 9 }}
-            }},
-            grid: {{ color: 'rgba(0,0,0,0.08)' }}
-          }},
-          y: {{
-            beginAtZero: false,
-            title: {{
-              display: true,
-              text: 'Visual Gauge (ft)',
-              color: '#b45309'
-            }},
-            grid: {{ color: 'rgba(0,0,0,0.05)' }}
-          }}
-        }}
-      }}
-    }});
-  }}
-}}
-
-// CFS Chart (skip if element doesn't exist - e.g., StreamBeam sites)
-const cfsChartEl = document.getElementById('cfsChart');
-if (cfsChartEl) {{
-const cfsCtx = cfsChartEl.getContext('2d');
-const cfsLabels = {json.dumps(cfs_labels)};
-const cfsValues = {json.dumps(cfs_values)};
-const thresholdCfs = {threshold_cfs if threshold_cfs is not None else 'null'};
-const isLrc = {'true' if is_lrc else 'false'};
-
-// LRC flow guide levels and colors (from Adam Goshorn)
-const lrcLevels = [
-  {{ cfs: 250, label: 'Good Low', color: '#fbbf24' }},
-  {{ cfs: 400, label: 'Shitty Medium', color: '#a67c52' }},
-  {{ cfs: 800, label: 'Good Medium', color: '#86efac' }},
-  {{ cfs: 1500, label: 'BEST!', color: '#22c55e' }},
-  {{ cfs: 2500, label: 'Too High', color: '#ef4444' }}
-];
-
-if (cfsLabels.length === 0 || cfsValues.length === 0) {{
-  cfsCtx.canvas.parentElement.innerHTML = '<div style="padding:20px;text-align:center;color:#999;">No CFS data available for this site</div>';
-}} else {{
-  // Get current CFS to determine which threshold lines to show
-  const currentCfs = cfsValues[cfsValues.length - 1];
-
-  // Build datasets - main data line + threshold lines
-  const cfsDatasets = [{{
-    label: 'CFS',
-    data: cfsValues,
-    borderColor: '#1a73e8',
-    backgroundColor: 'rgba(26, 115, 232, 0.1)',
-    borderWidth: 2,
-    tension: 0.4,
-    fill: true,
-    pointRadius: 0,
-    pointHoverRadius: 4,
-    order: 10
-  }}];
-
-  // Add LRC threshold lines - only show relevant ones based on current CFS
-  if (isLrc) {{
-    // Determine which zone we're in and show only relevant thresholds
-    let relevantLevels = [];
-
-    if (currentCfs < 250) {{
-      // Not Runnable - show threshold to Good Low
-      relevantLevels = lrcLevels.filter(l => l.cfs === 250);
-    }} else if (currentCfs < 400) {{
-      // Good Low - show lower bound and next threshold
-      relevantLevels = lrcLevels.filter(l => l.cfs === 250 || l.cfs === 400);
-    }} else if (currentCfs < 800) {{
-      // Shitty Medium - show bounds
-      relevantLevels = lrcLevels.filter(l => l.cfs === 400 || l.cfs === 800);
-    }} else if (currentCfs < 1500) {{
-      // Good Medium - show bounds
-      relevantLevels = lrcLevels.filter(l => l.cfs === 800 || l.cfs === 1500);
-    }} else if (currentCfs < 2500) {{
-      // BEST! - show bounds
-      relevantLevels = lrcLevels.filter(l => l.cfs === 1500 || l.cfs === 2500);
-    }} else {{
-      // Too High - show the threshold we crossed
-      relevantLevels = lrcLevels.filter(l => l.cfs === 2500);
-    }}
-
-    relevantLevels.forEach((level, idx) => {{
-      cfsDatasets.push({{
-        label: level.cfs + ' CFS (' + level.label + ')',
-        data: cfsLabels.map(() => level.cfs),
-        borderColor: level.color,
-        borderWidth: 2,
-        borderDash: [6, 4],
-        pointRadius: 0,
-        pointHoverRadius: 0,
-        fill: false,
-        tension: 0,
-        order: idx
-      }});
-    }});
-  }} else if (thresholdCfs !== null) {{
-    cfsDatasets.push({{
-      label: 'Runnable Threshold',
-      data: cfsLabels.map(() => thresholdCfs),
-      borderColor: '#22c55e',
-      borderWidth: 2,
-      borderDash: [6, 4],
-      pointRadius: 0,
-      pointHoverRadius: 0,
-      fill: false,
-      tension: 0,
-      order: 0
-    }});
-  }}
-
-  new Chart(cfsCtx, {{
-    type: 'line',
-    data: {{
-      labels: cfsLabels,
-      datasets: cfsDatasets
-    }},
-    options: {{
-      responsive: true,
-      maintainAspectRatio: false,
-      plugins: {{
-        legend: {{
-          display: isLrc || thresholdCfs !== null,
-          position: 'top',
-          labels: {{
-            usePointStyle: true,
-            boxWidth: 30,
-            font: {{ size: 10 }},
-            filter: function(legendItem, data) {{
-              // For LRC, show threshold lines in legend; for others, hide threshold
-              if (isLrc) {{
-                return legendItem.text !== 'CFS';  // Show all threshold lines, hide main CFS line from legend
-              }}
-              return legendItem.text !== 'Runnable Threshold';
-            }}
-          }}
-        }},
-        tooltip: {{
-          mode: 'index',
-          intersect: false,
-          filter: function(tooltipItem) {{
-            // Hide all threshold lines from tooltip
-            return tooltipItem.dataset.label === 'CFS';
-          }}
-        }}
-      }},
-      scales: {{
-        x: {{
-          ticks: {{
-            maxRotation: 45,
-            minRotation: 45,
-            autoSkip: true,
-            maxTicksLimit: 24,
-            font: {{ size: 9 }}
-          }},
-          grid: {{ color: 'rgba(0,0,0,0.08)' }}
-        }},
-        y: {{
-          beginAtZero: false,
-          grid: {{ color: 'rgba(0,0,0,0.05)' }}
-        }}
-      }}
-    }}
-  }});
-}}
-}} // End cfsChartEl check
-
-// Feet Chart
-const feetCtx = document.getElementById('feetChart').getContext('2d');
-const feetLabels = {json.dumps(feet_labels)};
-const feetValues = {json.dumps(feet_values)};
-const thresholdFt = {threshold_ft if threshold_ft is not None else 'null'};
-
-if (feetLabels.length === 0 || feetValues.length === 0) {{
-  feetCtx.canvas.parentElement.innerHTML = '<div style="padding:20px;text-align:center;color:#999;">No gage height data available for this site</div>';
-}} else {{
-  // Build datasets - main data line + optional threshold line
-  const feetDatasets = [{{
-    label: 'Feet',
-    data: feetValues,
-    borderColor: '#1a73e8',
-    backgroundColor: 'rgba(26, 115, 232, 0.1)',
-    borderWidth: 2,
-    tension: 0.4,
-    fill: true,
-    pointRadius: 0,
-    pointHoverRadius: 4,
-    order: 1
-  }}];
-
-  // Add threshold line if we have a threshold value
-  if (thresholdFt !== null) {{
-    feetDatasets.push({{
-      label: 'Runnable Threshold',
-      data: feetLabels.map(() => thresholdFt),
-      borderColor: '#22c55e',
-      borderWidth: 2,
-      borderDash: [6, 4],
-      pointRadius: 0,
-      pointHoverRadius: 0,
-      fill: false,
-      tension: 0,
-      order: 0
-    }});
-  }}
-
-  new Chart(feetCtx, {{
-    type: 'line',
-    data: {{
-      labels: feetLabels,
-      datasets: feetDatasets
-    }},
-    options: {{
-      responsive: true,
-      maintainAspectRatio: false,
-      plugins: {{
-        legend: {{
-          display: thresholdFt !== null,
-          position: 'top',
-          labels: {{
-            usePointStyle: true,
-            boxWidth: 30,
-            font: {{ size: 11 }}
-          }}
-        }},
-        tooltip: {{
-          mode: 'index',
-          intersect: false,
-          filter: function(tooltipItem) {{
-            // Hide threshold line from tooltip
-            return tooltipItem.dataset.label !== 'Runnable Threshold';
-          }}
-        }}
-      }},
-      scales: {{
-        x: {{
-          ticks: {{
-            maxRotation: 45,
-            minRotation: 45,
-            autoSkip: true,
-            maxTicksLimit: 24,
-            font: {{ size: 9 }}
-          }},
-          grid: {{ color: 'rgba(0,0,0,0.08)' }}
-        }},
-        y: {{
-          beginAtZero: false,
-          grid: {{ color: 'rgba(0,0,0,0.05)' }}
-        }}
-      }}
-    }}
-  }});
-}}
-
-// Rainfall Chart (bar chart for daily totals + QPF forecast)
-const rainChartEl = document.getElementById('rainChart');
-if (rainChartEl) {{
-  const rainCtx = rainChartEl.getContext('2d');
-  const rainLabels = {json.dumps(rain_labels)};
-  const rainValues = {json.dumps(rain_values)};
-  const qpfLabels = {json.dumps(qpf_labels)};
-  const qpfValues = {json.dumps(qpf_values)};
-
-  // Combine historical + QPF labels and create datasets
-  const allLabels = [...rainLabels, ...qpfLabels];
-  const historicalData = [...rainValues, ...Array(qpfLabels.length).fill(null)];
-  const forecastData = [...Array(rainLabels.length).fill(null), ...qpfValues];
-
-  if (allLabels.length === 0) {{
-    rainCtx.canvas.parentElement.innerHTML = '<div style="padding:20px;text-align:center;color:#999;">No rainfall data available for this site</div>';
-  }} else {{
-    new Chart(rainCtx, {{
-      type: 'bar',
-      data: {{
-        labels: allLabels,
-        datasets: [
-          {{
-            label: 'Historical Rain',
-            data: historicalData,
-            backgroundColor: 'rgba(14, 165, 233, 0.7)',
-            borderColor: 'rgba(3, 105, 161, 1)',
-            borderWidth: 1,
-            borderRadius: 4,
-          }},
-          {{
-            label: 'QPF Forecast',
-            data: forecastData,
-            backgroundColor: 'rgba(245, 158, 11, 0.7)',
-            borderColor: 'rgba(217, 119, 6, 1)',
-            borderWidth: 1,
-            borderRadius: 4,
-          }}
-        ]
-      }},
-      options: {{
-        responsive: true,
-        maintainAspectRatio: false,
-        plugins: {{
-          legend: {{ display: false }},
-          tooltip: {{
-            callbacks: {{
-              label: function(context) {{
-                if (context.parsed.y === null) return null;
-                const type = context.dataset.label;
-                return type + ': ' + context.parsed.y.toFixed(2) + ' inches';
-              }}
-            }}
-          }}
-        }},
-        scales: {{
-          x: {{
-            grid: {{ display: false }}
-          }},
-          y: {{
-            beginAtZero: true,
-            title: {{
-              display: true,
-              text: 'Inches',
-              color: '#0369a1'
-            }},
-            grid: {{ color: 'rgba(0,0,0,0.05)' }}
-          }}
-        }}
-      }}
-    }});
-  }}
-}}
-
-// History Chart with Time Range Selection (skip if element doesn't exist - e.g., StreamBeam sites)
-(function() {{
-  const historyChartEl = document.getElementById('historyChart');
-  if (!historyChartEl) {{
-    console.log('History chart element not found - skipping history chart initialization');
-    return;
-  }}
-  const siteId = '{site_id}';
-  let historyChart = null;
-
-  async function loadHistoryData(days) {{
-    try {{
-      const response = await fetch(`/api/usgs-history/${{siteId}}?days=${{days}}`);
-      const data = await response.json();
-      return data;
-    }} catch (err) {{
-      console.error('Failed to load history:', err);
-      return null;
-    }}
-  }}
-
-  function updateStats(data) {{
-    document.getElementById('statCount').textContent = (data.cfs_count || 0).toLocaleString();
-
-    if (data.stats && data.stats.cfs) {{
-      document.getElementById('statMaxCfs').textContent =
-        data.stats.cfs.max ? Math.round(data.stats.cfs.max).toLocaleString() + ' CFS' : '--';
-      document.getElementById('statAvgCfs').textContent =
-        data.stats.cfs.avg ? Math.round(data.stats.cfs.avg).toLocaleString() + ' CFS' : '--';
-    }}
-
-    if (data.stats && data.stats.feet) {{
-      document.getElementById('statMaxFeet').textContent =
-        data.stats.feet.max ? data.stats.feet.max.toFixed(2) + ' ft' : '--';
-    }}
-  }}
-
-  function renderChart(data) {{
-    const ctx = document.getElementById('historyChart').getContext('2d');
-
-    if (historyChart) {{
-      historyChart.destroy();
-    }}
-
-    if (!data.cfs || data.cfs.length === 0) {{
-      ctx.canvas.parentElement.innerHTML =
-        '<div style="padding:40px;text-align:center;color:#666;">' +
-        '<p style="font-size:18px;">No historical data available</p></div>';
-      return;
-    }}
-
-    // Format labels based on time range for better readability
-    const currentDays = parseInt(document.querySelector('.range-btn.active')?.dataset.days || 3);
-    const labels = data.cfs.map(o => {{
-      const d = new Date(o.timestamp);
-      if (currentDays <= 3) {{
-        // For 3 days or less, show day + time (e.g., "Sat 2pm")
-        return d.toLocaleDateString('en-US', {{ weekday: 'short' }}) + ' ' +
-               d.toLocaleTimeString('en-US', {{ hour: 'numeric', hour12: true }});
-      }} else if (currentDays <= 7) {{
-        // For 7 days, show month/day + hour (e.g., "Jan 4 2pm")
-        return d.toLocaleDateString('en-US', {{ month: 'short', day: 'numeric' }}) + ' ' +
-               d.toLocaleTimeString('en-US', {{ hour: 'numeric', hour12: true }});
-      }} else {{
-        // For longer ranges, show month/day only
-        return d.toLocaleDateString('en-US', {{ month: 'short', day: 'numeric' }});
-      }}
-    }});
-
-    const cfsData = data.cfs.map(o => o.value);
-    const feetData = data.feet ? data.feet.map(o => o.value) : [];
-
-    const datasets = [
-      {{
-        label: 'Discharge (CFS)',
-        data: cfsData,
-        borderColor: '#ef4444',
-        backgroundColor: 'rgba(239, 68, 68, 0.1)',
-        borderWidth: 2,
-        fill: true,
-        tension: 0.3,
-        yAxisID: 'y',
-        pointRadius: 1,
-        pointHoverRadius: 4
-      }}
-    ];
-
-    if (feetData.length > 0) {{
-      datasets.push({{
-        label: 'Gage Height (ft)',
-        data: feetData,
-        borderColor: '#3b82f6',
-        borderWidth: 2,
-        fill: false,
-        tension: 0.3,
-        yAxisID: 'y1',
-        pointRadius: 0,
-        pointHoverRadius: 3
-      }});
-    }}
-
-    historyChart = new Chart(ctx, {{
-      type: 'line',
-      data: {{
-        labels: labels,
-        datasets: datasets
-      }},
-      options: {{
-        responsive: true,
-        maintainAspectRatio: false,
-        interaction: {{
-          mode: 'index',
-          intersect: false
-        }},
-        plugins: {{
-          legend: {{ display: false }},
-          tooltip: {{
-            backgroundColor: 'rgba(0,0,0,0.8)',
-            titleFont: {{ size: 14 }},
-            bodyFont: {{ size: 13 }},
-            padding: 12,
-            callbacks: {{
-              label: function(context) {{
-                let label = context.dataset.label || '';
-                if (context.parsed.y !== null) {{
-                  if (label.includes('CFS')) {{
-                    label += ': ' + context.parsed.y.toLocaleString() + ' CFS';
-                  }} else {{
-                    label += ': ' + context.parsed.y.toFixed(2) + ' ft';
-                  }}
-                }}
-                return label;
-              }}
-            }}
-          }}
-        }},
-        scales: {{
-          x: {{
-            ticks: {{
-              maxRotation: 45,
-              minRotation: 45,
-              autoSkip: true,
-              maxTicksLimit: 24,
-              font: {{ size: 9 }}
-            }},
-            grid: {{ color: 'rgba(0,0,0,0.08)' }}
-          }},
-          y: {{
-            type: 'linear',
-            display: true,
-            position: 'left',
-            title: {{
-              display: true,
-              text: 'Discharge (CFS)',
-              color: '#ef4444'
-            }},
-            ticks: {{ color: '#ef4444' }},
-            grid: {{ color: 'rgba(239, 68, 68, 0.1)' }}
-          }},
-          y1: {{
-            type: 'linear',
-            display: feetData.length > 0,
-            position: 'right',
-            title: {{
-              display: true,
-              text: 'Gage Height (ft)',
-              color: '#3b82f6'
-            }},
-            ticks: {{ color: '#3b82f6' }},
-            grid: {{ drawOnChartArea: false }}
-          }}
-        }}
-      }}
-    }});
-  }}
-
-  async function updateChart(days) {{
-    const data = await loadHistoryData(days);
-    if (data) {{
-      updateStats(data);
-      renderChart(data);
-    }}
-  }}
-
-  // Set up button click handlers
-  document.querySelectorAll('.range-btn').forEach(btn => {{
-    btn.addEventListener('click', function() {{
-      document.querySelectorAll('.range-btn').forEach(b => b.classList.remove('active'));
-      this.classList.add('active');
-      updateChart(parseInt(this.dataset.days));
-    }});
-  }});
-
-  // Initial load - default to 3 days
-  updateChart(3);
-}})();
-</script>'''}
+"""
+    # Chart.js setup
+    if not is_tva:
+        yield f'<script type="application/json" id="chartData">{chart_data_json}</script>\n'
+        yield f'<script src="{html.escape(script_src)}"></script>\n' if script_src else _DETAIL_SCRIPT
+    yield """
 
 <footer style="text-align:center; padding:20px; margin-top:30px; border-top:1px solid #e5e7eb; color:#6b7280; font-size:14px;">
   Michael Chanslor 2026
@@ -1974,7 +2457,70 @@ if (rainChartEl) {{
 </body>
 </html>"""
 
-    return html_content
+
+def generate_site_detail_html(
+    site_data: Dict[str, Any],
+    cfs_history: List[Tuple[str, float]],
+    feet_history: List[Tuple[str, float]],
+    script_src: Optional[str] = None
+) -> str:
+    """
+    Generate Google Analytics-style HTML dashboard for a river site.
+
+    Args:
+        site_data: Dict with site info (name, current cfs, current ft, etc.)
+        cfs_history: List of (timestamp, cfs) tuples for 7 days
+        feet_history: List of (timestamp, feet) tuples for 7 days
+        script_src: URL of the file from write_detail_assets(); the chart
+            script is inlined when not given
+
+    Returns:
+        HTML string
+    """
+    return "".join(iter_site_detail_html(site_data, cfs_history, feet_history, script_src))
+
+
+def _source_digest() -> Optional[str]:
+    """Hash this module's source, which holds the page markup, CSS and script."""
+    try:
+        with open(__file__, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    except OSError:
+        return None
+
+
+# Part of every render key, so a deploy that only changes the template
+# re-renders pages instead of leaving the old markup on disk
+_RENDER_SOURCE_DIGEST = _source_digest()
+
+
+def site_detail_render_key(
+    site_data: Dict[str, Any],
+    cfs_history: List[Tuple[str, float]],
+    feet_history: List[Tuple[str, float]],
+    script_src: Optional[str] = None
+) -> Optional[str]:
+    """
+    Hash every input of generate_site_detail_html.
+
+    The page is a pure function of these inputs plus today's date (rain and
+    QPF labels are relative to today), so an unchanged key means the page
+    on disk is still current. TVA pages are the exception: their dam
+    forecast panel is fetched during the render, so they get no key.
+    script_src and a digest of this module's source are hashed too, so
+    pages are rebuilt as soon as the script file, markup or CSS changes.
+
+    Returns:
+        32-character hex digest, or None if the page must always be rendered
+    """
+    if site_data.get("is_tva") or _RENDER_SOURCE_DIGEST is None:
+        return None
+    payload = json.dumps(
+        [site_data, cfs_history, feet_history, script_src, _RENDER_SOURCE_DIGEST,
+         date.today().isoformat()],
+        sort_keys=True, default=str,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
 
 
 if __name__ == "__main__":
@@ -1995,12 +2541,9 @@ if __name__ == "__main__":
         "last_in_time": "Oct 31, 2025 10:15 AM"
     }
 
-    cfs_hist = fetch_usgs_7day_data("02455000", "00060")
-    feet_hist = fetch_usgs_7day_data("02455000", "00065")
-
-    html = generate_site_detail_html(test_data, cfs_hist, feet_hist)
+    cfs_hist, feet_hist = fetch_usgs_7day_both("02455000")
 
     with open("test_site_detail.html", "w") as f:
-        f.write(html)
+        f.writelines(iter_site_detail_html(test_data, cfs_hist, feet_hist))
 
     print("Generated test_site_detail.html")
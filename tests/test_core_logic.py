@@ -412,6 +412,157 @@ class TestStreamBeamValidation:
         assert valid is True
 
 
+# =============================================================================
+# Test _get() gzip handling
+# =============================================================================
+class TestGetGzip:
+    """Tests for gzip-aware USGS JSON fetching through the shared session."""
+
+    @staticmethod
+    def _fake_get(body, encoding, seen):
+        import io
+        import requests
+        from urllib3.response import HTTPResponse
+
+        def get(url, timeout=None):
+            seen.append(url)
+            resp = requests.Response()
+            resp.status_code = 200
+            headers = {"Content-Encoding": encoding} if encoding else {}
+            resp.headers.update(headers)
+            resp.raw = HTTPResponse(body=io.BytesIO(body), headers=headers,
+                                    status=200, preload_content=False)
+            return resp
+        return get
+
+    def test_gzip_response_decoded(self, monkeypatch):
+        """A gzip-encoded body is decompressed before parsing."""
+        import gzip
+        import usgs_multi_alert
+        seen = []
+        body = gzip.compress(b'{"value": {"timeSeries": []}}')
+        monkeypatch.setattr(usgs_multi_alert._SESSION, "get", self._fake_get(body, "gzip", seen))
+        assert usgs_multi_alert._get("https://example.test/iv") == {"value": {"timeSeries": []}}
+        assert seen == ["https://example.test/iv"]
+
+    def test_plain_response(self, monkeypatch):
+        """Servers that ignore Accept-Encoding still work."""
+        import usgs_multi_alert
+        seen = []
+        monkeypatch.setattr(usgs_multi_alert._SESSION, "get", self._fake_get(b'{"ok": 1}', None, seen))
+        assert usgs_multi_alert._get("https://example.test/iv") == {"ok": 1}
+
+    def test_session_reused(self, monkeypatch):
+        """Every fetch goes through the shared session."""
+        import usgs_multi_alert
+        urls = []
+        monkeypatch.setattr(usgs_multi_alert._SESSION, "get", self._fake_get(b'{"ok": 1}', None, urls))
+        assert usgs_multi_alert._get("https://example.test/a") == {"ok": 1}
+        assert usgs_multi_alert._get("https://example.test/b") == {"ok": 1}
+        assert urls == ["https://example.test/a", "https://example.test/b"]
+        assert usgs_multi_alert._SESSION.headers["Accept-Encoding"] == "gzip"
+
+
+# =============================================================================
+# Test detail render keys
+# =============================================================================
+class TestDetailRenderKey:
+    """Tests for the per-site detail render key stored in the state DB."""
+
+    def test_round_trip(self, tmp_path):
+        """Keys are stored per site and overwritten on update."""
+        from usgs_multi_alert import open_state_db, read_detail_render_key, write_detail_render_key
+        conn = open_state_db(str(tmp_path / "state.sqlite"))
+        assert read_detail_render_key(conn, "03571000") is None
+        write_detail_render_key(conn, "03571000", "abc")
+        write_detail_render_key(conn, "03571000", "def")
+        assert read_detail_render_key(conn, "03571000") == "def"
+        conn.close()
+
+
+# =============================================================================
+# Test /api/usgs-history downsampling
+# =============================================================================
+class TestUsgsHistoryEndpoint:
+    """Tests for the long-range USGS history API."""
+
+    @staticmethod
+    def _get_history(monkeypatch, readings_by_code):
+        """Serve readings_by_code as the USGS IV response and call the endpoint."""
+        import io
+        import json
+        import urllib.request
+        import api_app
+
+        body = json.dumps({"value": {"timeSeries": [
+            {"variable": {"variableCode": [{"value": code}]}, "values": [{"value": readings}]}
+            for code, readings in readings_by_code.items()
+        ]}}).encode()
+
+        class FakeResponse(io.BytesIO):
+            headers = {}
+
+        monkeypatch.setattr(urllib.request, "urlopen", lambda req, timeout=None: FakeResponse(body))
+        return api_app.app.test_client().get("/api/usgs-history/03571000?days=30").get_json()
+
+    def test_long_series_downsampled_with_peak(self, monkeypatch):
+        """Long ranges come back at 200 points with the flood peak intact."""
+        readings = [{"dateTime": f"t{i:05d}", "value": "100"} for i in range(3000)]
+        readings[1234]["value"] = "5000"
+        data = self._get_history(monkeypatch, {"00060": readings})
+
+        assert data["cfs_count"] == 3000
+        assert len(data["cfs"]) == 200
+        assert max(p["value"] for p in data["cfs"]) == 5000.0
+        assert data["cfs"][0]["timestamp"] == "t00000" and data["cfs"][-1]["timestamp"] == "t02999"
+
+    def test_feet_shares_cfs_timestamps(self, monkeypatch):
+        """Both series keep the same timestamps so the chart lines up by index."""
+        cfs = [{"dateTime": f"t{i:05d}", "value": str(100 + (i % 7))} for i in range(3000)]
+        feet = [{"dateTime": f"t{i:05d}", "value": str(2 + (i % 11) / 10)} for i in range(3000)]
+        cfs[500]["value"] = "5000"
+        feet[2500]["value"] = "9.5"
+        data = self._get_history(monkeypatch, {"00060": cfs, "00065": feet})
+
+        assert len(data["cfs"]) <= 200
+        assert [p["timestamp"] for p in data["feet"]] == [p["timestamp"] for p in data["cfs"]]
+        assert max(p["value"] for p in data["cfs"]) == 5000.0
+        assert max(p["value"] for p in data["feet"]) == 9.5
+
+
+# =============================================================================
+# Test the hashed detail script route
+# =============================================================================
+class TestDetailScriptRoute:
+    """Tests for serving detail-{hash}.js and its gzip copy."""
+
+    @staticmethod
+    def _get_script(monkeypatch, tmp_path, accept_encoding):
+        import gzip
+        import api_app
+        details = tmp_path / "details"
+        details.mkdir(exist_ok=True)
+        (details / "detail-abc.js").write_bytes(b"console.log(1);")
+        (details / "detail-abc.js.gz").write_bytes(gzip.compress(b"console.log(1);"))
+        monkeypatch.setattr(api_app, "SITE_DIR", str(tmp_path))
+        headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+        return api_app.app.test_client().get("/details/detail-abc.js", headers=headers)
+
+    def test_gzip_client_gets_gzip_copy(self, monkeypatch, tmp_path):
+        """Clients that accept gzip get the pre-compressed file."""
+        resp = self._get_script(monkeypatch, tmp_path, "gzip, deflate")
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert "immutable" in resp.headers["Cache-Control"]
+
+    def test_refused_gzip_gets_plain_file(self, monkeypatch, tmp_path):
+        """gzip;q=0, look-alike tokens and no header all get the plain file."""
+        for accept_encoding in ("gzip;q=0", "x-gzip", None):
+            resp = self._get_script(monkeypatch, tmp_path, accept_encoding)
+            assert "Content-Encoding" not in resp.headers
+            assert resp.data == b"console.log(1);"
+            resp.close()
+
+
 # =============================================================================
 # Integration-style tests (require mocking external APIs)
 # =============================================================================
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Unit tests for rainfall_history.py storage functions.
+
+Run with: pytest tests/ -v
+"""
+import pytest
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Fresh rainfall history database in a temp directory."""
+    from rainfall_history import init_database
+    path = str(tmp_path / "rainfall_history.sqlite")
+    init_database(path)
+    return path
+
+
+def _count(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+# =============================================================================
+# Test init_database()
+# =============================================================================
+class TestInitDatabase:
+    """Tests for schema creation."""
+
+    def test_creates_tables_and_indexes(self, db_path):
+        """All tables and indexes exist, and re-running init is harmless."""
+        from rainfall_history import init_database
+        init_database(db_path)
+        conn = sqlite3.connect(db_path)
+        try:
+            names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        finally:
+            conn.close()
+        assert {"daily_rainfall", "rainfall_observations", "rainfall_river_correlation",
+                "idx_daily_river_date", "idx_obs_river_time", "idx_corr_river_date"} <= names
+
+
+# =============================================================================
+# Test record_pws_rainfall_batch()
+# =============================================================================
+class TestRecordPwsRainfallBatch:
+    """Tests for batched PWS rainfall recording."""
+
+    def test_records_all_rivers(self, db_path):
+        """Each river gets one observation and one daily row."""
+        from rainfall_history import record_pws_rainfall_batch, get_all_rivers_today
+        readings = [
+            ("Locust Fork", {"precip_today_in": 0.25, "station_id": "KALBLOUN24"}),
+            ("Town Creek", {"precip_today_in": 0.0, "station_id": "KALFYFFE7"}),
+        ]
+        assert record_pws_rainfall_batch(readings, db_path=db_path) == 2
+        assert _count(db_path, "rainfall_observations") == 2
+
+        today = {r["river_name"]: r for r in get_all_rivers_today(db_path=db_path)}
+        assert today["Locust Fork"]["precip_in"] == 0.25
+        assert today["Locust Fork"]["source"] == "pws"
+        assert today["Town Creek"]["station_id"] == "KALFYFFE7"
+
+    def test_skips_missing_precip(self, db_path):
+        """Observations without precip_today_in are not recorded."""
+        from rainfall_history import record_pws_rainfall_batch
+        readings = [
+            ("Locust Fork", {"precip_today_in": None}),
+            ("Town Creek", {}),
+        ]
+        assert record_pws_rainfall_batch(readings, db_path=db_path) == 0
+        assert _count(db_path, "daily_rainfall") == 0
+
+    def test_daily_total_updated(self, db_path):
+        """A later reading for the same day updates the daily total."""
+        from rainfall_history import record_pws_rainfall_batch, get_all_rivers_today
+        record_pws_rainfall_batch([("Short Creek", {"precip_today_in": 0.1})], db_path=db_path)
+        record_pws_rainfall_batch([("Short Creek", {"precip_today_in": 0.4})], db_path=db_path)
+
+        today = get_all_rivers_today(db_path=db_path)
+        assert len(today) == 1
+        assert today[0]["precip_in"] == 0.4
+
+
+# =============================================================================
+# Test save_daily_rainfall() upsert
+# =============================================================================
+class TestSaveDailyRainfall:
+    """Tests for the daily total upsert."""
+
+    @staticmethod
+    def _row(db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            return conn.execute(
+                "SELECT precip_in, updated_at FROM daily_rainfall"
+            ).fetchone()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _age_row(db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("UPDATE daily_rainfall SET updated_at = '2000-01-01 00:00:00'")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def test_unchanged_value_not_rewritten(self, db_path):
+        """Saving the same total again leaves updated_at untouched."""
+        from rainfall_history import save_daily_rainfall
+        save_daily_rainfall("Locust Fork", "2025-12-01", 0.5, db_path=db_path)
+        self._age_row(db_path)
+
+        assert save_daily_rainfall("Locust Fork", "2025-12-01", 0.5, db_path=db_path)
+        assert self._row(db_path) == (0.5, "2000-01-01 00:00:00")
+
+    def test_changed_value_updated(self, db_path):
+        """A new total overwrites precip_in and bumps updated_at."""
+        from rainfall_history import save_daily_rainfall
+        save_daily_rainfall("Locust Fork", "2025-12-01", 0.5, db_path=db_path)
+        self._age_row(db_path)
+
+        save_daily_rainfall("Locust Fork", "2025-12-01", 0.8, db_path=db_path)
+        precip, updated_at = self._row(db_path)
+        assert precip == 0.8
+        assert updated_at != "2000-01-01 00:00:00"
+
+
+# =============================================================================
+# Test get_daily_rainfall() filters
+# =============================================================================
+class TestGetDailyRainfall:
+    """Tests for daily rainfall retrieval with optional filters."""
+
+    @pytest.fixture
+    def populated(self, db_path):
+        from rainfall_history import save_daily_rainfall
+        for day, precip in (("2025-12-01", 0.1), ("2025-12-02", 0.2), ("2025-12-03", 0.3)):
+            save_daily_rainfall("Town Creek", day, precip, source="open-meteo", db_path=db_path)
+        save_daily_rainfall("Town Creek", "2025-12-02", 0.25, source="pws", db_path=db_path)
+        save_daily_rainfall("Locust Fork", "2025-12-02", 1.0, db_path=db_path)
+        return db_path
+
+    def test_all_rows_for_river(self, populated):
+        """No filters returns every row for the river, ordered by date."""
+        from rainfall_history import get_daily_rainfall
+        rows = get_daily_rainfall("Town Creek", db_path=populated)
+        assert [r["date"] for r in rows] == ["2025-12-01", "2025-12-02", "2025-12-02", "2025-12-03"]
+
+    def test_date_range(self, populated):
+        """start_date and end_date are inclusive bounds."""
+        from rainfall_history import get_daily_rainfall
+        rows = get_daily_rainfall("Town Creek", start_date="2025-12-02",
+                                  end_date="2025-12-02", db_path=populated)
+        assert sorted(r["precip_in"] for r in rows) == [0.2, 0.25]
+
+    def test_source_filter(self, populated):
+        """source narrows results to a single data source."""
+        from rainfall_history import get_daily_rainfall
+        rows = get_daily_rainfall("Town Creek", end_date="2025-12-02",
+                                  source="open-meteo", db_path=populated)
+        assert [r["precip_in"] for r in rows] == [0.1, 0.2]
+
+
+# =============================================================================
+# Test get_rainfall_stats_all()
+# =============================================================================
+class TestGetRainfallStatsAll:
+    """Tests for the grouped multi-river stats query."""
+
+    def test_matches_per_river_stats(self, db_path):
+        """Grouped stats equal the per-river stats for every river."""
+        from datetime import datetime, timedelta
+        from rainfall_history import save_daily_rainfall, get_rainfall_stats, get_rainfall_stats_all
+        today = datetime.now().date()
+        for i, precip in enumerate((0.5, 0.0, 1.25)):
+            day = (today - timedelta(days=i)).isoformat()
+            save_daily_rainfall("Locust Fork", day, precip, db_path=db_path)
+        save_daily_rainfall("Town Creek", today.isoformat(), 0.3, db_path=db_path)
+
+        stats = get_rainfall_stats_all(days=7, db_path=db_path)
+        assert set(stats) == {"Locust Fork", "Town Creek"}
+        for river in stats:
+            assert stats[river] == get_rainfall_stats(river, days=7, db_path=db_path)
+        assert stats["Locust Fork"]["total_precip_in"] == 1.75
+        assert stats["Locust Fork"]["rainy_days"] == 2
+
+    def test_empty_database(self, db_path):
+        """No rows yields an empty dict."""
+        from rainfall_history import get_rainfall_stats_all
+        assert get_rainfall_stats_all(days=7, db_path=db_path) == {}
+
+
+# =============================================================================
+# Test rounded_rainfall_stats()
+# =============================================================================
+class TestRoundedRainfallStats:
+    """Tests for the display rounding helper."""
+
+    def test_rounds_precip_fields(self):
+        """Precipitation fields are rounded; other fields untouched."""
+        from rainfall_history import rounded_rainfall_stats
+        stats = {
+            'river_name': 'Locust Fork',
+            'total_precip_in': 1.23456,
+            'avg_daily_in': 0.176366,
+            'max_daily_in': 0.98765,
+            'rainy_days': 3,
+        }
+        rounded = rounded_rainfall_stats(stats)
+        assert rounded['total_precip_in'] == 1.23
+        assert rounded['avg_daily_in'] == 0.176
+        assert rounded['max_daily_in'] == 0.99
+        assert rounded['rainy_days'] == 3
+        # Original is left at full precision
+        assert stats['total_precip_in'] == 1.23456
+
+    def test_empty_stats(self):
+        """An empty stats dict (error case) passes through."""
+        from rainfall_history import rounded_rainfall_stats
+        assert rounded_rainfall_stats({}) == {}
+
+
+# =============================================================================
+# Test Open-Meteo batch backfill
+# =============================================================================
+class TestOpenMeteoBackfill:
+    """Tests for save_open_meteo_batch() and backfill_rivers()."""
+
+    def test_fetch_decodes_gzip(self, monkeypatch):
+        """Archive responses are requested and decoded as gzip."""
+        import gzip
+        import io
+        import json
+        import rainfall_history
+        seen = []
+        body = gzip.compress(json.dumps({"daily": {
+            "time": ["2025-12-01", "2025-12-02"], "precipitation_sum": [0.4, None]
+        }}).encode())
+
+        class FakeResponse(io.BytesIO):
+            headers = {"Content-Encoding": "gzip"}
+
+        def fake_urlopen(req, timeout=None):
+            seen.append(req.get_header("Accept-encoding"))
+            return FakeResponse(body)
+
+        monkeypatch.setattr(rainfall_history.urllib.request, "urlopen", fake_urlopen)
+        assert rainfall_history.fetch_open_meteo_history(33.9, -86.6, "2025-12-01", "2025-12-02") == [
+            {'date': '2025-12-01', 'precip_in': 0.4},
+            {'date': '2025-12-02', 'precip_in': 0},
+        ]
+        assert seen == ["gzip"]
+
+    def test_batch_writes_all_rivers(self, db_path):
+        """Rows for every river are written with source open-meteo."""
+        from rainfall_history import save_open_meteo_batch, get_daily_rainfall
+        histories = [
+            ("Locust Fork", 33.9, -86.6, [{'date': '2025-12-01', 'precip_in': 0.4},
+                                          {'date': '2025-12-02', 'precip_in': 0.0}]),
+            ("Town Creek", 34.4, -85.9, [{'date': '2025-12-01', 'precip_in': 1.1}]),
+            ("Short Creek", 34.3, -86.2, []),
+        ]
+        assert save_open_meteo_batch(histories, db_path=db_path) == 3
+
+        rows = get_daily_rainfall("Locust Fork", source="open-meteo", db_path=db_path)
+        assert [r["precip_in"] for r in rows] == [0.4, 0.0]
+        assert rows[0]["lat"] == 33.9
+
+    def test_backfill_rivers_fetches_each(self, db_path, monkeypatch):
+        """Each river is fetched once and counts are reported per river."""
+        import rainfall_history
+        calls = []
+
+        def fake_fetch(lat, lon, start_date, end_date):
+            calls.append((lat, lon))
+            return [{'date': '2025-12-01', 'precip_in': lat / 100}]
+
+        monkeypatch.setattr(rainfall_history, "fetch_open_meteo_history", fake_fetch)
+        result = rainfall_history.backfill_rivers(
+            [("Locust Fork", 33.9, -86.6), ("Town Creek", 34.4, -85.9)],
+            days=5, db_path=db_path
+        )
+        assert result == {"Locust Fork": 1, "Town Creek": 1}
+        assert sorted(calls) == [(33.9, -86.6), (34.4, -85.9)]
+        assert _count(db_path, "daily_rainfall") == 2
+
+    def test_resume_skips_stored_dates(self, db_path, monkeypatch):
+        """Backfill resumes a lag window before the latest stored date."""
+        from datetime import datetime, timedelta
+        import rainfall_history
+        starts = []
+
+        def fake_fetch(lat, lon, start_date, end_date):
+            starts.append((lat, start_date))
+            return []
+
+        monkeypatch.setattr(rainfall_history, "fetch_open_meteo_history", fake_fetch)
+        lag = timedelta(days=rainfall_history.OPEN_METEO_LAG_DAYS)
+        yesterday = datetime.now(rainfall_history.LOCAL_TZ).date() - timedelta(days=1)
+        three_ago = yesterday - timedelta(days=2)
+        rainfall_history.save_open_meteo_batch([
+            ("Locust Fork", 33.9, -86.6, [{'date': yesterday.isoformat(), 'precip_in': 0.1}]),
+            ("Town Creek", 34.4, -85.9, [{'date': three_ago.isoformat(), 'precip_in': 0.2}]),
+        ], db_path=db_path)
+
+        # Recent days are re-fetched in case the archive filled them as 0"
+        rainfall_history.backfill_historical_data(
+            "Locust Fork", 33.9, -86.6, days=30, db_path=db_path)
+        assert starts == [(33.9, (yesterday - lag).isoformat())]
+
+        starts.clear()
+        rainfall_history.backfill_rivers(
+            [("Locust Fork", 33.9, -86.6), ("Town Creek", 34.4, -85.9)],
+            days=30, db_path=db_path
+        )
+        assert sorted(starts) == [(33.9, (yesterday - lag).isoformat()),
+                                  (34.4, (three_ago - lag).isoformat())]
+
+    def test_resume_corrects_zero_filled_days(self, db_path, monkeypatch):
+        """A day stored as 0" before the archive caught up is rewritten."""
+        from datetime import datetime, timedelta
+        import rainfall_history
+        yesterday = (datetime.now(rainfall_history.LOCAL_TZ).date() - timedelta(days=1)).isoformat()
+        rainfall_history.save_open_meteo_batch(
+            [("Locust Fork", 33.9, -86.6, [{'date': yesterday, 'precip_in': 0}])], db_path=db_path)
+
+        monkeypatch.setattr(rainfall_history, "fetch_open_meteo_history",
+                            lambda lat, lon, start_date, end_date: [{'date': yesterday, 'precip_in': 0.8}])
+        assert rainfall_history.backfill_historical_data(
+            "Locust Fork", 33.9, -86.6, days=30, db_path=db_path) == 1
+
+        rows = rainfall_history.get_daily_rainfall("Locust Fork", source="open-meteo", db_path=db_path)
+        assert [(r["date"], r["precip_in"]) for r in rows] == [(yesterday, 0.8)]
+
+    def test_resume_keeps_requested_start(self):
+        """A stored date older than the requested range doesn't widen it."""
+        from rainfall_history import _resume_start
+        assert _resume_start("2025-12-01", "2025-06-01") == "2025-12-01"
+        assert _resume_start("2025-12-01", None) == "2025-12-01"
+        assert _resume_start("2025-12-01", "2025-12-20") == "2025-12-13"
+
+
+# =============================================================================
+# Test save_rainfall_observation() dedup
+# =============================================================================
+class TestSaveRainfallObservation:
+    """Tests for observation de-duplication."""
+
+    def test_duplicate_skipped(self, db_path):
+        """The same river/timestamp is only stored once."""
+        from rainfall_history import save_rainfall_observation
+        assert save_rainfall_observation("Locust Fork", "2025-12-01T10:00:00", 0.2, db_path=db_path)
+        assert not save_rainfall_observation("Locust Fork", "2025-12-01T10:00:00", 0.3, db_path=db_path)
+        assert save_rainfall_observation("Locust Fork", "2025-12-01T10:01:00", 0.3, db_path=db_path)
+        assert _count(db_path, "rainfall_observations") == 2
+
+
+# =============================================================================
+# Test pws_station_for()
+# =============================================================================
+class TestPwsStationFor:
+    """Tests for normalized PWS station lookup."""
+
+    def test_case_and_whitespace_ignored(self):
+        """Lookup tolerates case and surrounding whitespace."""
+        from rainfall_history import pws_station_for
+        assert pws_station_for("Locust Fork") == "KALBLOUN24"
+        assert pws_station_for("  locust fork ") == "KALBLOUN24"
+        assert pws_station_for("OCOEE #1 (LOWER)") == "KTNBENTO3"
+
+    def test_open_meteo_only_and_unknown(self):
+        """Rivers without a PWS and unknown rivers return None."""
+        from rainfall_history import pws_station_for
+        assert pws_station_for("Tellico River") is None
+        assert pws_station_for("Nowhere Creek") is None
+
+    def test_station_fallback_in_batch(self, db_path):
+        """Observations without a station_id get the mapped station."""
+        from rainfall_history import record_pws_rainfall_batch, get_all_rivers_today
+        record_pws_rainfall_batch([("Town Creek", {"precip_today_in": 0.2})], db_path=db_path)
+        assert get_all_rivers_today(db_path=db_path)[0]["station_id"] == "KALFYFFE7"
@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+"""
+Unit tests for site_detail.py helpers.
+
+Run with: pytest tests/ -v
+"""
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# =============================================================================
+# Test format_chart_series()
+# =============================================================================
+class TestFormatChartSeries:
+    """Tests for chart label formatting."""
+
+    @pytest.mark.parametrize("ts", [
+        "2025-12-01T00:00:00.000-06:00",
+        "2025-12-01T00:15:00.000-06:00",
+        "2025-01-09T11:45:00.000-06:00",
+        "2025-06-30T12:00:00.000-05:00",
+        "2025-07-04T13:30:00.000-05:00",
+        "2025-03-15T23:59:00Z",
+        "2025-10-02T07:05:00",
+    ])
+    def test_matches_strftime(self, ts):
+        """Labels match datetime.strftime("%b %d %I:%M %p")."""
+        from site_detail import format_chart_series
+        expected = datetime.fromisoformat(ts.replace('Z', '+00:00')).strftime("%b %d %I:%M %p")
+        labels, values = format_chart_series([(ts, 1.0)])
+        assert labels == [expected]
+        assert values == [1.0]
+
+    def test_shared_timestamps_formatted_once(self):
+        """Timestamps repeated across the CFS and feet series hit the label cache."""
+        from site_detail import _format_chart_label, format_chart_series
+        _format_chart_label.cache_clear()
+        history = [("2025-12-01T00:00:00.000-06:00", 1.0), ("2025-12-01T00:15:00.000-06:00", 2.0)]
+        cfs_labels, _ = format_chart_series(history)
+        feet_labels, _ = format_chart_series(history)
+        assert cfs_labels == feet_labels
+        assert _format_chart_label.cache_info().hits == 2
+
+    def test_bad_timestamps_dropped(self):
+        """Unparseable timestamps are skipped along with their values."""
+        from site_detail import format_chart_series
+        history = [
+            ("2025-12-01T10:00:00.000-06:00", 100.0),
+            ("not a time", 200.0),
+            ("2025-13-01T10:00:00.000-06:00", 300.0),
+            ("2025-12-01T10:15:00.000-06:00", 400.0),
+        ]
+        labels, values = format_chart_series(history)
+        assert labels == ["Dec 01 10:00 AM", "Dec 01 10:15 AM"]
+        assert values == [100.0, 400.0]
+
+
+# =============================================================================
+# Test get_location_links()
+# =============================================================================
+class TestGetLocationLinks:
+    """Tests for per-site location links."""
+
+    def test_tva_code_takes_priority(self):
+        """TVA sites are matched by their TVA code."""
+        from site_detail import get_location_links
+        assert "Middle Ocoee Put-in" in get_location_links("", "OCBT1")
+
+    def test_usgs_site(self):
+        """USGS sites are matched by site ID."""
+        from site_detail import get_location_links
+        assert "Chair Lift Take Out" in get_location_links("02399200", None)
+
+    def test_unknown_site(self):
+        """Sites without links return an empty string."""
+        from site_detail import get_location_links
+        assert get_location_links("99999999", None) == ""
+        assert get_location_links("", "XXXT1") == ""
+
+
+# =============================================================================
+# Test prefetch_usgs_7day_data()
+# =============================================================================
+class TestPrefetchUsgs7DayData:
+    """Tests for the parallel USGS history prefetch."""
+
+    def test_both_parameters_per_site(self, monkeypatch):
+        """Each unique site gets one combined discharge + gage height fetch."""
+        import site_detail
+        calls = []
+
+        def fake_multi(site_id, parameter_codes, cache_path=None):
+            calls.append((site_id, tuple(parameter_codes)))
+            return {code: [(f"{site_id}-{code}", 1.0)] for code in parameter_codes}
+
+        monkeypatch.setattr(site_detail, "fetch_usgs_7day_multi", fake_multi)
+        result = site_detail.prefetch_usgs_7day_data(["02399200", "02455000", "02399200"])
+
+        assert sorted(calls) == [("02399200", ("00060", "00065")),
+                                 ("02455000", ("00060", "00065"))]
+        assert result["02455000"] == ([("02455000-00060", 1.0)], [("02455000-00065", 1.0)])
+
+    def test_empty(self):
+        """No sites means no requests."""
+        from site_detail import prefetch_usgs_7day_data
+        assert prefetch_usgs_7day_data([]) == {}
+
+
+# =============================================================================
+# Test fetch_usgs_7day_data() cache
+# =============================================================================
+class TestUsgsIvCache:
+    """Tests for the optional USGS IV SQLite cache."""
+
+    @staticmethod
+    def _fake_get(calls, payload=None):
+        import io
+        import json
+
+        if payload is None:
+            payload = {"value": {"timeSeries": [{"values": [{"value": [
+                {"dateTime": "2025-12-01T10:00:00.000-06:00", "value": "250"},
+                {"dateTime": "2025-12-01T10:15:00.000-06:00", "value": "260"},
+            ]}]}]}}
+        payload = json.dumps(payload).encode()
+
+        class FakeResponse:
+            content = payload
+            raw = io.BytesIO(payload)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def raise_for_status(self):
+                pass
+
+        def get(url, params=None, timeout=None, stream=False):
+            calls.append(params)
+            return FakeResponse()
+        return get
+
+    def test_second_fetch_served_from_cache(self, tmp_path, monkeypatch):
+        """A cached result is returned without another request."""
+        import site_detail
+        calls = []
+        monkeypatch.setattr(site_detail._USGS_SESSION, "get", self._fake_get(calls))
+        cache = str(tmp_path / "usgs_iv_cache.sqlite")
+
+        first = site_detail.fetch_usgs_7day_data("02399200", "00060", cache_path=cache)
+        second = site_detail.fetch_usgs_7day_data("02399200", "00060", cache_path=cache)
+
+        assert first == second == [("2025-12-01T10:00:00.000-06:00", 250.0),
+                                   ("2025-12-01T10:15:00.000-06:00", 260.0)]
+        assert len(calls) == 1
+
+    def test_requests_three_day_period(self, monkeypatch):
+        """The IV request asks for a P3D period instead of start/end dates."""
+        import site_detail
+        calls = []
+        monkeypatch.setattr(site_detail._USGS_SESSION, "get", self._fake_get(calls))
+        monkeypatch.setattr(site_detail, "USGS_IV_CACHE", None)
+        site_detail.fetch_usgs_7day_data("02399200", "00060")
+        assert calls[0]["period"] == "P3D"
+        assert "startDT" not in calls[0] and "endDT" not in calls[0]
+
+    def test_expired_entry_refetched(self, tmp_path, monkeypatch):
+        """Entries older than the TTL trigger a new request."""
+        import site_detail
+        calls = []
+        monkeypatch.setattr(site_detail._USGS_SESSION, "get", self._fake_get(calls))
+        monkeypatch.setattr(site_detail, "USGS_IV_TTL_MINUTES", -1)
+        cache = str(tmp_path / "usgs_iv_cache.sqlite")
+
+        site_detail.fetch_usgs_7day_data("02399200", "00065", cache_path=cache)
+        site_detail.fetch_usgs_7day_data("02399200", "00065", cache_path=cache)
+        assert len(calls) == 2
+
+    def test_entry_dropped_at_quarter_hour(self, tmp_path, monkeypatch):
+        """Entries from an earlier 15-minute bucket are refetched even within the TTL."""
+        import site_detail
+        calls = []
+        now = [899]
+        monkeypatch.setattr(site_detail._USGS_SESSION, "get", self._fake_get(calls))
+        monkeypatch.setattr(site_detail.time, "time", lambda: now[0])
+        cache = str(tmp_path / "usgs_iv_cache.sqlite")
+
+        site_detail.fetch_usgs_7day_data("02399200", "00060", cache_path=cache)
+        now[0] = 901
+        site_detail.fetch_usgs_7day_data("02399200", "00060", cache_path=cache)
+        now[0] = 1000
+        site_detail.fetch_usgs_7day_data("02399200", "00060", cache_path=cache)
+        assert len(calls) == 2
+
+    def test_put_creates_table(self, tmp_path, monkeypatch):
+        """Writing to a new cache file works without a prior read."""
+        import site_detail
+        monkeypatch.setattr(site_detail.time, "time", lambda: 1000)
+        cache = str(tmp_path / "usgs_iv_cache.sqlite")
+        site_detail._iv_cache_put(cache, "02399200:00060", [("t1", 250.0)])
+        assert site_detail._iv_cache_get(cache, "02399200:00060") == [("t1", 250.0)]
+
+    def test_multi_groups_series_by_parameter(self, tmp_path, monkeypatch):
+        """One request returns both parameters, split by variableCode."""
+        import site_detail
+
+        def series(code, value):
+            return {"variable": {"variableCode": [{"value": code}]},
+                    "values": [{"value": [{"dateTime": "2025-12-01T10:00:00.000-06:00", "value": value}]}]}
+
+        payload = {"value": {"timeSeries": [series("00065", "3.2"), series("00060", "250")]}}
+        calls = []
+        monkeypatch.setattr(site_detail._USGS_SESSION, "get", self._fake_get(calls, payload))
+        cache = str(tmp_path / "usgs_iv_cache.sqlite")
+
+        result = site_detail.fetch_usgs_7day_multi("02399200", ["00060", "00065"], cache_path=cache)
+        assert result == {"00060": [("2025-12-01T10:00:00.000-06:00", 250.0)],
+                          "00065": [("2025-12-01T10:00:00.000-06:00", 3.2)]}
+        assert len(calls) == 1
+        assert calls[0]["parameterCd"] == "00060,00065"
+
+        # Both parameters are now cached individually
+        assert site_detail.fetch_usgs_7day_data("02399200", "00065", cache_path=cache) == result["00065"]
+        assert len(calls) == 1
+
+
+# =============================================================================
+# Test _series_stats()
+# =============================================================================
+class TestSeriesStats:
+    """Tests for chart series summary stats."""
+
+    def test_average_uses_recent_window(self):
+        """Average covers only the recent window; max/min cover everything."""
+        from site_detail import _series_stats
+        avg, hi, lo = _series_stats([10.0, 1.0, 2.0, 3.0], recent_points=3)
+        assert avg == 2.0
+        assert hi == 10.0
+        assert lo == 1.0
+
+    def test_short_and_empty_series(self):
+        """Short series average everything; empty series are all zero."""
+        from site_detail import _series_stats
+        assert _series_stats([4.0, 6.0], recent_points=288) == (5.0, 6.0, 4.0)
+        assert _series_stats([], recent_points=288) == (0, 0, 0)
+
+
+# =============================================================================
+# Test _level_prediction()
+# =============================================================================
+class TestLevelPrediction:
+    """Tests for the 8-hour trend and threshold ETA."""
+
+    def test_falling_toward_threshold(self):
+        """A falling series above threshold gets an ETA to drop below it."""
+        from site_detail import _level_prediction
+        values = [3.0] * 10 + [3.0 - 0.0125 * i for i in range(32)]  # -0.05 ft/hr
+        pred = _level_prediction(values, 2.0, 3.0, 0.005, "ft")
+        assert pred["trend"] == "falling"
+        assert pred["above_threshold"] is True
+        assert abs(pred["rate_per_hour"] - 0.0484375) < 1e-9
+        assert pred["eta_text"].endswith("hours")
+
+    def test_steady_has_no_eta(self):
+        """Changes under the steady rate report no ETA."""
+        from site_detail import _level_prediction
+        pred = _level_prediction([500.0] * 31 + [504.0], 800.0, 504.0, 1.0, "cfs")
+        assert pred["trend"] == "steady"
+        assert pred["eta_hours"] is None and pred["eta_text"] is None
+        assert pred["unit"] == "cfs"
+
+
+# =============================================================================
+# Test _find_level()
+# =============================================================================
+class TestFindLevel:
+    """Tests for the LRC / North Chick flow guide band lookup."""
+
+    def test_lrc_band_edges(self):
+        """Each band includes its min and excludes its max."""
+        from site_detail import _find_level, _LRC_LEVELS, _LRC_MINS
+        assert _find_level(_LRC_LEVELS, _LRC_MINS, 249.9)["label"] == "Not Runnable"
+        assert _find_level(_LRC_LEVELS, _LRC_MINS, 250)["label"] == "Good Low"
+        assert _find_level(_LRC_LEVELS, _LRC_MINS, 2000)["label"] == "BEST!"
+        assert _find_level(_LRC_LEVELS, _LRC_MINS, 99999) is None
+        assert _find_level(_LRC_LEVELS, _LRC_MINS, -1) is None
+
+    def test_bard_visual_levels(self):
+        """Visual feet map to Bard's bands, including negatives."""
+        from site_detail import _find_level, _BARD_LEVELS, _BARD_MINS
+        assert _find_level(_BARD_LEVELS, _BARD_MINS, -0.5)["label"] == "Too Low"
+        assert _find_level(_BARD_LEVELS, _BARD_MINS, 2.42)["label"] == "Worth It"
+
+
+# =============================================================================
+# Test _daily_rain_series()
+# =============================================================================
+class TestDailyRainSeries:
+    """Tests for the rainfall chart's per-day bars."""
+
+    def test_one_bar_per_day(self):
+        """Sub-daily rows are summed; overlapping sources don't double-count."""
+        from site_detail import _daily_rain_series
+        rows = [
+            {"date": "2025-12-02", "precip_in": 0.5, "source": "pws"},
+            {"date": "2025-12-02", "precip_in": 0.75, "source": "open-meteo"},
+            {"date": "2025-12-01T06:00", "precip_in": 0.25, "source": "open-meteo"},
+            {"date": "2025-12-01T18:00", "precip_in": 0.5, "source": "open-meteo"},
+            {"date": "2025-12-03", "precip_in": None, "source": "pws"},
+        ]
+        labels, values = _daily_rain_series(rows)
+        assert labels == ["Mon Dec 01", "Tue Dec 02", "Wed Dec 03"]
+        assert values == [0.75, 0.75, 0]
+
+    def test_bad_dates_skipped(self):
+        """Rows without a parseable date are dropped."""
+        from site_detail import _daily_rain_series
+        assert _daily_rain_series([{"date": "", "precip_in": 1.0}, {"precip_in": 2.0}]) == ([], [])
+
+
+# =============================================================================
+# Test calculate_wind_chill()
+# =============================================================================
+class TestCalculateWindChill:
+    """Tests for the NWS wind chill calculation."""
+
+    def test_nws_formula(self):
+        """Matches the NWS table (30°F, 10 mph -> ~21°F)."""
+        from site_detail import calculate_wind_chill
+        wc, emoji, desc = calculate_wind_chill(30, 10)
+        assert wc == pytest.approx(21.2, abs=0.1)
+        assert (emoji, desc) == ("🌬️", "Freezing")
+
+    def test_not_applicable(self):
+        """Warm temps, light wind, or missing data give no wind chill."""
+        from site_detail import calculate_wind_chill
+        assert calculate_wind_chill(55, 20) == (None, None, None)
+        assert calculate_wind_chill(30, 2) == (None, None, None)
+        assert calculate_wind_chill(None, 10) == (None, None, None)
+        assert calculate_wind_chill(30, None) == (None, None, None)
+
+    @pytest.mark.parametrize("temp_f,wind_mph,desc", [
+        (-10, 20, "Dangerous!"),
+        (10, 5, "Extreme Cold"),
+        (20, 5, "Very Cold"),
+        (30, 5, "Freezing"),
+        (40, 5, "Chilly"),
+        (50, 3, "Cool"),
+    ])
+    def test_categories(self, temp_f, wind_mph, desc):
+        """Each wind chill band maps to its description."""
+        from site_detail import calculate_wind_chill
+        assert calculate_wind_chill(temp_f, wind_mph)[2] == desc
+
+    @pytest.mark.parametrize("wind_chill,desc", [
+        (-0.1, "Dangerous!"),
+        (0, "Extreme Cold"),
+        (10, "Very Cold"),
+        (32, "Chilly"),
+        (40, "Cool"),
+    ])
+    def test_band_edges(self, wind_chill, desc):
+        """Band edges belong to the warmer band, as with the old < ladder."""
+        from bisect import bisect_right
+        from site_detail import _WC_EDGES, _WC_TABLE
+        assert _WC_TABLE[bisect_right(_WC_EDGES, wind_chill)][1] == desc
+
+
+# =============================================================================
+# Test _iter_iv_values() (ijson streaming)
+# =============================================================================
+class TestIterIvValues:
+    """Tests for streaming USGS IV readings with ijson."""
+
+    def test_first_series_only(self):
+        """Only readings from the first value block are yielded."""
+        pytest.importorskip("ijson")
+        import io
+        import json
+        from site_detail import _iter_iv_values
+        payload = {"value": {"timeSeries": [
+            {"values": [{"value": [
+                {"value": "250", "qualifiers": ["P"], "dateTime": "2025-12-01T10:00:00.000-06:00"},
+                {"value": "260", "qualifiers": ["P"], "dateTime": "2025-12-01T10:15:00.000-06:00"},
+            ]}]},
+            {"values": [{"value": [
+                {"value": "9.9", "dateTime": "2025-12-01T10:00:00.000-06:00"},
+            ]}]},
+        ]}}
+        stream = io.BytesIO(json.dumps(payload).encode())
+        assert list(_iter_iv_values(stream)) == [
+            ("2025-12-01T10:00:00.000-06:00", "250"),
+            ("2025-12-01T10:15:00.000-06:00", "260"),
+        ]
+
+
+# =============================================================================
+# Test _decode_iv_pairs() (msgspec)
+# =============================================================================
+class TestDecodeIvPairs:
+    """Tests for decoding USGS IV responses with msgspec."""
+
+    def test_first_series_only(self):
+        """Only readings from the first value block are returned."""
+        pytest.importorskip("msgspec")
+        import json
+        from site_detail import _decode_iv_pairs
+        payload = {"value": {"queryInfo": {"note": []}, "timeSeries": [
+            {"values": [{"value": [
+                {"value": "250", "qualifiers": ["P"], "dateTime": "2025-12-01T10:00:00.000-06:00"},
+            ]}]},
+            {"values": [{"value": [{"value": "9.9", "dateTime": "2025-12-01T10:00:00.000-06:00"}]}]},
+        ]}}
+        assert _decode_iv_pairs(json.dumps(payload).encode()) == [
+            ("2025-12-01T10:00:00.000-06:00", "250"),
+        ]
+
+    def test_no_series(self):
+        """A response with no time series decodes to no readings."""
+        pytest.importorskip("msgspec")
+        from site_detail import _decode_iv_pairs
+        assert _decode_iv_pairs(b'{"value": {"timeSeries": []}}') == []
+
+
+# =============================================================================
+# Test _parse_iv_pairs()
+# =============================================================================
+class TestParseIvPairs:
+    """Tests for converting USGS IV readings to floats."""
+
+    def test_non_finite_dropped(self):
+        """NaN and infinite readings are skipped instead of breaking the page."""
+        from site_detail import _parse_iv_pairs
+        assert _parse_iv_pairs([
+            ("t1", "250"), ("t2", "NaN"), ("t3", "inf"), ("t4", ""), ("t5", "x"), ("t6", "260.5"),
+        ]) == [("t1", 250.0), ("t6", 260.5)]
+
+
+# =============================================================================
+# Test lttb_indices() and _period_averages()
+# =============================================================================
+class TestChartDownsampling:
+    """Tests for chart downsampling and precomputed averages."""
+
+    def test_short_series_unchanged(self):
+        """Series at or under the threshold keep every point."""
+        from site_detail import lttb_indices
+        assert lttb_indices([1.0, 2.0, 3.0], 200) == [0, 1, 2]
+        assert lttb_indices([], 200) == []
+
+    def test_keeps_endpoints_and_peak(self):
+        """Downsampled series keeps first, last and the peak reading."""
+        from site_detail import lttb_indices
+        values = [100.0] * 700
+        values[333] = 5000.0
+        idx = lttb_indices(values, 200)
+        assert len(idx) == 200
+        assert idx[0] == 0 and idx[-1] == 699
+        assert 333 in idx
+        assert idx == sorted(set(idx))
+
+    def test_period_averages(self):
+        """Averages use 4 readings per hour from the end of the series."""
+        from site_detail import _period_averages
+        values = [0.0] * (72 * 4) + [10.0] * (24 * 4)
+        avgs = _period_averages(values)
+        assert avgs["24"] == 10.0
+        assert avgs["48"] == 5.0
+        assert avgs["168"] == pytest.approx(2.5)
+        assert _period_averages([]) == {}
+
+    def test_period_averages_short_series(self):
+        """Periods longer than the series average everything available."""
+        from site_detail import _period_averages
+        values = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        avgs = _period_averages(values, points_per_hour=2)
+        assert avgs == {"24": 3.5, "48": 3.5, "72": 3.5, "168": 3.5}
+        recent = [float(i) for i in range(200)]
+        assert _period_averages(recent)["24"] == pytest.approx(sum(recent[-96:]) / 96)
+
+    def test_quantize(self):
+        """Values are rounded and whole numbers emitted as ints."""
+        from site_detail import _quantize
+        assert _quantize([250.0, 0.69 * 3.5 - 1.89, 0], 2) == [250, 0.53, 0]
+        assert _quantize([1234.56], 1) == [1234.6]
+        assert isinstance(_quantize([250.0], 1)[0], int)
+
+
+# =============================================================================
+# Test site_detail_render_key()
+# =============================================================================
+class TestSiteDetailRenderKey:
+    """Tests for the detail-page render key."""
+
+    def test_same_inputs_same_key(self):
+        """Equal inputs hash equal regardless of dict order or tuple vs list."""
+        from site_detail import site_detail_render_key
+        a = site_detail_render_key({"site": "1", "cfs": 500}, [("t1", 500.0)], [])
+        b = site_detail_render_key({"cfs": 500, "site": "1"}, [["t1", 500.0]], [])
+        assert a == b
+        assert len(a) == 32
+
+    def test_changed_reading_changes_key(self):
+        """A new reading or history point yields a different key."""
+        from site_detail import site_detail_render_key
+        base = site_detail_render_key({"site": "1", "cfs": 500}, [("t1", 500.0)], [])
+        assert site_detail_render_key({"site": "1", "cfs": 510}, [("t1", 500.0)], []) != base
+        assert site_detail_render_key({"site": "1", "cfs": 500}, [("t1", 500.0), ("t2", 510.0)], []) != base
+
+    def test_tva_pages_not_keyed(self):
+        """TVA pages fetch their forecast while rendering, so they always re-render."""
+        from site_detail import site_detail_render_key
+        assert site_detail_render_key({"site": "HADT1", "is_tva": True}, [], []) is None
+
+    def test_template_change_changes_key(self, monkeypatch):
+        """A deploy that only edits the markup or CSS invalidates old pages."""
+        import site_detail
+        base = site_detail.site_detail_render_key({"site": "1", "cfs": 500}, [], [])
+        monkeypatch.setattr(site_detail, "_RENDER_SOURCE_DIGEST", "0" * 16)
+        assert site_detail.site_detail_render_key({"site": "1", "cfs": 500}, [], []) != base
+        monkeypatch.setattr(site_detail, "_RENDER_SOURCE_DIGEST", None)
+        assert site_detail.site_detail_render_key({"site": "1", "cfs": 500}, [], []) is None
+
+
+# =============================================================================
+# Test the embedded chart data payload
+# =============================================================================
+class TestChartDataPayload:
+    """Tests for the JSON chart data block in the rendered page."""
+
+    def test_payload_parses(self):
+        """Chart series are embedded once as JSON the page script can parse."""
+        import json
+        import re
+        from site_detail import generate_site_detail_html
+
+        history = [(f"2025-12-01T{h:02d}:00:00.000-06:00", 100.0 + h) for h in range(12)]
+        page = generate_site_detail_html(
+            {"name": "Test Creek", "site": "03571000", "cfs": 111, "stage_ft": 2.5,
+             "qpf": {"2025-12-02": 0.25}},
+            history, [(ts, v / 100) for ts, v in history],
+        )
+        m = re.search(r'<script type="application/json" id="chartData">(.*?)</script>', page, re.S)
+        assert m is not None
+        data = json.loads(m.group(1))
+        assert data["cfs"]["values"] == [100.0 + h for h in range(12)]
+        assert len(data["feet"]["labels"]) == 12
+        assert "console.log('CFS Labels:'" not in page
+
+    def test_iter_matches_generate(self):
+        """The section iterator concatenates to the same page."""
+        from site_detail import generate_site_detail_html, iter_site_detail_html
+        site = {"name": "Test Creek", "site": "03571000", "cfs": 111, "stage_ft": 2.5}
+        history = [("2025-12-01T00:00:00.000-06:00", 111.0)]
+        assert "".join(iter_site_detail_html(site, history, [])) == generate_site_detail_html(site, history, [])
+
+
+# =============================================================================
+# Test the shared detail-page script file
+# =============================================================================
+class TestDetailScriptAsset:
+    """Tests for serving the chart script as a cacheable file."""
+
+    def test_write_detail_assets(self, tmp_path):
+        """The script file holds the bare JS under a content-hashed name."""
+        from site_detail import _DETAIL_SCRIPT, write_detail_assets
+        name = write_detail_assets(str(tmp_path))
+        assert name.startswith("detail-") and name.endswith(".js")
+        js = (tmp_path / name).read_text(encoding="utf-8")
+        assert "<script>" not in js and "</script>" not in js
+        assert f"<script>\n{js}</script>\n" == _DETAIL_SCRIPT
+        assert write_detail_assets(str(tmp_path)) == name
+
+    def test_gzip_copy_written(self, tmp_path):
+        """A pre-compressed copy sits next to the script for gzip clients."""
+        import gzip
+        from site_detail import write_detail_assets
+        name = write_detail_assets(str(tmp_path))
+        raw = (tmp_path / name).read_bytes()
+        assert gzip.decompress((tmp_path / f"{name}.gz").read_bytes()) == raw
+
+    def test_page_references_script_file(self):
+        """With script_src the page links the file instead of inlining it."""
+        from site_detail import DETAIL_SCRIPT_FILE, _DETAIL_SCRIPT, generate_site_detail_html
+        site = {"name": "Test Creek", "site": "03571000", "cfs": 111, "stage_ft": 2.5}
+        history = [("2025-12-01T00:00:00.000-06:00", 111.0)]
+        page = generate_site_detail_html(site, history, [], script_src=DETAIL_SCRIPT_FILE)
+        assert f'<script src="{DETAIL_SCRIPT_FILE}"></script>' in page
+        assert _DETAIL_SCRIPT not in page
+        assert 'id="chartData"' in page
+
+    def test_script_src_changes_render_key(self):
+        """Pages re-render when they need to point at a new script file."""
+        from site_detail import site_detail_render_key
+        site = {"site": "1", "cfs": 500}
+        assert site_detail_render_key(site, [], [], "detail-a.js") != site_detail_render_key(site, [], [], "detail-b.js")
+
+
+# =============================================================================
+# Test _strip_indent()
+# =============================================================================
+class TestStripIndent:
+    """Tests for trimming static CSS/JS."""
+
+    def test_drops_indent_and_blank_lines(self):
+        """Indentation and blank lines go; line breaks stay."""
+        from site_detail import _strip_indent
+        src = "body {\n  color: red;\n\n}\n  // note\n  x = 1\n"
+        assert _strip_indent(src) == "body {\ncolor: red;\n}\n// note\nx = 1\n"
@@ -18,8 +18,7 @@ import argparse, json, time, smtplib, ssl, sqlite3, re
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from typing import Any, Dict, List, Optional, Tuple, Union
-from urllib.request import urlopen, Request
-from urllib.error import URLError, HTTPError
+import requests
 import urllib.parse as up
 from html import escape as h
 
@@ -49,7 +48,7 @@ OBS_AVAILABLE = NWS_OBS_AVAILABLE or PWS_OBS_AVAILABLE
 
 # Import site detail page generator
 try:
-    from site_detail import fetch_usgs_7day_data, generate_site_detail_html, calculate_wind_chill
+    from site_detail import prefetch_usgs_7day_data, iter_site_detail_html, calculate_wind_chill, site_detail_render_key, write_detail_assets
     SITE_DETAIL_AVAILABLE = True
 except ImportError:
     SITE_DETAIL_AVAILABLE = False
@@ -110,10 +109,9 @@ except ImportError:
 try:
     from rainfall_history import (
         init_database as init_rainfall_history,
-        record_pws_rainfall,
+        record_pws_rainfall_batch,
         save_daily_rainfall,
-        backfill_historical_data as backfill_rainfall,
-        get_rainfall_stats,
+        get_rainfall_stats_all,
         get_daily_rainfall,
         get_all_rivers_today
     )
@@ -121,6 +119,13 @@ try:
 except ImportError:
     RAINFALL_HISTORY_AVAILABLE = False
 
+# Faster JSON decoding for USGS IV responses (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Weather station mapping for each river site
 # PWS = Weather Underground Personal Weather Stations (primary, more local)
 # NWS = National Weather Service official stations (fallback)
@@ -176,10 +181,25 @@ def ensure_parent_dir(path: str) -> None:
     if d:
         os.makedirs(d, exist_ok=True)
 
+_HTTP_HEADERS = {"User-Agent": "USGS-MultiAlert/3.1", "Accept-Encoding": "gzip"}
+
+# One session per run so the latest/trend/sparkline requests for every site
+# reuse the same TLS connection to waterservices.usgs.gov
+_SESSION = requests.Session()
+_SESSION.headers.update(_HTTP_HEADERS)
+
+# Network errors a failed USGS fetch can raise, for callers that skip the site
+FETCH_ERRORS = (requests.RequestException, RuntimeError, ValueError)
+
 def _get(url: str) -> Dict[str, Any]:
-    req = Request(url, headers={"User-Agent": "USGS-MultiAlert/3.1"})
-    with urlopen(req, timeout=25) as r:
-        return json.loads(r.read().decode("utf-8"))
+    # USGS serves gzip on request (IV JSON compresses ~10x); requests
+    # decompresses it itself
+    with _SESSION.get(url, timeout=25) as r:
+        r.raise_for_status()
+        raw = r.content
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
 
 SITE_ID_RE = re.compile(r"(\d{8,})")
 def normalize_site_id(site: str) -> str:
@@ -236,6 +256,12 @@ def open_state_db(db_path: str) -> sqlite3.Connection:
                 conn.commit()
             except Exception:
                 pass
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS detail_render (
+            site TEXT PRIMARY KEY,
+            render_key TEXT
+        );
+    """)
     conn.commit()
     return conn
 
@@ -298,6 +324,16 @@ def write_site_state(conn: sqlite3.Connection, site: str, state: Dict[str, Any])
         float(state.get("last_wind_gust_mph")) if state.get("last_wind_gust_mph") is not None else None
     ))
 
+def read_detail_render_key(conn: sqlite3.Connection, site: str) -> Optional[str]:
+    row = conn.execute("SELECT render_key FROM detail_render WHERE site=?", (site,)).fetchone()
+    return row[0] if row else None
+
+def write_detail_render_key(conn: sqlite3.Connection, site: str, render_key: str) -> None:
+    conn.execute("""
+        INSERT INTO detail_render (site, render_key) VALUES (?, ?)
+        ON CONFLICT(site) DO UPDATE SET render_key=excluded.render_key
+    """, (site, render_key))
+
 def migrate_json_to_db(json_path: str, conn: sqlite3.Connection) -> bool:
     try:
         with open(json_path, "r") as f:
@@ -1687,6 +1723,7 @@ def main() -> None:
         return cond_ft and cond_cfs
 
     feed_rows = []
+    pending_rainfall = []  # (river_name, pws_obs) pairs recorded in one batch
 
     for entry in sites_cfg:
         # Determine data source (default to "usgs")
@@ -1850,7 +1887,7 @@ def main() -> None:
 
             try:
                 data = fetch_latest(site, include_discharge=include_q)
-            except (URLError, HTTPError, RuntimeError, ValueError) as e:
+            except FETCH_ERRORS as e:
                 if not args.quiet:
                     print(f"[ERROR] fetch {site_raw} failed: {e}")
                 continue
@@ -1957,21 +1994,11 @@ def main() -> None:
                         label = get_station_label(pws_station)
                         print(f"[PWS] {name}: {pws_obs['temp_f']}°F, {pws_obs['wind_mph']} mph from {pws_station} ({label})")
 
-                    # Record rainfall to history database
+                    # Queue rainfall for the history database (written once after the loop)
                     if RAINFALL_HISTORY_AVAILABLE and rainfall_history_db:
                         precip_today = pws_obs.get("precip_today_in")
                         if precip_today is not None:
-                            try:
-                                record_pws_rainfall(
-                                    river_name=name,
-                                    pws_observation=pws_obs,
-                                    db_path=rainfall_history_db
-                                )
-                                if not args.quiet and precip_today > 0:
-                                    print(f"[RAIN] {name}: {precip_today}\" recorded from {pws_station}")
-                            except Exception as rain_e:
-                                if not args.quiet:
-                                    print(f"[WARN] Rainfall recording failed for {name}: {rain_e}")
+                            pending_rainfall.append((name, pws_obs))
             except Exception as e:
                 if not args.quiet:
                     print(f"[WARN] PWS fetch failed for {name}: {e}")
@@ -2191,6 +2218,17 @@ def main() -> None:
 
         set_site_state(site, site_state)
 
+    # Record all PWS rainfall readings in a single transaction
+    if pending_rainfall:
+        try:
+            if record_pws_rainfall_batch(pending_rainfall, db_path=rainfall_history_db) and not args.quiet:
+                for rain_river, rain_obs in pending_rainfall:
+                    if rain_obs["precip_today_in"] > 0:
+                        print(f"[RAIN] {rain_river}: {rain_obs['precip_today_in']}\" recorded from {rain_obs.get('station_id')}")
+        except Exception as rain_e:
+            if not args.quiet:
+                print(f"[WARN] Rainfall recording failed: {rain_e}")
+
     # Generate predictions if available (for both JSON and HTML)
     predictions_data = []
     if PREDICTIONS_AVAILABLE:
@@ -2227,6 +2265,38 @@ def main() -> None:
             details_dir = os.path.join(html_dir, "details")
             os.makedirs(details_dir, exist_ok=True)
 
+            # Shared chart script, cached by browsers across every detail page
+            try:
+                detail_script = write_detail_assets(details_dir)
+            except OSError as asset_err:
+                detail_script = None  # pages fall back to the inline script
+                if not args.quiet:
+                    print(f"[DETAIL] Script asset write failed: {asset_err}")
+
+            # Rainfall summaries for every river, one grouped query per period
+            rain_summary = None
+            if RAINFALL_HISTORY_AVAILABLE and rainfall_history_db:
+                try:
+                    rain_summary = {
+                        days: get_rainfall_stats_all(days=days, db_path=rainfall_history_db)
+                        for days in (2, 7, 30)
+                    }
+                    # First row per river, matching the old per-site lookup
+                    today_rain = {}
+                    for r in get_all_rivers_today(db_path=rainfall_history_db):
+                        today_rain.setdefault(r.get("river_name"), r)
+                    rain_summary["today"] = today_rain
+                except Exception as rain_err:
+                    rain_summary = None
+                    if not args.quiet:
+                        print(f"[DETAIL] Rainfall summary failed: {rain_err}")
+
+            # Fetch USGS history for every site up front, in parallel
+            usgs_histories = prefetch_usgs_7day_data(
+                [row["site"] for row in feed_rows if row.get("site") and row.get("site") != "1"],
+                cache_path=os.environ.get("USGS_IV_CACHE", "/data/usgs_iv_cache.sqlite")
+            )
+
             for row in feed_rows:
                 site_id = row.get("site")
                 if not site_id:
@@ -2244,9 +2314,8 @@ def main() -> None:
                         if not args.quiet:
                             print(f"[STREAMBEAM] Fetched {len(feet_history)} history points for {site_name}")
                     else:
-                        # Fetch 7-day historical data from USGS
-                        cfs_history = fetch_usgs_7day_data(site_id, "00060")  # Discharge
-                        feet_history = fetch_usgs_7day_data(site_id, "00065")  # Gage height
+                        # 7-day historical data from USGS (discharge, gage height)
+                        cfs_history, feet_history = usgs_histories.get(site_id, ([], []))
 
                     # Get state data for last_in_epoch
                     site_state = get_site_state(site_id) if conn else {}
@@ -2299,26 +2368,19 @@ def main() -> None:
                     site_data["qpf"] = row.get("qpf")
 
                     # Add rainfall history stats if available
-                    if RAINFALL_HISTORY_AVAILABLE and rainfall_history_db:
+                    if rain_summary is not None:
                         river_name = row.get("name")
                         if river_name:
                             try:
                                 # Get today's rainfall from database
-                                today_rain_all = get_all_rivers_today(db_path=rainfall_history_db)
-                                for r in today_rain_all:
-                                    if r.get("river_name") == river_name:
-                                        site_data["precip_today_in"] = r.get("precip_in")
-                                        site_data["pws_station"] = r.get("station_id")
-                                        break
-                                # Get 48-hour (2-day) rainfall stats
-                                rain_stats_48h = get_rainfall_stats(river_name, days=2, db_path=rainfall_history_db)
-                                site_data["rainfall_48h"] = rain_stats_48h
-                                # Get 7-day rainfall stats
-                                rain_stats = get_rainfall_stats(river_name, days=7, db_path=rainfall_history_db)
-                                site_data["rainfall_7d"] = rain_stats
-                                # Get 30-day stats too
-                                rain_stats_30d = get_rainfall_stats(river_name, days=30, db_path=rainfall_history_db)
-                                site_data["rainfall_30d"] = rain_stats_30d
+                                r = rain_summary["today"].get(river_name)
+                                if r:
+                                    site_data["precip_today_in"] = r.get("precip_in")
+                                    site_data["pws_station"] = r.get("station_id")
+                                # 48-hour (2-day), 7-day and 30-day rainfall stats
+                                site_data["rainfall_48h"] = rain_summary[2].get(river_name, {})
+                                site_data["rainfall_7d"] = rain_summary[7].get(river_name, {})
+                                site_data["rainfall_30d"] = rain_summary[30].get(river_name, {})
                                 # Get daily rainfall for chart (7 days)
                                 rain_daily = get_daily_rainfall(river_name, days=7, db_path=rainfall_history_db)
                                 site_data["rainfall_daily"] = rain_daily
@@ -2326,13 +2388,22 @@ def main() -> None:
                                 if not args.quiet:
                                     print(f"[DETAIL] Rainfall fetch failed for {river_name}: {rain_err}")
 
-                    # Generate HTML
-                    detail_html = generate_site_detail_html(site_data, cfs_history, feet_history)
-
-                    # Write to file
+                    # Skip the render when nothing the page depends on has changed
                     detail_path = os.path.join(details_dir, f"{site_id}.html")
-                    with open(detail_path, "w", encoding="utf-8") as f:
-                        f.write(detail_html)
+                    render_key = site_detail_render_key(site_data, cfs_history, feet_history, detail_script)
+                    if render_key and conn and os.path.exists(detail_path) and read_detail_render_key(conn, site_id) == render_key:
+                        if not args.quiet:
+                            print(f"[DETAIL] unchanged {detail_path}")
+                        continue
+
+                    # Stream the HTML to a temp file, then swap it in so a failed
+                    # render never leaves a partial page behind
+                    tmp_path = detail_path + ".tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        f.writelines(iter_site_detail_html(site_data, cfs_history, feet_history, detail_script))
+                    os.replace(tmp_path, detail_path)
+                    if render_key and conn:
+                        write_detail_render_key(conn, site_id, render_key)
 
                     if not args.quiet:
                         print(f"[DETAIL] wrote {detail_path}")